@@ -0,0 +1,9 @@
+# benchmarks/__init__.py
+"""
+Mediciones de rendimiento que se corren a mano.
+
+Uso:
+    python -m backend.benchmarks.endpoints [--leases N] [--baseline]   # endpoints contra SQLite local
+    python -m backend.benchmarks.serialization [--rows N] [--repeat N]
+    python -m backend.benchmarks.metrics [--requests N] [--multiprocess]   # costo de /metrics por pedido
+"""
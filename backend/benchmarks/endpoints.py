@@ -0,0 +1,341 @@
+# benchmarks/endpoints.py
+"""
+Benchmark de endpoints contra una base SQLite local.
+
+Arma una base nueva (DB_URL=sqlite:///...), la carga con seed.py a la escala
+pedida y le pega a la app con TestClient, sin red ni MySQL. Por endpoint
+registra percentiles de latencia, sentencias SQL y filas leídas por pedido,
+y guarda todo en JSON. Con --baseline compara contra una corrida anterior:
+más sentencias o filas que la base es una regresión (el presupuesto de
+consultas de cada endpoint), y también una latencia p50 peor que la base
+más la tolerancia.
+
+Uso:
+    python -m backend.benchmarks.endpoints [--leases N | --tier 10k] [--requests N] [--only nombre ...]
+        [--out resultados.json] [--baseline base.json] [--tolerance 0.5]
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "endpoints.json")
+
+# Diferencia mínima (ms) para marcar una regresión de latencia: por debajo
+# de esto es ruido de la máquina
+MIN_LATENCY_DELTA_MS = 2.0
+
+
+class QueryCounter:
+    """Sentencias y filas leídas, alimentado por eventos del engine y por el cursor de sqlite."""
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+
+    def reset(self):
+        self.statements = 0
+        self.rows = 0
+
+
+counter = QueryCounter()
+
+
+class CountingCursor(sqlite3.Cursor):
+    """Cursor de sqlite que cuenta las filas que se leen (rowcount es -1 en los SELECT)."""
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            counter.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        counter.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        counter.rows += len(rows)
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+def instrument(engine):
+    from sqlalchemy import event
+
+    if engine.dialect.name == "sqlite":
+        # El do_connect de pool_stats abre la conexión con dialect.connect y
+        # corta la cadena de listeners, así que el factory se agrega ahí
+        connect = engine.dialect.connect
+
+        def counting_connect(*cargs, **cparams):
+            return connect(*cargs, factory=CountingConnection, **cparams)
+
+        engine.dialect.connect = counting_connect
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        counter.statements += 1
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _count_rows(conn, cursor, statement, parameters, context, executemany):
+        # Fuera de sqlite: los drivers de MySQL bufferean y rowcount son las filas
+        if conn.dialect.name != "sqlite" and cursor.description and cursor.rowcount > 0:
+            counter.rows += cursor.rowcount
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Ruta (o función del número de pedido que la arma)
+    path: object
+    body: Optional[Callable[[int], dict]] = None
+    auth: bool = False
+    # Se llama antes de cada pedido, fuera del tiempo medido
+    before: Optional[Callable[[], None]] = None
+    # Tope de pedidos (login es bcrypt a propósito)
+    max_requests: Optional[int] = None
+    expected: tuple = (200,)
+
+
+def build_scenarios(counts: dict, today: date) -> list[Scenario]:
+    from backend.benchmarks.seed import BENCH_PASSWORD, BENCH_USERNAME
+    from backend.services.dashboard_cache import dashboard_cache
+
+    leases = counts["leases"]
+    vehicles = counts["vehicles"]
+    far = datetime.combine(today, datetime.min.time()) + timedelta(days=400)
+
+    def new_lease(i: int) -> dict:
+        # Cada pedido usa un hueco libre en el futuro: vehículo por vehículo, de a 5 días
+        start = far + timedelta(days=5 * (i // vehicles))
+        return {
+            "clientId": 1 + i % counts["clients"], "vehicleId": 1 + i % vehicles, "employeeId": 1,
+            "date_time_start": start.isoformat(), "date_time_end": (start + timedelta(days=3)).isoformat(),
+        }
+
+    return [
+        Scenario("login", "POST", "/auth/login", body=lambda i: {"username": BENCH_USERNAME, "password": BENCH_PASSWORD},
+                 max_requests=10),
+        Scenario("root", "GET", "/"),
+        Scenario("read_leases", "GET", "/alquileres/?limit=100"),
+        Scenario("read_leases_by_state", "GET", "/alquileres/?state=finalizado&limit=100"),
+        Scenario("read_leases_by_client", "GET", lambda i: f"/alquileres/?clientId={1 + i % counts['clients']}"),
+        Scenario("read_lease", "GET", lambda i: f"/alquileres/{1 + (i * 7919) % leases}"),
+        Scenario("create_lease", "POST", "/alquileres/", body=new_lease, expected=(201,)),
+        Scenario("read_invoices", "GET", "/facturas/?limit=100"),
+        Scenario("read_invoices_paid", "GET", "/facturas/?status=pagada&limit=100"),
+        Scenario("read_invoice", "GET", lambda i: f"/facturas/{1 + (i * 7919) % max(1, counts['invoices'])}"),
+        Scenario("get_dashboard_data", "GET", "/dashboard/", before=dashboard_cache.invalidate),
+        Scenario("get_dashboard_data_cached", "GET", "/dashboard/"),
+        Scenario("fleet_utilization", "GET", "/dashboard/utilizacion"),
+        Scenario("read_clients", "GET", "/clientes/"),
+        Scenario("read_client", "GET", lambda i: f"/clientes/{1 + i % counts['clients']}"),
+        Scenario("read_vehicles", "GET", "/vehiculos/"),
+        # Ventana posterior a los datos generados y anterior a la que usa create_lease
+        Scenario("read_available_vehicles", "GET",
+                 f"/vehiculos/disponibles?desde={(far - timedelta(days=30)).isoformat()}"
+                 f"&hasta={(far - timedelta(days=27)).isoformat()}"),
+        Scenario("read_vehicle", "GET", lambda i: f"/vehiculos/{1 + i % vehicles}"),
+        Scenario("read_employees", "GET", "/empleados/"),
+        Scenario("read_incidents", "GET", "/incidentes/"),
+        Scenario("read_maintenance", "GET", "/mantenimiento/"),
+        Scenario("read_users", "GET", "/usuarios/", auth=True),
+        Scenario("search", "GET", "/buscar/?q=garc"),
+    ]
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[k]
+
+
+def run_scenario(client, scenario: Scenario, requests: int, warmup: int, headers: dict) -> dict:
+    total = min(requests, scenario.max_requests or requests)
+    timings, statements, rows = [], [], []
+    status_codes = set()
+    for i in range(warmup + total):
+        path = scenario.path(i) if callable(scenario.path) else scenario.path
+        body = scenario.body(i) if scenario.body else None
+        if scenario.before:
+            scenario.before()
+        counter.reset()
+        begin = time.perf_counter()
+        response = client.request(scenario.method, path, json=body, headers=headers if scenario.auth else None)
+        elapsed = time.perf_counter() - begin
+        if response.status_code not in scenario.expected:
+            raise RuntimeError(f"{scenario.name}: {scenario.method} {path} -> {response.status_code} {response.text[:200]}")
+        if i < warmup:
+            continue
+        status_codes.add(response.status_code)
+        timings.append(elapsed * 1000)
+        statements.append(counter.statements)
+        rows.append(counter.rows)
+
+    timings.sort()
+    return {
+        "method": scenario.method,
+        "path": scenario.path(0) if callable(scenario.path) else scenario.path,
+        "requests": total,
+        "status": sorted(status_codes),
+        "p50Ms": round(percentile(timings, 50), 3),
+        "p90Ms": round(percentile(timings, 90), 3),
+        "p99Ms": round(percentile(timings, 99), 3),
+        "meanMs": round(sum(timings) / len(timings), 3),
+        "maxMs": round(timings[-1], 3),
+        "statements": round(sum(statements) / len(statements), 2),
+        "statementsMax": max(statements),
+        "rows": round(sum(rows) / len(rows), 2),
+        "rowsMax": max(rows),
+    }
+
+
+def calibrate(repeat: int = 7) -> float:
+    """
+    Tiempo (ms, mediana) de una carga fija de CPU en Python. Se guarda con los
+    resultados para comparar latencias entre corridas en máquinas (o momentos)
+    con distinta velocidad.
+    """
+    payload = [{"id": i, "name": f"Cliente {i}", "amount": i * 1.5, "tags": ["a", "b"]} for i in range(200)]
+    timings = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        for _ in range(20):
+            json.loads(json.dumps(payload))
+            sorted(payload, key=lambda row: row["name"])
+        timings.append((time.perf_counter() - begin) * 1000)
+    timings.sort()
+    return round(timings[len(timings) // 2], 3)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regresiones de `results` contra `baseline` (mismo formato)."""
+    problems = []
+    # Latencias de la base llevadas a la velocidad de esta corrida
+    speed = results["meta"]["calibrationMs"] / baseline["meta"]["calibrationMs"]
+    for name, base in baseline.get("endpoints", {}).items():
+        current = results["endpoints"].get(name)
+        if current is None:
+            continue
+        if current["statementsMax"] > base["statementsMax"]:
+            problems.append(f"{name}: statements {current['statementsMax']} > budget {base['statementsMax']}")
+        if current["rows"] > base["rows"] * (1 + tolerance) + 1:
+            problems.append(f"{name}: rows {current['rows']} > baseline {base['rows']}")
+        expected = base["p50Ms"] * speed
+        if current["p50Ms"] > expected * (1 + tolerance) and current["p50Ms"] - expected > MIN_LATENCY_DELTA_MS:
+            problems.append(f"{name}: p50 {current['p50Ms']} ms > baseline {expected:.3f} ms (adjusted)")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks.endpoints")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--leases", type=int, default=2000, help="Escala: cantidad de alquileres a generar")
+    size.add_argument("--tier", help="Escala predefinida de seed.py (10k, 1m, 10m)")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos")
+    parser.add_argument("--requests", type=int, default=50, help="Pedidos medidos por endpoint")
+    parser.add_argument("--warmup", type=int, default=3, help="Pedidos previos que no se miden")
+    parser.add_argument("--only", nargs="*", help="Correr solo estos endpoints")
+    parser.add_argument("--db", help="Archivo SQLite a usar (por defecto uno temporal); se recrea")
+    parser.add_argument("--out", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"Comparar contra una corrida guardada (por defecto {DEFAULT_BASELINE})")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Margen relativo para filas y latencia")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    # Antes de importar la app: database.py arma los engines al importarse
+    os.environ["DB_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("AUTH_SECRET_KEY", "benchmark-secret")
+    # Una línea de log por pedido solo ensucia la salida
+    os.environ.setdefault("REQUEST_LOG", "false")
+
+    from fastapi.testclient import TestClient
+    import sqlalchemy
+
+    from backend.benchmarks.seed import BENCH_PASSWORD, BENCH_USERNAME, TIERS, seed
+    from backend.data.database import Base, async_engine, engine
+    from backend.main import app
+
+    if args.tier and args.tier not in TIERS:
+        parser.error(f"unknown tier: {args.tier}")
+    Base.metadata.create_all(engine)
+    today = date.today()
+    begin = time.perf_counter()
+    counts = seed(engine, leases=TIERS[args.tier] if args.tier else args.leases, seed=args.seed, today=today)
+    print(f"seed: {counts} en {time.perf_counter() - begin:.1f}s", file=sys.stderr)
+
+    instrument(engine)
+    instrument(async_engine.sync_engine)
+    # Las conexiones abiertas por el seed no tienen el cursor que cuenta filas
+    engine.dispose()
+
+    scenarios = build_scenarios(counts, today)
+    if args.only:
+        unknown = set(args.only) - {s.name for s in scenarios}
+        if unknown:
+            parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+        scenarios = [s for s in scenarios if s.name in args.only]
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "database": "sqlite",
+            "seed": args.seed,
+            "requests": args.requests,
+            "counts": counts,
+            "calibrationMs": calibrate(),
+        },
+        "endpoints": {},
+    }
+    with TestClient(app) as client:
+        login = client.post("/auth/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD}).json()
+        headers = {"Authorization": f"Bearer {login['token']}"}
+        for scenario in scenarios:
+            result = run_scenario(client, scenario, args.requests, args.warmup, headers)
+            results["endpoints"][scenario.name] = result
+            print(f"{scenario.name:<28} p50={result['p50Ms']:>8.2f}ms p90={result['p90Ms']:>8.2f}ms "
+                  f"p99={result['p99Ms']:>8.2f}ms sql={result['statements']:>6.1f} rows={result['rows']:>8.1f}")
+
+    # Promedio con una segunda calibración al final: la velocidad de la máquina puede cambiar durante la corrida
+    results["meta"]["calibrationMs"] = round((results["meta"]["calibrationMs"] + calibrate()) / 2, 3)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["counts"] != counts:
+            print("warning: the baseline was recorded at a different scale", file=sys.stderr)
+        problems = compare(results, baseline, args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
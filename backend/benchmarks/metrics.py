@@ -0,0 +1,93 @@
+# benchmarks/metrics.py
+"""
+Costo por pedido de MetricsMiddleware: la misma app ASGI mínima (responde
+200 sin cuerpo y deja una ruta en el scope, como el router de FastAPI) con y
+sin el middleware. La diferencia es lo que agrega la recolección.
+
+Con --multiprocess se mide con PROMETHEUS_MULTIPROC_DIR (valores en archivos
+mmap, como corre con varios workers) en un directorio temporal.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Objetivo: bastante menos que esto por pedido
+BUDGET_US = 50.0
+
+
+class FakeRoute:
+    path = "/alquileres/{id_alquiler}"
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = FakeRoute
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def run(app, requests: int) -> float:
+    """Segundos por pedido."""
+    begin = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/alquileres/1"}, receive, send)
+    return (time.perf_counter() - begin) / requests
+
+
+def measure(app, requests: int, repeat: int) -> float:
+    """Mejor de `repeat` corridas, en microsegundos por pedido."""
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run(app, 1000))  # warmup
+        return min(loop.run_until_complete(run(app, requests)) for _ in range(repeat)) * 1e6
+    finally:
+        loop.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks.metrics")
+    parser.add_argument("--requests", type=int, default=20000, help="Pedidos por corrida")
+    parser.add_argument("--repeat", type=int, default=5, help="Corridas por caso")
+    parser.add_argument("--multiprocess", action="store_true", help="Medir en modo multiproceso (mmap)")
+    args = parser.parse_args(argv)
+
+    multiproc_dir = None
+    if args.multiprocess:
+        # Antes de importar prometheus_client: el modo se decide al importarlo
+        multiproc_dir = tempfile.mkdtemp(prefix="bench-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = multiproc_dir
+
+    from backend.services.metrics import MetricsMiddleware, render_metrics
+
+    try:
+        bare = measure(endpoint, args.requests, args.repeat)
+        instrumented = measure(MetricsMiddleware(endpoint), args.requests, args.repeat)
+        # El scrape tiene que ver los pedidos medidos
+        if b'route="/alquileres/{id_alquiler}"' not in render_metrics():
+            print("Las métricas no registraron los pedidos", file=sys.stderr)
+            return 1
+    finally:
+        if multiproc_dir:
+            shutil.rmtree(multiproc_dir, ignore_errors=True)
+
+    overhead = instrumented - bare
+    print(f"mode={'multiprocess' if args.multiprocess else 'single'} requests={args.requests} repeat={args.repeat}")
+    print(f"sin middleware : {bare:8.2f} µs / pedido")
+    print(f"con middleware : {instrumented:8.2f} µs / pedido")
+    print(f"overhead       : {overhead:8.2f} µs / pedido (objetivo < {BUDGET_US:.0f} µs)")
+    return 0 if overhead < BUDGET_US else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
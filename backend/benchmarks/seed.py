@@ -0,0 +1,320 @@
+# benchmarks/seed.py
+"""
+Datos sintéticos para los benchmarks y las pruebas de escala.
+
+Todo sale de un random.Random(seed), así que la misma semilla, la misma
+escala y la misma fecha de referencia generan exactamente los mismos datos.
+Los datos son consistentes entre sí:
+
+- clientes con DNI y email únicos, vehículos con patente única;
+- los alquileres de cada vehículo van uno detrás del otro a lo largo de
+  varios años y nunca se solapan; los que ya terminaron quedan finalizados
+  (o cancelados), el que está en curso confirmado y los futuros creados;
+- el monto es días * precio por día, como en create_lease, y los
+  kilómetros avanzan con el odómetro del vehículo;
+- cada alquiler finalizado tiene su factura (total = monto + incidentes);
+- los incidentes caen dentro del alquiler y los mantenimientos en los
+  huecos entre alquileres del mismo vehículo.
+
+Se genera vehículo por vehículo y se inserta en lotes (executemany), así que
+la memoria no depende de la escala.
+
+Uso:
+    python -m backend.benchmarks.seed --tier 1m [--seed N] [--today AAAA-MM-DD] [--create]
+
+La base es la de la configuración (DB_URL, ver data/config.py).
+"""
+import argparse
+import random
+import sys
+import time as timer
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from backend.models.client import Client
+from backend.models.employee import Employee
+from backend.models.incident import Incident
+from backend.models.invoice import Invoice
+from backend.models.lease import Lease
+from backend.models.maintenance import Maintenance
+from backend.models.user import User
+from backend.models.vehicle import Vehicle
+
+# Cantidad de alquileres de cada escala
+TIERS = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Proporciones respecto de la cantidad de alquileres
+LEASES_PER_VEHICLE = 50
+LEASES_PER_CLIENT = 5
+LEASES_PER_EMPLOYEE = 10_000
+
+# Usuario administrador para los endpoints autenticados
+BENCH_USERNAME = "bench"
+BENCH_PASSWORD = "bench-password"
+
+INSERT_BATCH = 5000
+
+MODELS = [
+    ("Toyota", "Corolla", "22000"), ("Toyota", "Hilux", "35000"), ("Ford", "Ranger", "33000"),
+    ("Volkswagen", "Gol", "15000"), ("Fiat", "Cronos", "16000"), ("Renault", "Kangoo", "18000"),
+    ("Chevrolet", "Onix", "17000"), ("Peugeot", "208", "19000"), ("Ford", "Focus", "21000"),
+    ("Volkswagen", "Amarok", "38000"), ("Fiat", "Toro", "30000"), ("Citroën", "C3", "16500"),
+]
+FIRST_NAMES = ["Ana", "Juan", "María", "Lucas", "Sofía", "Martín", "Lucía", "Diego", "Valentina", "Pablo",
+               "Camila", "Mateo", "Julieta", "Tomás", "Florencia", "Nicolás"]
+LAST_NAMES = ["García", "Pérez", "Gómez", "Fernández", "López", "Díaz", "Romero", "Sosa", "Álvarez", "Torres",
+              "Ruiz", "Benítez", "Acosta", "Medina", "Herrera", "Suárez"]
+PAYMENT_METHODS = ["efectivo", "tarjeta", "transferencia"]
+INCIDENT_TYPES = ["choque", "multa", "rayón", "limpieza", "combustible"]
+MAINTENANCE_TYPES = ["service", "cambio de aceite", "frenos", "neumáticos", "chapa y pintura"]
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+CANCELLED_SHARE = 0.03
+INCIDENT_SHARE = 0.10
+MAINTENANCE_SHARE = 0.05  # Por hueco entre alquileres de al menos dos días
+
+# Ajustes de la conexión solo durante la carga (y cómo volverlos atrás). En
+# SQLite el cache por defecto (2 MB) hace que mantener los índices de Leases
+# se vuelva cada vez más lento a medida que crece la tabla
+FAST_LOAD = {
+    "sqlite": (("PRAGMA cache_size=-262144", "PRAGMA synchronous=OFF"),
+               ("PRAGMA cache_size=-2000", "PRAGMA synchronous=FULL")),
+    "mysql": (("SET unique_checks=0", "SET foreign_key_checks=0"),
+              ("SET unique_checks=1", "SET foreign_key_checks=1")),
+}
+
+
+def person_name(i: int, salt: int = 0) -> str:
+    """Nombre fijo para un id, sin guardarlo: hace falta para clientName en facturas e incidentes."""
+    h = (i * 2654435761 + salt) & 0xFFFFFFFF
+    return f"{FIRST_NAMES[h % len(FIRST_NAMES)]} {LAST_NAMES[(h >> 8) % len(LAST_NAMES)]}"
+
+
+def patente(i: int) -> str:
+    """Patente única con formato AA123BB (alcanza para 456 millones de vehículos)."""
+    number, rest = i % 1000, i // 1000
+    letters = []
+    for _ in range(4):
+        rest, k = divmod(rest, 26)
+        letters.append(LETTERS[k])
+    return f"{letters[3]}{letters[2]}{number:03d}{letters[1]}{letters[0]}"
+
+
+def scale(leases: int) -> dict:
+    """Cantidad de vehículos, clientes y empleados para una cantidad de alquileres."""
+    return {
+        "vehicles": max(10, leases // LEASES_PER_VEHICLE),
+        "clients": max(20, leases // LEASES_PER_CLIENT),
+        "employees": max(10, leases // LEASES_PER_EMPLOYEE),
+    }
+
+
+class BulkWriter:
+    """Acumula filas por tabla y las inserta de a lotes, respetando el orden de las FK."""
+
+    ORDER = (Employee, User, Client, Vehicle, Lease, Invoice, Incident, Maintenance)
+
+    def __init__(self, conn, batch: int = INSERT_BATCH):
+        self.conn = conn
+        self.batch = batch
+        self.rows = {model: [] for model in self.ORDER}
+        self.counts = {model.__tablename__: 0 for model in self.ORDER}
+
+    def add(self, model, row: dict):
+        rows = self.rows[model]
+        rows.append(row)
+        if len(rows) >= self.batch:
+            # Se vacía todo para no insertar hijos antes que sus padres
+            self.flush()
+
+    def flush(self):
+        for model in self.ORDER:
+            rows = self.rows[model]
+            if rows:
+                self.conn.execute(insert(model), rows)
+                self.counts[model.__tablename__] += len(rows)
+                rows.clear()
+
+
+def _vehicle_leases(rnd: random.Random, count: int, now: datetime) -> list[tuple[datetime, datetime]]:
+    """Intervalos consecutivos y sin solapamiento, el último cerca de `now`."""
+    end = now + timedelta(days=rnd.randint(-3, 20), hours=rnd.randint(0, 23))
+    intervals = []
+    for _ in range(count):
+        start = end - timedelta(days=rnd.randint(1, 10), hours=rnd.randint(0, 12))
+        intervals.append((start, end))
+        end = start - timedelta(days=rnd.randint(0, 15), hours=rnd.randint(0, 23))
+    intervals.reverse()
+    return intervals
+
+
+def seed(engine: Engine, leases: int = 2000, seed: int = 0, today: Optional[date] = None,
+         progress: bool = False) -> dict:
+    """Carga `leases` alquileres con sus clientes, vehículos, facturas, incidentes y mantenimientos."""
+    rnd = random.Random(seed)
+    now = datetime.combine(today or date.today(), time(12))
+    sizes = scale(leases)
+    begin = timer.perf_counter()
+
+    setup, restore = FAST_LOAD.get(engine.dialect.name, ((), ()))
+    with engine.connect() as conn:
+        for statement in setup:
+            conn.exec_driver_sql(statement)
+        conn.commit()
+        try:
+            with conn.begin():
+                counts = _load(conn, rnd, now, leases, sizes, begin, progress)
+        finally:
+            for statement in restore:
+                conn.exec_driver_sql(statement)
+            conn.commit()
+    return counts
+
+
+def _load(conn, rnd: random.Random, now: datetime, leases: int, sizes: dict, begin: float, progress: bool) -> dict:
+    """Genera vehículo por vehículo e inserta con BulkWriter; devuelve las filas por tabla."""
+    from backend.services.passwords import password_context
+
+    n_vehicles, n_clients, n_employees = sizes["vehicles"], sizes["clients"], sizes["employees"]
+    writer = BulkWriter(conn)
+    for i in range(1, n_employees + 1):
+        writer.add(Employee, {
+            "id": i, "name": person_name(i, salt=7), "dni": f"{10000000 + i}",
+            "email": f"empleado{i}@example.com", "phone": f"351{i:07d}",
+            "cargo": "Gerente" if i == 1 else "Agente de Alquileres",
+        })
+    writer.add(User, {"id": 1, "id_employee": 1, "username": BENCH_USERNAME,
+                      "password": password_context.hash(BENCH_PASSWORD)})
+    for i in range(1, n_clients + 1):
+        writer.add(Client, {
+            "id": i, "name": person_name(i), "dni": f"{20000000 + i}",
+            "phone": f"351{i:07d}", "email": f"cliente{i}@example.com",
+            "status": "activo" if rnd.random() < 0.9 else "inactivo",
+        })
+
+    lease_id = 0
+    for vehicle_id in range(1, n_vehicles + 1):
+        count = leases // n_vehicles + (1 if vehicle_id <= leases % n_vehicles else 0)
+        brand, model, price = rnd.choice(MODELS)
+        price_per_day = Decimal(price) / 1000
+        plate = patente(vehicle_id)
+        vehicle_name = f"{brand} {model} - {plate}"
+        odometer = rnd.randint(0, 80000)
+        estado = "disponible"
+        previous_end = None
+        vehicle_rows = []
+
+        for start, end in _vehicle_leases(rnd, count, now):
+            # Mantenimiento en el hueco anterior al alquiler
+            if previous_end and start - previous_end >= timedelta(days=2) and rnd.random() < MAINTENANCE_SHARE:
+                m_start = previous_end + timedelta(hours=rnd.randint(1, 12))
+                m_end = min(m_start + timedelta(days=rnd.randint(1, 3)), start - timedelta(hours=1))
+                done = m_end <= now
+                if not done and m_start <= now:
+                    estado = "mantenimiento"
+                vehicle_rows.append((Maintenance, {
+                    "vehicleId": vehicle_id, "employeeId": rnd.randint(1, n_employees),
+                    "vehicleName": f"{brand} {model}", "startDate": m_start, "endDate": m_end if done else None,
+                    "type": rnd.choice(MAINTENANCE_TYPES), "description": "Generado",
+                    "cost": Decimal(rnd.randint(50, 600)), "status": "finalizado" if done else "iniciado",
+                }))
+            previous_end = end
+
+            lease_id += 1
+            client_id = rnd.randint(1, n_clients)
+            days = (end - start).days
+            amount = Decimal(days) * price_per_day
+            created = (start - timedelta(days=rnd.randint(0, 20))).date()
+            row = {
+                "id": lease_id, "clientId": client_id, "vehicleId": vehicle_id,
+                "employeeId": rnd.randint(1, n_employees), "date_time_start": start, "date_time_end": end,
+                "amount": amount, "date_create": created, "date_confirm": None, "date_cancel": None,
+                "start_kilometers": None, "end_kilometers": None,
+            }
+            if end <= now:
+                if rnd.random() < CANCELLED_SHARE:
+                    row.update(state="cancelado", date_cancel=min(created + timedelta(days=1), start.date()))
+                    vehicle_rows.append((Lease, row))
+                    continue
+                driven = (days or 1) * rnd.randint(50, 300)
+                row.update(state="finalizado", date_confirm=created, start_kilometers=odometer,
+                           end_kilometers=odometer + driven)
+                odometer += driven
+            elif start <= now:
+                row.update(state="confirmado", date_confirm=created, start_kilometers=odometer)
+                estado = "no disponible"
+            else:
+                row["state"] = "creado"
+            vehicle_rows.append((Lease, row))
+            if row["state"] != "finalizado":
+                continue
+
+            client_name = person_name(client_id)
+            incidents_total = Decimal(0)
+            if rnd.random() < INCIDENT_SHARE:
+                cost = Decimal(rnd.randint(500, 50000)) / 100
+                incidents_total += cost
+                vehicle_rows.append((Incident, {
+                    "rentalId": lease_id, "employeeId": rnd.randint(1, n_employees), "clientName": client_name,
+                    "vehicleName": vehicle_name, "type": rnd.choice(INCIDENT_TYPES), "description": "Generado",
+                    "cost": cost, "date": (start + (end - start) * rnd.random()).date(),
+                }))
+            roll = rnd.random()
+            vehicle_rows.append((Invoice, {
+                "rentalId": lease_id, "clientName": client_name, "issuedDate": end.date(),
+                "total": amount + incidents_total, "paymentMethod": rnd.choice(PAYMENT_METHODS),
+                "status": "pagada" if roll < 0.85 else "pendiente" if roll < 0.97 else "anulada",
+            }))
+
+        # El vehículo va antes que sus alquileres (FK); el odómetro ya es el final
+        writer.add(Vehicle, {
+            "id": vehicle_id, "brand": brand, "model": model, "patente": plate,
+            "year": rnd.randint(2012, now.year), "pricePerDay": price_per_day,
+            "seats": rnd.choice((2, 5, 5, 5, 7)), "transmission": rnd.choice(("manual", "automática")),
+            "fuel": rnd.choice(("nafta", "diésel", "gnc")), "kilometraje_actual": odometer, "estado": estado,
+        })
+        for model_cls, row in vehicle_rows:
+            writer.add(model_cls, row)
+        if progress and vehicle_id % 1000 == 0:
+            print(f"  {lease_id:,} alquileres ({timer.perf_counter() - begin:.0f}s)", file=sys.stderr)
+    writer.flush()
+
+    counts = writer.counts
+    return {
+        "employees": counts["Employees"], "clients": counts["Clients"], "vehicles": counts["Vehicles"],
+        "leases": counts["Leases"], "invoices": counts["Invoices"], "incidents": counts["Incidents"],
+        "maintenance": counts["Maintenance"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks.seed")
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("--tier", choices=sorted(TIERS), help="Escala predefinida")
+    size.add_argument("--leases", type=int, help="Cantidad de alquileres")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos")
+    parser.add_argument("--today", type=date.fromisoformat, default=None,
+                        help="Fecha de referencia (por defecto hoy); fija los datos entre días")
+    parser.add_argument("--create", action="store_true", help="Crear las tablas antes de cargar")
+    args = parser.parse_args(argv)
+
+    from backend.data.database import Base, engine
+
+    if args.create:
+        # Tablas que no carga el seed pero usa la app (GET condicionales)
+        import backend.models.table_version  # noqa: F401
+
+        Base.metadata.create_all(engine)
+    leases = TIERS[args.tier] if args.tier else args.leases
+    begin = timer.perf_counter()
+    counts = seed(engine, leases=leases, seed=args.seed, today=args.today, progress=True)
+    print(f"{counts} en {timer.perf_counter() - begin:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
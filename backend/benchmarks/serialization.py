@@ -0,0 +1,103 @@
+# benchmarks/serialization.py
+"""
+Costo de serializar listas de alquileres: camino de FastAPI (validar el dict
+contra response_model + jsonable_encoder + json estándar) contra
+FastJSONResponse (validar y codificar con un TypeAdapter, todo en
+pydantic-core). No usa la base: arma filas con la misma forma que devuelve
+lease_projection().
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from backend.schemas.lease_schemas import LeaseResponse
+from backend.services.fast_json import FastJSONResponse
+
+STATES = ("activo", "finalizado", "cancelado", "pendiente")
+
+
+def sample_leases(rows: int) -> list[dict]:
+    start = datetime(2024, 1, 1, 9, 30)
+    leases = []
+    for i in range(1, rows + 1):
+        begin = start + timedelta(hours=i)
+        leases.append({
+            "id": i,
+            "clientId": i % 500 + 1,
+            "clientName": f"Cliente {i % 500 + 1}",
+            "vehicleId": i % 80 + 1,
+            "vehicleBrand": "Toyota",
+            "vehicleModel": "Corolla",
+            "vehiclePatente": f"AB{i % 1000:03d}CD",
+            "employeeId": i % 12 + 1,
+            "employeeName": f"Empleado {i % 12 + 1}",
+            "date_time_start": begin,
+            "date_time_end": begin + timedelta(days=3),
+            "amount": Decimal("150.00") + i % 100,
+            "state": STATES[i % len(STATES)],
+            "date_create": begin.date(),
+            "date_confirm": begin.date() if i % 2 else None,
+            "date_cancel": None,
+            "start_kilometers": 10000 + i,
+            "end_kilometers": None,
+        })
+    return leases
+
+
+def fastapi_path(loop, field, leases: list[dict]) -> bytes:
+    """Lo que hace FastAPI cuando el endpoint devuelve los dicts."""
+    content = loop.run_until_complete(serialize_response(field=field, response_content=leases))
+    return JSONResponse(content).body
+
+
+def fast_path(leases: list[dict]) -> bytes:
+    return FastJSONResponse(leases, list[LeaseResponse]).body
+
+
+def measure(fn, repeat: int) -> float:
+    """Mejor tiempo (segundos) de `repeat` corridas."""
+    best = float("inf")
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - begin)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks.serialization")
+    parser.add_argument("--rows", type=int, default=1000, help="Alquileres por respuesta")
+    parser.add_argument("--repeat", type=int, default=50, help="Corridas por camino")
+    args = parser.parse_args(argv)
+
+    leases = sample_leases(args.rows)
+    field = create_model_field(name="Response_read_leases", type_=list[LeaseResponse], mode="serialization")
+
+    loop = asyncio.new_event_loop()
+
+    # Ambos caminos tienen que producir el mismo JSON
+    if json.loads(fastapi_path(loop, field, leases)) != json.loads(fast_path(leases)):
+        print("Los caminos producen JSON distinto", file=sys.stderr)
+        return 1
+
+    before = measure(lambda: fastapi_path(loop, field, leases), args.repeat)
+    after = measure(lambda: fast_path(leases), args.repeat)
+    loop.close()
+    per_k = 1000 / args.rows
+    print(f"rows={args.rows} repeat={args.repeat}")
+    print(f"response_model + json : {before * 1000 * per_k:8.2f} ms / 1000 alquileres")
+    print(f"FastJSONResponse      : {after * 1000 * per_k:8.2f} ms / 1000 alquileres")
+    print(f"speedup               : {before / after:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
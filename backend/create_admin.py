@@ -0,0 +1,99 @@
+# create_admin.py
+"""
+Crea el primer usuario administrador en una base nueva.
+
+POST /usuarios/ exige un token de admin, así que en una base sin usuarios no
+hay forma de crear el primero desde la API. Ser admin depende del cargo del
+empleado (ADMIN_CARGOS): si no se indica --employee-id se crea un empleado
+con cargo "administrador".
+
+    python -m backend.create_admin --username admin
+    python -m backend.create_admin --username admin --employee-id 3
+
+La contraseña se pide por consola (o --password, por ejemplo en scripts).
+"""
+import argparse
+import getpass
+import sys
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.data.config import settings
+from backend.data.database import engine
+from backend.models.client import Client  # noqa: F401  (relaciones de Lease)
+from backend.models.employee import Employee
+from backend.models.incident import Incident  # noqa: F401  (relaciones de Employee)
+from backend.models.invoice import Invoice  # noqa: F401  (relaciones de Lease)
+from backend.models.lease import Lease  # noqa: F401  (relaciones de Employee)
+from backend.models.maintenance import Maintenance  # noqa: F401  (relaciones de Employee)
+from backend.models.user import User
+from backend.models.vehicle import Vehicle  # noqa: F401  (relaciones de Lease)
+from backend.services.passwords import password_context
+from backend.services.tokens import is_admin_cargo
+
+ADMIN_CARGO = "administrador"
+
+
+def create_admin(
+        db: Session,
+        username: str,
+        password: str,
+        employee_id: Optional[int] = None,
+        name: str = "Administrador"
+) -> User:
+    """Crea el usuario (y su empleado si hace falta). ValueError si no se puede."""
+    if db.scalar(select(User.id).where(User.username == username)) is not None:
+        raise ValueError(f"User '{username}' already exists")
+
+    if employee_id is None:
+        employee = Employee(name=name, cargo=ADMIN_CARGO)
+        db.add(employee)
+        db.flush()
+    else:
+        employee = db.get(Employee, employee_id)
+        if employee is None:
+            raise ValueError(f"Employee {employee_id} not found")
+        if not is_admin_cargo(employee.cargo):
+            raise ValueError(
+                f"Employee {employee_id} has cargo '{employee.cargo}', which is not an admin cargo "
+                f"(ADMIN_CARGOS: {', '.join(settings.ADMIN_CARGOS)})"
+            )
+
+    user = User(id_employee=employee.id, username=username, password=password_context.hash(password))
+    db.add(user)
+    db.commit()
+    return user
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.create_admin")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", help="Si no se indica se pide por consola")
+    parser.add_argument("--employee-id", type=int, help="Empleado existente con cargo de admin")
+    parser.add_argument("--name", default="Administrador", help="Nombre del empleado que se crea")
+    args = parser.parse_args(argv)
+
+    password = args.password
+    if password is None:
+        password = getpass.getpass("Password: ")
+        if password != getpass.getpass("Repeat password: "):
+            print("Passwords do not match", file=sys.stderr)
+            return 1
+    if not password:
+        print("Password must not be empty", file=sys.stderr)
+        return 1
+
+    with Session(engine) as db:
+        try:
+            user = create_admin(db, args.username, password, args.employee_id, args.name)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        print(f"Created admin user '{user.username}' (userId={user.id}, employeeId={user.id_employee})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -11,10 +12,67 @@ class Settings(BaseSettings):
     DB_HOST: str = "34.39.194.31"
     DB_PORT: int = 3306
     DB_NAME: str = "alquiler_bd"
+    # URL completa de SQLAlchemy; si se define reemplaza a los DB_* de arriba
+    # (por ejemplo sqlite:///bench.db para correr los benchmarks en local)
+    DB_URL: Optional[str] = None
+    # Certificados de cliente (certificados/) para el MySQL remoto
+    DB_SSL: bool = True
+
+    # Pool de conexiones (valores por worker y por engine, sync y async)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # segundos esperando una conexión libre
+    DB_POOL_RECYCLE: int = 1800  # segundos; menor que el wait_timeout del servidor
+    DB_POOL_PRE_PING: bool = True  # descarta conexiones que el servidor ya cerró
+
+    # Cada cuánto se recalculan los KPIs del dashboard contra la base (segundos)
+    KPI_RECONCILE_SECONDS: float = 300
+
+    # Cada cuánto se rearma desde la base el índice de disponibilidad de
+    # vehículos (segundos); acota el atraso de /vehiculos/disponibles
+    AVAILABILITY_RELOAD_SECONDS: float = 60
+
+    # Cada cuánto se rearma desde la base el índice de trigramas de /buscar
+    # (segundos); acota el atraso respecto de lo que escriben otros workers
+    SEARCH_RELOAD_SECONDS: float = 300
+
+    # Tiempo de vida del cache de la respuesta del dashboard (segundos)
+    DASHBOARD_CACHE_TTL: float = 30
+
+    # Métricas por pedido: header Server-Timing (db, serialize, total) y una
+    # línea de log JSON por pedido en el logger "backend.requests"
+    REQUEST_TIMING: bool = True
+    REQUEST_LOG: bool = True
+    # Una misma sentencia repetida más de estas veces en un pedido se loguea
+    # como posible N+1
+    N_PLUS_ONE_THRESHOLD: int = 10
+
+    # Registro de consultas lentas (GET /health/slow-queries, solo admin):
+    # umbral en milisegundos, cuántas se guardan y si se captura el EXPLAIN
+    SLOW_QUERY_MS: float = 200
+    SLOW_QUERY_LOG_SIZE: int = 100
+    SLOW_QUERY_EXPLAIN: bool = True
+
+    # Pool de procesos para bcrypt: cantidad de procesos y máximo de
+    # operaciones en curso + en cola antes de responder 503
+    PASSWORD_WORKERS: int = 2
+    PASSWORD_MAX_PENDING: int = 32
+
+    # Tokens de autenticación (HMAC). La clave es obligatoria para levantar la
+    # app (services/tokens.py corta el arranque si falta) y tiene que ser la
+    # misma en todos los workers; se define en el .env
+    AUTH_SECRET_KEY: Optional[str] = None
+    ACCESS_TOKEN_TTL_SECONDS: int = 900
+    REFRESH_TOKEN_TTL_SECONDS: int = 7 * 24 * 3600
+    REVOKED_TOKENS_MAX: int = 10000
+    # Cargos de empleado con permisos de administrador (en minúsculas)
+    ADMIN_CARGOS: list[str] = ["administrador", "admin", "gerente"]
 
     # Construye la URL de conexión automáticamente
     @property
     def DATABASE_URL(self) -> str:
+        if self.DB_URL:
+            return self.DB_URL
         return f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
     class Config:
@@ -1,36 +1,91 @@
 import os
 import ssl
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from .config import settings
+from .pool_stats import PoolStats, timed_pool_class, instrument_engine
+from .request_stats import instrument_queries
+from .slow_queries import SlowQueryLog, instrument_slow_queries
 
 # Certificados
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CERTS_DIR = os.path.join(BASE_DIR, "certificados")
-print(CERTS_DIR)
 
-# Create SSL context - bypass strict verification
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
+# Build connection string (settings.DB_URL la reemplaza completa, ver config.py)
+DATABASE_URL = settings.DATABASE_URL
+# Mismo servidor con el driver async: pymysql -> aiomysql, pysqlite -> aiosqlite
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+_url = make_url(DATABASE_URL)
+ASYNC_DATABASE_URL = _url.set(drivername=ASYNC_DRIVERS.get(_url.get_backend_name(), _url.drivername))
 
-# Load client certificates for authentication
-ssl_context.load_cert_chain(
-    certfile=os.path.join(CERTS_DIR, "client-cert.pem"),
-    keyfile=os.path.join(CERTS_DIR, "client-key.pem")
-)
 
-# Build connection string
-DATABASE_URL = f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+def build_ssl_context() -> ssl.SSLContext:
+    # Create SSL context - bypass strict verification
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+
+    # Load client certificates for authentication
+    ssl_context.load_cert_chain(
+        certfile=os.path.join(CERTS_DIR, "client-cert.pem"),
+        keyfile=os.path.join(CERTS_DIR, "client-key.pem")
+    )
+    return ssl_context
+
+
+def build_connect_args() -> dict:
+    """Certificados solo para MySQL con DB_SSL; SQLite se comparte entre hilos del threadpool."""
+    backend = _url.get_backend_name()
+    if backend == "mysql" and settings.DB_SSL:
+        return {"ssl": build_ssl_context()}
+    if backend == "sqlite":
+        return {"check_same_thread": False}
+    return {}
+
 
-# Create engine with SSL context
+connect_args = build_connect_args()
+
+# Pool settings (see Settings)
+pool_options = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+pool_stats = PoolStats("sync")
+async_pool_stats = PoolStats("async")
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE, settings.SLOW_QUERY_MS, settings.SLOW_QUERY_EXPLAIN)
+
+# Create engine (with SSL context for the remote MySQL)
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"ssl": ssl_context}
+    connect_args=connect_args,
+    poolclass=timed_pool_class(QueuePool, pool_stats),
+    **pool_options
 )
+instrument_engine(engine, pool_stats)
+instrument_queries(engine)
+instrument_slow_queries(engine, slow_query_log, explain_engine=engine)
+
+# Async engine (aiomysql) for the read-heavy endpoints: no threadpool thread
+# is pinned while waiting on the remote server
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=connect_args,
+    poolclass=timed_pool_class(AsyncAdaptedQueuePool, async_pool_stats),
+    **pool_options
+)
+instrument_engine(async_engine.sync_engine, async_pool_stats)
+instrument_queries(async_engine.sync_engine)
+# El EXPLAIN de las consultas async corre en el engine sync (misma base)
+instrument_slow_queries(async_engine.sync_engine, slow_query_log, explain_engine=engine)
 
 # Create Session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 # Create Base class
 class Base(DeclarativeBase):
@@ -42,4 +97,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Async dependency, for `async def` endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+
+class PoolStats:
+    """Contadores del pool de un engine, alimentados por eventos del pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.invalidated = 0
+
+    def record_connect(self, seconds: float):
+        with self._lock:
+            self.connects += 1
+            self.connect_seconds_total += seconds
+            self.connect_seconds_max = max(self.connect_seconds_max, seconds)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidated(self):
+        with self._lock:
+            self.invalidated += 1
+
+    def snapshot(self, pool: Pool) -> dict:
+        with self._lock:
+            return {
+                "pool": pool.status(),
+                "size": pool.size(),
+                "checkedOut": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "checkouts": self.checkouts,
+                "waitMsAvg": _avg_ms(self.wait_seconds_total, self.checkouts),
+                "waitMsMax": round(self.wait_seconds_max * 1000, 3),
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "connectMsAvg": _avg_ms(self.connect_seconds_total, self.connects),
+                "connectMsMax": round(self.connect_seconds_max * 1000, 3),
+                "invalidated": self.invalidated,
+            }
+
+
+def timed_pool_class(base: type, stats: PoolStats) -> type:
+    """
+    Subclase del pool que mide cuánto se espera para obtener una conexión
+    (incluye abrir una nueva si hace falta) y cuenta los timeouts.
+    Se arma como clase para que sobreviva a pool.recreate()/dispose().
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except PoolTimeoutError:
+            stats.record_timeout()
+            raise
+        stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def instrument_engine(engine: Engine, stats: PoolStats):
+    """Mide la latencia de establecer conexiones nuevas con el servidor."""
+
+    @event.listens_for(engine, "do_connect")
+    def _timed_connect(dialect, conn_rec, cargs, cparams):
+        start = time.perf_counter()
+        connection = dialect.connect(*cargs, **cparams)
+        stats.record_connect(time.perf_counter() - start)
+        return connection
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidated(dbapi_connection, connection_record, exception):
+        stats.record_invalidated()
+
+
+def _avg_ms(total_seconds: float, count: int) -> float:
+    return round(total_seconds * 1000 / count, 3) if count else 0.0
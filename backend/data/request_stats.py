@@ -0,0 +1,77 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestStats:
+    """
+    Costo de un pedido HTTP: sentencias SQL, filas, tiempo en la base y en
+    serializar la respuesta. Lo crea el middleware de services/request_timing.py
+    y lo alimentan los eventos del engine (instrument_queries).
+    """
+
+    __slots__ = ("scope", "statements", "rows", "db_seconds", "serialize_seconds", "shapes")
+
+    def __init__(self, scope: Optional[dict] = None):
+        # Scope ASGI del pedido; el router le agrega la ruta al matchear
+        self.scope = scope
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        # Texto de la sentencia (con placeholders) -> veces que se ejecutó
+        self.shapes: Counter = Counter()
+
+    def add_query(self, statement: str, seconds: float, rows: int):
+        self.statements += 1
+        self.rows += rows
+        self.db_seconds += seconds
+        self.shapes[statement] += 1
+
+    def route(self) -> Optional[str]:
+        """Método y plantilla de la ruta ("GET /alquileres/{id_alquiler}")."""
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {route.path if route is not None else self.scope['path']}"
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Sentencias ejecutadas más de `threshold` veces (posible N+1)."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+# Pedido en curso; None fuera de un pedido (arranque, tareas, migraciones)
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def record_serialize(seconds: float):
+    stats = current_request.get()
+    if stats is not None:
+        stats.serialize_seconds += seconds
+
+
+def instrument_queries(engine: Engine):
+    """
+    Suma cada sentencia al pedido en curso. Las filas salen de rowcount: en
+    MySQL (cursores con buffer) son las filas leídas o afectadas; SQLite no
+    informa filas en los SELECT.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _query_start(conn, cursor, statement, parameters, context, executemany):
+        if current_request.get() is not None:
+            # En el contexto de ejecución y no en conn.info: si la sentencia
+            # falla no queda un inicio colgado para la siguiente
+            context._request_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _query_end(conn, cursor, statement, parameters, context, executemany):
+        stats = current_request.get()
+        start = getattr(context, "_request_query_start", None)
+        if stats is None or start is None:
+            return
+        stats.add_query(statement, time.perf_counter() - start, max(cursor.rowcount, 0))
@@ -0,0 +1,185 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timezone
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .request_stats import current_request
+
+logger = logging.getLogger("backend.slow_queries")
+
+# Execution option para que no se registren las consultas del propio EXPLAIN
+SKIP_OPTION = "slow_query_log"
+
+# Prefijo del plan según el backend
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "mysql": "EXPLAIN "}
+
+# Fechas que el driver ya pasó a texto (SQLite): se muestran, no son datos personales
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?")
+
+# Listas de placeholders de un IN (...) expandido: "?, ?, ?" -> "?, ..."
+_PLACEHOLDER_LIST = re.compile(r"(\?|%s|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|%\(\w+\)s))+")
+
+
+def statement_shape(statement: str) -> str:
+    """Sentencia con los espacios normalizados y los IN expandidos colapsados."""
+    return _PLACEHOLDER_LIST.sub(r"\1, ...", " ".join(statement.split()))
+
+
+def redact(value: Any) -> Any:
+    """
+    Valores que sirven para reproducir el plan sin exponer datos personales:
+    números, fechas, booleanos y None quedan; los textos (salvo fechas) y
+    binarios se reemplazan por su largo.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (Decimal, datetime, date, dt_time)):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes len={len(value)}>"
+    if isinstance(value, str):
+        return value if _ISO_DATE.fullmatch(value) else f"<str len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _plain(value: Any) -> Any:
+    """Valores de una fila del plan, listos para JSON."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode(errors="replace")
+    return str(value)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    return redact(parameters)
+
+
+class SlowQueryLog:
+    """
+    Últimas consultas lentas (ring buffer). Cada entrada se guarda apenas
+    termina la consulta; el plan se completa después, desde un hilo aparte
+    y con otra conexión del pool, para no sumarle el EXPLAIN al pedido.
+    """
+
+    def __init__(self, size: int, threshold_ms: float, explain: bool = True, max_pending_explains: int = 4):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.max_pending_explains = max_pending_explains
+        self._entries: deque[dict] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.recorded = 0
+        self.explains_skipped = 0
+
+    def record(self, explain_engine: Optional[Engine], statement: str, parameters: Any,
+               seconds: float, executemany: bool):
+        stats = current_request.get()
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "durationMs": round(seconds * 1000, 2),
+            "route": stats.route() if stats is not None else None,
+            "shape": statement_shape(statement),
+            # executemany: solo la cantidad de filas y la primera
+            "parameters": redact_parameters(parameters[0] if executemany and parameters else parameters),
+            "executemany": len(parameters) if executemany else None,
+            "plan": None,
+            "planError": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        logger.warning("slow query %.1f ms [%s] %s", entry["durationMs"], entry["route"], entry["shape"][:300])
+
+        if not self.explain or explain_engine is None or executemany:
+            return
+        if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        with self._lock:
+            if self._pending >= self.max_pending_explains:
+                self.explains_skipped += 1
+                entry["planError"] = "skipped: too many pending explains"
+                return
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+            executor = self._executor
+        try:
+            executor.submit(self._explain, explain_engine, entry, statement, parameters)
+        except RuntimeError:  # executor apagado (la app se está cerrando)
+            with self._lock:
+                self._pending -= 1
+
+    def _explain(self, engine: Engine, entry: dict, statement: str, parameters: Any):
+        prefix = EXPLAIN_PREFIX.get(engine.dialect.name, "EXPLAIN ")
+        try:
+            with engine.connect().execution_options(**{SKIP_OPTION: False}) as conn:
+                rows = conn.exec_driver_sql(prefix + statement, parameters).mappings().all()
+            plan = [{key: _plain(value) for key, value in row.items()} for row in rows]
+            error = None
+        except Exception as exc:  # el plan es opcional: nunca rompe nada
+            plan, error = None, f"{type(exc).__name__}: {exc}"[:300]
+        with self._lock:
+            entry["plan"] = plan
+            entry["planError"] = error
+            self._pending -= 1
+
+    def entries(self) -> list[dict]:
+        """Más recientes primero."""
+        with self._lock:
+            return [dict(entry) for entry in reversed(self._entries)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "thresholdMs": round(self.threshold * 1000, 2),
+                "size": self._entries.maxlen,
+                "stored": len(self._entries),
+                "recorded": self.recorded,
+                "explainsPending": self._pending,
+                "explainsSkipped": self.explains_skipped,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def instrument_slow_queries(engine: Engine, log: SlowQueryLog, explain_engine: Optional[Engine]):
+    """
+    Registra en `log` las sentencias de `engine` más lentas que el umbral.
+    El EXPLAIN corre en `explain_engine`, que tiene que ser sync (se usa
+    desde un hilo); para el engine async se pasa el sync de la misma base.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _slow_query_start(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _slow_query_end(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_slow_query_start", None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        if seconds >= log.threshold and context.execution_options.get(SKIP_OPTION, True):
+            log.record(explain_engine, statement, parameters, seconds, executemany)
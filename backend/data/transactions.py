@@ -0,0 +1,55 @@
+import random
+import time
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+# Códigos de MySQL que conviene reintentar: lock wait timeout y deadlock
+LOCK_WAIT_TIMEOUT = 1205
+DEADLOCK = 1213
+RETRYABLE_ERROR_CODES = {LOCK_WAIT_TIMEOUT, DEADLOCK}
+
+T = TypeVar("T")
+
+
+def is_retryable(exc: DBAPIError) -> bool:
+    args = getattr(exc.orig, "args", None)
+    return bool(args) and args[0] in RETRYABLE_ERROR_CODES
+
+
+def begin_locked_write(db: Session):
+    """
+    Primera sentencia de una transacción que serializa con SELECT ... FOR
+    UPDATE. SQLite (benchmarks y tests) ignora FOR UPDATE: ahí se toma de
+    entrada el lock de escritura de la base (BEGIN IMMEDIATE), así lo que se
+    lee después ya incluye todo lo commiteado y nadie más escribe hasta el
+    commit. En MySQL no hace nada: bloquean los FOR UPDATE.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("BEGIN IMMEDIATE"))
+
+
+def run_with_retry(
+        db: Session,
+        operation: Callable[[], T],
+        attempts: int = 4,
+        base_delay: float = 0.05
+) -> T:
+    """
+    Ejecuta `operation` (que debe hacer su propio commit) y, si MySQL
+    responde con deadlock o lock wait timeout, hace rollback y reintenta con
+    backoff exponencial + jitter. Si se agotan los intentos devuelve 503.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except DBAPIError as exc:
+            db.rollback()
+            if not is_retryable(exc):
+                raise
+            if attempt == attempts:
+                raise HTTPException(status_code=503, detail="Database busy, please retry")
+            time.sleep(base_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
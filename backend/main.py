@@ -1,14 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routers import employee_router, user_router, client_router, vehicle_router, maintenance_router, \
-    lease_router, invoice_router, incident_router, dashboard_router, auth_router
+    lease_router, invoice_router, incident_router, dashboard_router, auth_router, health_router, \
+    search_router, metrics_router
+from backend.data.database import engine, async_engine, slow_query_log
+from backend.services.metrics import MetricsMiddleware, instrument_pool, mark_process_dead
+from backend.services.passwords import password_hasher
+from backend.services.request_timing import RequestTimingMiddleware, TimedJSONResponse
 
 #todo: from routers import
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    password_hasher.start()
+    yield
+    password_hasher.shutdown()
+    mark_process_dead()
+    slow_query_log.shutdown()
+
+
 app = FastAPI(
     title="Sistema de Alquiler de Vehículos",
     description="API para gestión de alquileres",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
 )
 
 app.add_middleware(
@@ -17,7 +35,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
+# Último en agregarse = el más externo: el total incluye CORS y el resto
+app.add_middleware(RequestTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+instrument_pool(engine, "sync")
+instrument_pool(async_engine.sync_engine, "async")
+
 #todo: modelos según bd
 #todo: crear routers
 #todo: crear esquemas
@@ -32,6 +58,9 @@ app.include_router(invoice_router.router)
 app.include_router(incident_router.router)
 app.include_router(dashboard_router.router)
 app.include_router(auth_router.router) 
+app.include_router(health_router.router)
+app.include_router(search_router.router)
+app.include_router(metrics_router.router)
 
 @app.get("/")
 def root():
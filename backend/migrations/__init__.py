@@ -0,0 +1,15 @@
+# migrations/__init__.py
+"""
+Migraciones versionadas del esquema.
+
+Cada archivo de migrations/versions/ define VERSION (entero, único y
+creciente), DESCRIPTION, upgrade(conn) y downgrade(conn). La tabla
+schema_migrations guarda qué versiones ya se aplicaron.
+
+Uso:
+    python -m backend.migrations status
+    python -m backend.migrations upgrade [--to N]
+    python -m backend.migrations downgrade --to N
+    python -m backend.migrations check      # usa los índices cada consulta?
+"""
+from .runner import applied_versions, available_migrations, downgrade, upgrade
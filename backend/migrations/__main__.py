@@ -0,0 +1,51 @@
+# migrations/__main__.py
+import argparse
+import sys
+
+from backend.data.database import engine
+from backend.migrations import applied_versions, available_migrations, downgrade, upgrade
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Lista las migraciones y si están aplicadas")
+    up = commands.add_parser("upgrade", help="Aplica las migraciones pendientes")
+    up.add_argument("--to", type=int, default=None, help="Versión final (inclusive)")
+    down = commands.add_parser("downgrade", help="Revierte migraciones")
+    down.add_argument("--to", type=int, required=True, help="Versión que queda aplicada (0 = ninguna)")
+    commands.add_parser("check", help="Verifica con EXPLAIN que las consultas usen sus índices")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        done = applied_versions(engine)
+        for module in available_migrations():
+            mark = "x" if module.VERSION in done else " "
+            print(f"[{mark}] {module.VERSION:04d} {module.DESCRIPTION}")
+    elif args.command == "upgrade":
+        applied = upgrade(engine, args.to)
+        print(f"Applied: {applied}" if applied else "Nothing to apply")
+    elif args.command == "downgrade":
+        reverted = downgrade(engine, args.to)
+        print(f"Reverted: {reverted}" if reverted else "Nothing to revert")
+    elif args.command == "check":
+        from backend.migrations.plan_check import run_checks
+
+        failed = 0
+        for result in run_checks(engine):
+            if result["used"]:
+                state = "OK  "
+            elif result["possible"]:
+                state = "POSS"  # candidato, pero el optimizador eligió otro plan
+            else:
+                state = "FAIL"
+                failed += 1
+            # Cubierto por otro índice (p. ej. el implícito de una foreign key)
+            via = "" if result["accepted"] == [result["index"]] else f" accepted={result['accepted']}"
+            print(f"{state} {result['index']:<32} {result['query']:<36} plan={result['plan']}{via}")
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+# migrations/ops.py
+"""Operaciones de esquema idempotentes para usar dentro de las migraciones."""
+from sqlalchemy import Column, Index, MetaData, Table, inspect
+from sqlalchemy.engine import Connection
+
+
+def _index_columns(conn: Connection, table: str) -> dict[str, list[str]]:
+    inspector = inspect(conn)
+    return {ix["name"]: ix["column_names"] for ix in inspector.get_indexes(table)}
+
+
+def _index(table: str, name: str, columns: list[str], unique: bool = False) -> Index:
+    table_obj = Table(table, MetaData(), *(Column(c) for c in columns))
+    return Index(name, *(table_obj.c[c] for c in columns), unique=unique)
+
+
+def covering_indexes(conn: Connection, table: str, columns: list[str]) -> set[str]:
+    """
+    Índices de la tabla cuyas primeras columnas son exactamente éstas (el
+    pedido, uno más largo o el implícito que MySQL crea para una foreign key).
+    """
+    return {
+        ix_name for ix_name, cols in _index_columns(conn, table).items()
+        if cols[:len(columns)] == columns
+    }
+
+
+def create_index(conn: Connection, table: str, name: str, columns: list[str], unique: bool = False) -> bool:
+    """
+    Crea el índice salvo que ya exista uno con ese nombre o uno que lo cubra
+    (covering_indexes). Devuelve True si lo creó. Un índice UNIQUE sólo se
+    saltea por nombre: otro que cubra las columnas no garantiza la unicidad.
+    """
+    existing = _index_columns(conn, table)
+    if name in existing or (not unique and covering_indexes(conn, table, columns)):
+        return False
+    _index(table, name, columns, unique=unique).create(conn)
+    return True
+
+
+def drop_index(conn: Connection, table: str, name: str) -> bool:
+    """
+    Borra el índice si existe. Si era el único que servía a una foreign key
+    (MySQL descarta el índice implícito de la FK cuando se crea otro que la
+    cubre), antes crea uno simple para la FK; si no, MySQL rechaza el DROP.
+    """
+    existing = _index_columns(conn, table)
+    if name not in existing:
+        return False
+    columns = existing[name]
+    others = [cols for ix_name, cols in existing.items() if ix_name != name]
+    foreign_keys = inspect(conn).get_foreign_keys(table) if conn.dialect.name == "mysql" else []
+    for fk in foreign_keys:
+        fk_columns = fk["constrained_columns"]
+        if columns[:len(fk_columns)] != fk_columns:
+            continue
+        if not any(cols[:len(fk_columns)] == fk_columns for cols in others):
+            fk_name = f"ix_{table}_{'_'.join(fk_columns)}_fk".lower()
+            _index(table, fk_name, fk_columns).create(conn)
+            others.append(fk_columns)
+    _index(table, name, columns).drop(conn)
+    return True
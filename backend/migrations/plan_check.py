@@ -0,0 +1,116 @@
+# migrations/plan_check.py
+"""
+Verifica contra la base configurada que las consultas representativas de
+cada índice lo usen, mirando el plan (EXPLAIN en MySQL, EXPLAIN QUERY PLAN
+en SQLite).
+
+Con tablas casi vacías el optimizador de MySQL puede preferir un full scan;
+en ese caso el índice figura igual en possible_keys y se informa como tal.
+
+create_index no crea un índice si otro ya lo cubre (por ejemplo el implícito
+de una foreign key en MySQL, con otro nombre), así que vale cualquier índice
+cuyas primeras columnas sean las del índice esperado.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Engine
+
+from backend.migrations.ops import covering_indexes
+from backend.migrations.versions.m0001_performance_indexes import INDEXES
+
+from backend.models.client import Client
+from backend.models.employee import Employee  # noqa: F401  (relaciones de Incident y User)
+from backend.models.incident import Incident
+from backend.models.invoice import Invoice
+from backend.models.lease import Lease
+from backend.models.maintenance import Maintenance
+from backend.models.user import User
+from backend.models.vehicle import Vehicle
+
+_now = datetime(2025, 1, 1)
+
+# (índice esperado, consulta de la API que lo debería usar)
+CHECKS = [
+    ("ix_users_username", "login",
+     select(User.id, User.password).where(User.username == "admin")),
+    ("ix_leases_vehicle_state_start", "book_vehicle overlap",
+     select(Lease.id).where(
+         Lease.vehicleId == 1,
+         Lease.state.in_(("creado", "confirmado")),
+         Lease.date_time_start < _now,
+         Lease.date_time_end > _now,
+     )),
+    ("ix_leases_client_id", "read_leases?clientId",
+     select(Lease.id).where(Lease.clientId == 1).order_by(Lease.id).limit(101)),
+    ("ix_leases_state_id", "read_leases?state",
+     select(Lease.id).where(Lease.state == "finalizado").order_by(Lease.id).limit(101)),
+    ("ix_leases_date_create_id", "read_leases?date",
+     select(Lease.id).where(Lease.date_create == date(2025, 1, 1)).order_by(Lease.id).limit(101)),
+    ("ix_leases_start", "dashboard detailedRentals",
+     select(Lease.id).order_by(Lease.date_time_start.desc()).limit(10)),
+    ("ix_invoices_rental", "create_invoice existing invoice",
+     select(Invoice.id).where(Invoice.rentalId == 1)),
+    ("ix_invoices_status_issued", "dashboard monthlyRevenue",
+     select(func.sum(Invoice.total)).where(
+         Invoice.status == "pagada",
+         Invoice.issuedDate >= date(2025, 1, 1),
+         Invoice.issuedDate < date(2026, 1, 1),
+     )),
+    ("ix_invoices_status_id", "read_invoices?status",
+     select(Invoice.id).where(Invoice.status == "pendiente").order_by(Invoice.id).limit(101)),
+    ("ix_incidents_rental_cost", "invoice page incidents / lote sums",
+     select(Incident.rentalId, func.sum(Incident.cost))
+     .where(Incident.rentalId.in_((1, 2, 3))).group_by(Incident.rentalId)),
+    ("ix_maintenance_vehicle", "read_maintenances?vehicleId",
+     select(Maintenance.id).where(Maintenance.vehicleId == 1)),
+    ("ix_vehicles_estado", "KPI availableVehicles",
+     select(func.count(Vehicle.id)).where(Vehicle.estado == "disponible")),
+    ("ix_clients_status", "KPI activeClients",
+     select(func.count(Client.id)).where(Client.status == "activo")),
+]
+
+
+def explain(engine: Engine, statement) -> tuple[set[str], set[str]]:
+    """Índices usados y posibles según el plan de la consulta."""
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    used: set[str] = set()
+    possible: set[str] = set()
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+                detail = row[-1]
+                if " INDEX " in detail:
+                    used.add(detail.split(" INDEX ", 1)[1].split(" ")[0])
+        else:
+            for row in conn.execute(text(f"EXPLAIN {sql}")).mappings():
+                if row.get("key"):
+                    used.update(row["key"].split(","))
+                if row.get("possible_keys"):
+                    possible.update(row["possible_keys"].split(","))
+    return used, possible | used
+
+
+# índice esperado -> (tabla, columnas), según la migración que lo crea
+EXPECTED = {name: (table, columns) for table, name, columns in INDEXES}
+
+
+def run_checks(engine: Engine) -> list[dict]:
+    results = []
+    with engine.connect() as conn:
+        accepted = {
+            index: covering_indexes(conn, *EXPECTED[index])
+            for index, _, _ in CHECKS
+        }
+    for index, query_name, statement in CHECKS:
+        used, possible = explain(engine, statement)
+        results.append({
+            "index": index,
+            "query": query_name,
+            "used": bool(accepted[index] & used),
+            "possible": bool(accepted[index] & possible),
+            # Índices que cumplen el papel del esperado (puede ser otro nombre)
+            "accepted": sorted(accepted[index]),
+            "plan": sorted(used),
+        })
+    return results
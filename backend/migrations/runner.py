@@ -0,0 +1,81 @@
+# migrations/runner.py
+import importlib
+import pkgutil
+from datetime import datetime
+from types import ModuleType
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, insert, select
+from sqlalchemy.engine import Engine
+
+from . import versions
+
+_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def available_migrations() -> list[ModuleType]:
+    """Módulos de migrations/versions ordenados por VERSION."""
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions.__path__)
+    ]
+    modules.sort(key=lambda m: m.VERSION)
+    seen = set()
+    for module in modules:
+        if module.VERSION in seen:
+            raise RuntimeError(f"Duplicated migration version {module.VERSION} ({module.__name__})")
+        seen.add(module.VERSION)
+    return modules
+
+
+def applied_versions(engine: Engine) -> set[int]:
+    _metadata.create_all(engine)
+    with engine.connect() as conn:
+        return set(conn.scalars(select(schema_migrations.c.version)))
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> list[int]:
+    """
+    Aplica en orden las migraciones pendientes hasta `target` (inclusive).
+
+    Cada migración corre en su propia transacción junto con el registro en
+    schema_migrations. Ojo: en MySQL el DDL hace commit implícito, por eso las
+    operaciones de ops.py son idempotentes y una migración que falló a la
+    mitad se puede volver a correr.
+    """
+    done = applied_versions(engine)
+    applied = []
+    for module in available_migrations():
+        if module.VERSION in done or (target is not None and module.VERSION > target):
+            continue
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(insert(schema_migrations).values(
+                version=module.VERSION,
+                description=module.DESCRIPTION,
+                applied_at=datetime.now(),
+            ))
+        applied.append(module.VERSION)
+    return applied
+
+
+def downgrade(engine: Engine, target: int) -> list[int]:
+    """Revierte, de la más nueva a la más vieja, las migraciones aplicadas mayores a `target`."""
+    done = applied_versions(engine)
+    reverted = []
+    for module in reversed(available_migrations()):
+        if module.VERSION not in done or module.VERSION <= target:
+            continue
+        with engine.begin() as conn:
+            module.downgrade(conn)
+            conn.execute(delete(schema_migrations).where(schema_migrations.c.version == module.VERSION))
+        reverted.append(module.VERSION)
+    return reverted
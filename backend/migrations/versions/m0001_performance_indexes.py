@@ -0,0 +1,52 @@
+# migrations/versions/m0001_performance_indexes.py
+"""
+Índices secundarios para los filtros reales de la API.
+
+- Users(username): login.
+- Leases(vehicleId, state, date_time_start): chequeo de solapamiento al
+  reservar y carga del índice de disponibilidad.
+- Leases(clientId, id), (state, id), (date_create, id): filtros de
+  read_leases con paginación por id.
+- Leases(date_time_start): últimos alquileres del dashboard y exportación.
+- Invoices(rentalId): facturas de un alquiler (y anti-join de /facturas/lote).
+- Invoices(status, issuedDate): ingresos por mes y KPI de ingresos.
+- Invoices(status, id): read_invoices filtrado por estado.
+- Incidents(rentalId, cost): incidentes de una página de facturas y suma
+  agrupada por alquiler sin leer la tabla.
+- Maintenance(vehicleId): mantenimientos de un vehículo.
+- Vehicles(estado), Clients(status): KPIs del dashboard.
+
+Las mismas definiciones están en __table_args__ de cada modelo.
+"""
+from sqlalchemy.engine import Connection
+
+from backend.migrations.ops import create_index, drop_index
+
+VERSION = 1
+DESCRIPTION = "performance index pack"
+
+INDEXES = [
+    ("Users", "ix_users_username", ["username"]),
+    ("Leases", "ix_leases_vehicle_state_start", ["vehicleId", "state", "date_time_start"]),
+    ("Leases", "ix_leases_client_id", ["clientId", "id"]),
+    ("Leases", "ix_leases_state_id", ["state", "id"]),
+    ("Leases", "ix_leases_date_create_id", ["date_create", "id"]),
+    ("Leases", "ix_leases_start", ["date_time_start"]),
+    ("Invoices", "ix_invoices_rental", ["rentalId"]),
+    ("Invoices", "ix_invoices_status_issued", ["status", "issuedDate"]),
+    ("Invoices", "ix_invoices_status_id", ["status", "id"]),
+    ("Incidents", "ix_incidents_rental_cost", ["rentalId", "cost"]),
+    ("Maintenance", "ix_maintenance_vehicle", ["vehicleId"]),
+    ("Vehicles", "ix_vehicles_estado", ["estado"]),
+    ("Clients", "ix_clients_status", ["status"]),
+]
+
+
+def upgrade(conn: Connection):
+    for table, name, columns in INDEXES:
+        create_index(conn, table, name, columns)
+
+
+def downgrade(conn: Connection):
+    for table, name, _ in reversed(INDEXES):
+        drop_index(conn, table, name)
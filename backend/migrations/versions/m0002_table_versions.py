@@ -0,0 +1,22 @@
+# migrations/versions/m0002_table_versions.py
+"""
+Tabla TableVersions: versión compartida por todos los workers de cada
+listado con GET condicional (ETag / Last-Modified). Las filas las crea la
+primera escritura de cada tabla.
+
+La misma definición está en models/table_version.py.
+"""
+from sqlalchemy.engine import Connection
+
+from backend.models.table_version import TableVersion
+
+VERSION = 2
+DESCRIPTION = "shared table versions for conditional GETs"
+
+
+def upgrade(conn: Connection):
+    TableVersion.__table__.create(conn, checkfirst=True)
+
+
+def downgrade(conn: Connection):
+    TableVersion.__table__.drop(conn, checkfirst=True)
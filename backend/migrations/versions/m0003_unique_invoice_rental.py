@@ -0,0 +1,29 @@
+# migrations/versions/m0003_unique_invoice_rental.py
+"""
+Una factura por alquiler también a nivel base: UNIQUE en Invoices(rentalId).
+
+El chequeo de /facturas/lote (anti-join con FOR UPDATE sobre Leases) no
+bloquea las facturas, así que bajo REPEATABLE READ dos lotes simultáneos
+podían ver el mismo alquiler sin factura. Con el índice único el segundo
+INSERT falla y el lote se recalcula. Reemplaza a ix_invoices_rental (mismas
+columnas); la definición está en models/invoice.py.
+
+Si la base ya tiene alquileres facturados dos veces la migración falla:
+hay que anular y borrar los duplicados antes de correrla.
+"""
+from sqlalchemy.engine import Connection
+
+from backend.migrations.ops import create_index, drop_index
+
+VERSION = 3
+DESCRIPTION = "unique invoice per lease"
+
+
+def upgrade(conn: Connection):
+    create_index(conn, "Invoices", "ux_invoices_rental", ["rentalId"], unique=True)
+    drop_index(conn, "Invoices", "ix_invoices_rental")
+
+
+def downgrade(conn: Connection):
+    drop_index(conn, "Invoices", "ux_invoices_rental")
+    create_index(conn, "Invoices", "ix_invoices_rental", ["rentalId"])
@@ -1,11 +1,15 @@
 from sqlalchemy.orm import relationship
 
 from backend.data.database import Base
-from sqlalchemy import Integer, String, Column
+from sqlalchemy import Integer, String, Column, Index
 
 
 class Client(Base):
     __tablename__ = 'Clients'
+    # Índices secundarios (migrations/versions/m0001_performance_indexes.py)
+    __table_args__ = (
+        Index("ix_clients_status", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(255))
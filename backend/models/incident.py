@@ -1,11 +1,15 @@
 # models/incident.py
 from sqlalchemy.orm import relationship
 from backend.data.database import Base
-from sqlalchemy import Integer, String, Column, ForeignKey, DATE, DECIMAL
+from sqlalchemy import Integer, String, Column, ForeignKey, DATE, DECIMAL, Index
 
 
 class Incident(Base):
     __tablename__ = 'Incidents'
+    # Índices secundarios (migrations/versions/m0001_performance_indexes.py)
+    __table_args__ = (
+        Index("ix_incidents_rental_cost", "rentalId", "cost"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     rentalId = Column(Integer, ForeignKey('Leases.id'), nullable=False)
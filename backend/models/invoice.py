@@ -1,11 +1,18 @@
 # models/invoice.py
 from sqlalchemy.orm import relationship
 from backend.data.database import Base
-from sqlalchemy import Integer, String, Column, ForeignKey, DATE, DECIMAL
+from sqlalchemy import Integer, String, Column, ForeignKey, DATE, DECIMAL, Index
 
 
 class Invoice(Base):
     __tablename__ = 'Invoices'
+    # Índices secundarios (migrations/versions/m0001_performance_indexes.py);
+    # una factura por alquiler (m0003_unique_invoice_rental.py)
+    __table_args__ = (
+        Index("ux_invoices_rental", "rentalId", unique=True),
+        Index("ix_invoices_status_issued", "status", "issuedDate"),
+        Index("ix_invoices_status_id", "status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     rentalId = Column(Integer, ForeignKey('Leases.id'), nullable=False)
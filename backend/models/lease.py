@@ -1,11 +1,19 @@
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.mysql import DATETIME
 from backend.data.database import Base
-from sqlalchemy import Integer, String, Column, ForeignKey, DECIMAL, DATE
+from sqlalchemy import Integer, String, Column, ForeignKey, DECIMAL, DATE, Index
 
 
 class Lease(Base):
     __tablename__ = 'Leases'
+    # Índices secundarios (migrations/versions/m0001_performance_indexes.py)
+    __table_args__ = (
+        Index("ix_leases_vehicle_state_start", "vehicleId", "state", "date_time_start"),
+        Index("ix_leases_client_id", "clientId", "id"),
+        Index("ix_leases_state_id", "state", "id"),
+        Index("ix_leases_date_create_id", "date_create", "id"),
+        Index("ix_leases_start", "date_time_start"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     clientId = Column(Integer, ForeignKey('Clients.id'), nullable=False)
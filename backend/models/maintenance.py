@@ -2,11 +2,15 @@ from sqlalchemy.dialects.mysql import DATETIME
 from sqlalchemy.orm import relationship
 
 from backend.data.database import Base
-from sqlalchemy import Integer, String, Column, ForeignKey, DECIMAL
+from sqlalchemy import Integer, String, Column, ForeignKey, DECIMAL, Index
 
 
 class Maintenance(Base):
     __tablename__ = 'Maintenance'
+    # Índices secundarios (migrations/versions/m0001_performance_indexes.py)
+    __table_args__ = (
+        Index("ix_maintenance_vehicle", "vehicleId"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     vehicleId = Column(Integer, ForeignKey('Vehicles.id'), nullable=True)
@@ -0,0 +1,12 @@
+# models/table_version.py
+from backend.data.database import Base
+from sqlalchemy import Integer, String, Column
+
+
+class TableVersion(Base):
+    """Versión de los listados con GET condicional (services/table_versions.py)."""
+    __tablename__ = 'TableVersions'
+
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    modified = Column(Integer, nullable=False)  # Última escritura, en segundos epoch
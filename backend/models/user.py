@@ -1,11 +1,15 @@
 from sqlalchemy.orm import relationship
 
 from backend.data.database import Base
-from sqlalchemy import Integer, String, Column, ForeignKey
+from sqlalchemy import Integer, String, Column, ForeignKey, Index
 
 
 class User(Base):
     __tablename__ = 'Users'
+    # Índices secundarios (migrations/versions/m0001_performance_indexes.py)
+    __table_args__ = (
+        Index("ix_users_username", "username"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     id_employee = Column(Integer, ForeignKey('Employees.id'), nullable=True)
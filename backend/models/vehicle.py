@@ -1,10 +1,14 @@
 from sqlalchemy.orm import relationship
 
 from backend.data.database import Base
-from sqlalchemy import Integer, String, Column, ForeignKey, DECIMAL
+from sqlalchemy import Integer, String, Column, ForeignKey, DECIMAL, Index
 
 class Vehicle(Base):
     __tablename__ = 'Vehicles'
+    # Índices secundarios (migrations/versions/m0001_performance_indexes.py)
+    __table_args__ = (
+        Index("ix_vehicles_estado", "estado"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     brand = Column(String(255))
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.data.database import get_db
+from backend.data.database import get_async_db
 from backend.models.user import User
-from backend.schemas.auth_schemas import LoginRequest, LoginResponse
-
-# Password hashing context (same as user_router)
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from backend.models.employee import Employee
+from backend.schemas.auth_schemas import LoginRequest, LoginResponse, RefreshRequest, TokenResponse
+from backend.services.passwords import password_hasher
+from backend.services.tokens import (
+    REFRESH, TokenError, TokenUser, is_admin_cargo, require_user, token_service
+)
 
 router = APIRouter(
     prefix="/auth",
@@ -16,17 +18,25 @@ router = APIRouter(
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate a user with username and password.
     
     - **username**: The user's username
     - **password**: The user's password (will be verified against hashed password in DB)
     
-    Returns user information if authentication is successful.
+    Returns user information plus an access token and a refresh token.
+    Responds 503 if the password hashing pool is saturated.
     """
-    # Find user by username
-    user = db.query(User).filter(User.username == credentials.username).first()
+    # Find user by username (with the employee name, no lazy loads)
+    user = (await db.execute(
+        select(
+            User.id, User.id_employee, User.username, User.password,
+            Employee.name.label("employeeName"), Employee.cargo
+        )
+        .outerjoin(Employee, Employee.id == User.id_employee)
+        .where(User.username == credentials.username)
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -34,17 +44,65 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
             detail="Usuario o contraseña incorrectos"
         )
     
-    # Verify password against hashed password in database
-    if not password_context.verify(credentials.password, user.password):
+    # Verify password against hashed password in database (bcrypt runs in the process pool)
+    if not await password_hasher.verify_async(credentials.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos"
         )
     
-    # Return user data (similar to UserResponse)
+    # Return user data (similar to UserResponse) plus the tokens
+    admin = is_admin_cargo(user.cargo)
     return {
         "userId": user.id,
         "employeeId": user.id_employee,
         "username": user.username,
-        "employeeName": user.employee.name if user.employee else None
-    }
\ No newline at end of file
+        "employeeName": user.employeeName,
+        "cargo": user.cargo,
+        "isAdmin": admin,
+        **token_service.issue_pair(user.id, user.id_employee, user.username, admin)
+    }
+
+
+def decode_refresh_token(token: str) -> TokenUser:
+    try:
+        return token_service.decode(token, REFRESH)
+    except (TokenError, KeyError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(data: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchange a refresh token for a new token pair. The used refresh token is
+    revoked (rotation). The user is read again so that deleted users or
+    cargo changes take effect on the next refresh.
+    """
+    claims = decode_refresh_token(data.refreshToken)
+
+    user = (await db.execute(
+        select(User.id, User.id_employee, User.username, Employee.cargo)
+        .outerjoin(Employee, Employee.id == User.id_employee)
+        .where(User.id == claims.userId)
+    )).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+
+    token_service.revoke(claims)
+    return token_service.issue_pair(user.id, user.id_employee, user.username, is_admin_cargo(user.cargo))
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(data: RefreshRequest, current: TokenUser = Depends(require_user)):
+    """Revoke the current access token and the given refresh token."""
+    token_service.revoke(current)
+    claims = decode_refresh_token(data.refreshToken)
+    if claims.userId == current.userId:
+        token_service.revoke(claims)
+    return
\ No newline at end of file
@@ -5,15 +5,19 @@ from typing import Optional
 
 from backend.data.database import get_db
 from backend.models.client import Client
+from backend.services.kpi_store import kpi_store
+from backend.services.search import search_index
+from backend.services.table_versions import bump_on_write, conditional_get
 from backend.schemas.client_schemas import ClientCreate, ClientResponse, ClientUpdate, ClientStatusUpdate
 
 router = APIRouter(
     prefix="/clientes",
+    dependencies=[Depends(bump_on_write("clients"))],
     tags=["clientes"],
 )
 
 
-@router.get("/", response_model=list[ClientResponse])
+@router.get("/", response_model=list[ClientResponse], dependencies=[Depends(conditional_get("clients"))])
 def read_clients(
         skip: int = 0,
         limit: int = 100,
@@ -51,6 +55,8 @@ def create_client(client: ClientCreate, db: Session = Depends(get_db)):
     db.add(db_client)
     db.commit()
     db.refresh(db_client)
+    kpi_store.client_status_changed(None, db_client.status)
+    search_index.sync("clients", db_client)
     return db_client
 
 
@@ -60,12 +66,15 @@ def update_client(id_cliente: int, client: ClientUpdate, db: Session = Depends(g
     if not db_client:
         raise HTTPException(status_code=404, detail="Client not found")
 
+    old_status = db_client.status
     update_data = client.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_client, field, value)
 
     db.commit()
     db.refresh(db_client)
+    kpi_store.client_status_changed(old_status, db_client.status)
+    search_index.sync("clients", db_client)
     return db_client
 
 
@@ -79,9 +88,11 @@ def update_client_status(id_cliente: int, status_update: ClientStatusUpdate, db:
     if status_update.status not in ["activo", "inactivo"]:
         raise HTTPException(status_code=400, detail="Status must be 'activo' or 'inactivo'")
 
+    old_status = db_client.status
     db_client.status = status_update.status
     db.commit()
     db.refresh(db_client)
+    kpi_store.client_status_changed(old_status, db_client.status)
     return db_client
 
 
@@ -92,6 +103,8 @@ def delete_client(id_cliente: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Client not found")
 
     # Baja lógica: cambiar estado a inactivo
+    old_status = db_client.status
     db_client.status = "inactivo"
     db.commit()
+    kpi_store.client_status_changed(old_status, "inactivo")
     return
\ No newline at end of file
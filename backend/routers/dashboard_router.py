@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from datetime import datetime
-from typing import List, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, extract, select
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Optional
 
-from backend.data.database import get_db
+from backend.data.database import AsyncSessionLocal, get_async_db
 from backend.models.lease import Lease
 from backend.models.client import Client
 from backend.models.vehicle import Vehicle
 from backend.models.invoice import Invoice
+from backend.schemas.dashboard_schemas import UtilizationResponse
+from backend.services.dashboard_cache import dashboard_cache
+from backend.services.fast_json import fast_json
+from backend.services.kpi_store import kpi_store, load_kpis
+from backend.services.utilization import fleet_utilization
 
 router = APIRouter(
     prefix="/dashboard",
@@ -17,50 +22,64 @@ router = APIRouter(
 
 
 @router.get("/", response_model=dict)
-def get_dashboard_data(db: Session = Depends(get_db)):
-   
-    # Ingresos totales
-    total_revenue = db.query(func.sum(Invoice.total)).filter(
-        Invoice.status == "pagada"
-    ).scalar() or 0
-    
-    # Cantidad de alquileres
-    total_rentals = db.query(func.count(Lease.id)).scalar() or 0
-    
-    # Cantidad de clientes
-    active_clients = db.query(func.count(Client.id.distinct())).filter(
-        Client.status == "activo"
-    ).scalar() or 0
-    
-    # Cantidad de vehiculos disponibles
-    available_vehicles = db.query(func.count(Vehicle.id)).filter(
-        Vehicle.estado == "disponible"
-    ).scalar() or 0
-    
-    total_vehicles = db.query(func.count(Vehicle.id)).filter(Vehicle.estado != "baja").scalar() or 0
+async def get_dashboard_data():
+    """Datos del dashboard, cacheados (ver services/dashboard_cache.py)."""
+    return await dashboard_cache.get(compute_dashboard_data)
+
+
+async def compute_dashboard_data() -> dict:
+    """
+    El cálculo compartido abre su propia sesión: puede seguir corriendo
+    después de que termine (o se cancele) el pedido que lo disparó.
+    """
+    async with AsyncSessionLocal() as db:
+        return await build_dashboard_data(db)
+
+
+UTILIZATION_DEFAULT_DAYS = 30
+UTILIZATION_MAX_DAYS = 731
+
+
+@router.get("/utilizacion", response_model=UtilizationResponse)
+async def get_fleet_utilization(
+        desde: Optional[date] = Query(None, description="Primer día del rango (por defecto, 30 días antes de 'hasta')"),
+        hasta: Optional[date] = Query(None, description="Último día del rango, inclusive (por defecto, hoy)"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Ocupación por vehículo y por modelo: % de utilización, días ociosos e ingresos por día disponible."""
+    hasta = hasta or date.today()
+    desde = desde or hasta - timedelta(days=UTILIZATION_DEFAULT_DAYS - 1)
+    if hasta < desde:
+        raise HTTPException(status_code=400, detail="'hasta' must not be before 'desde'")
+    if (hasta - desde).days + 1 > UTILIZATION_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range cannot exceed {UTILIZATION_MAX_DAYS} days")
+    return fast_json(await fleet_utilization(db, desde, hasta), UtilizationResponse)
+
 
-    kpis = {
-        "totalRevenue": float(total_revenue),
-        "totalRentals": total_rentals,
-        "activeClients": active_clients,
-        "availableVehicles": available_vehicles,
-        "totalVehicles": total_vehicles
-    }
+async def build_dashboard_data(db: AsyncSession) -> dict:
+   
+    # KPIs: se mantienen en memoria y se reconcilian con la base periódicamente
+    if kpi_store.needs_reconcile():
+        kpi_store.seed(await load_kpis(db))
+    kpis = kpi_store.snapshot()
+    total_rentals = kpis["totalRentals"]
     
     # Ingresos de cada mes del anio actual
     current_year = datetime.now().year
     months_names = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", 
                     "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
     
-    monthly_data = db.query(
+    monthly_data = (await db.execute(select(
         extract('month', Invoice.issuedDate).label('month'),
         func.sum(Invoice.total).label('total')
-    ).filter(
-        extract('year', Invoice.issuedDate) == current_year,
-        Invoice.status == "pagada"
+    ).where(
+        # Rango sobre la columna (no extract) para usar ix_invoices_status_issued
+        Invoice.status == "pagada",
+        Invoice.issuedDate >= date(current_year, 1, 1),
+        Invoice.issuedDate < date(current_year + 1, 1, 1)
     ).group_by(
         extract('month', Invoice.issuedDate)
-    ).all()
+    ))).all()
     
     monthly_dict = {int(month): float(total) for month, total in monthly_data}
     
@@ -73,17 +92,29 @@ def get_dashboard_data(db: Session = Depends(get_db)):
     ]
     
     # Popular Vehicles (top 3 + others)
-    vehicle_rentals = db.query(
-        Vehicle.brand,
-        Vehicle.model,
+    # Se agrupa sobre Leases (índice por vehicleId) y después se unen
+    # únicamente los 3 vehículos ganadores. El join con Vehicle va antes del
+    # LIMIT: un vehículo borrado no puede ocupar un lugar del top 3
+    top_vehicles = select(
+        Lease.vehicleId,
         func.count(Lease.id).label('rental_count')
     ).join(
-        Lease, Vehicle.id == Lease.vehicleId
+        Vehicle, Vehicle.id == Lease.vehicleId
     ).group_by(
-        Vehicle.id, Vehicle.brand, Vehicle.model
+        Lease.vehicleId
     ).order_by(
         func.count(Lease.id).desc()
-    ).limit(3).all()
+    ).limit(3).subquery()
+
+    vehicle_rentals = (await db.execute(select(
+        Vehicle.brand,
+        Vehicle.model,
+        top_vehicles.c.rental_count
+    ).join(
+        Vehicle, Vehicle.id == top_vehicles.c.vehicleId
+    ).order_by(
+        top_vehicles.c.rental_count.desc()
+    ))).all()
     
     popular_vehicles = []
     for vehicle in vehicle_rentals:
@@ -102,26 +133,34 @@ def get_dashboard_data(db: Session = Depends(get_db)):
             "rentals": otros_count
         })
     
-    # Detalles de los ultimos 10 alquileres con factura
-    leases_with_invoices = db.query(Lease).join(
+    # Detalles de los ultimos 10 alquileres con factura (una sola consulta)
+    leases_with_invoices = (await db.execute(select(
+        Lease.id,
+        Lease.date_time_start,
+        Lease.date_time_end,
+        Client.name.label('client_name'),
+        Vehicle.brand,
+        Vehicle.model,
+        Invoice.total
+    ).join(
         Invoice, Lease.id == Invoice.rentalId
+    ).outerjoin(
+        Client, Client.id == Lease.clientId
+    ).outerjoin(
+        Vehicle, Vehicle.id == Lease.vehicleId
     ).order_by(
         Lease.date_time_start.desc()
-    ).limit(10).all()
+    ).limit(10))).all()
     
     detailed_rentals = []
     for lease in leases_with_invoices:
-        client = db.query(Client).filter(Client.id == lease.clientId).first()
-        vehicle = db.query(Vehicle).filter(Vehicle.id == lease.vehicleId).first()
-        invoice = db.query(Invoice).filter(Invoice.rentalId == lease.id).first()
-        
         detailed_rentals.append({
-            "clientName": client.name if client else "Unknown",
+            "clientName": lease.client_name if lease.client_name is not None else "Unknown",
             "rentalId": f"r{lease.id:03d}",
-            "vehicleName": f"{vehicle.brand} {vehicle.model}" if vehicle else "Unknown",
+            "vehicleName": f"{lease.brand} {lease.model}" if lease.brand is not None else "Unknown",
             "startDate": lease.date_time_start.date().isoformat(),
             "endDate": lease.date_time_end.date().isoformat(),
-            "total": float(invoice.total) if invoice else 0
+            "total": float(lease.total or 0)
         })
     
     return {
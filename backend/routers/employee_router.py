@@ -3,15 +3,17 @@ from sqlalchemy.orm import Session
 
 from backend.data.database import get_db
 from backend.models.employee import Employee
+from backend.services.table_versions import bump_on_write, conditional_get
 from backend.schemas.employee_schemas import EmployeeCreate, EmployeeResponse, EmployeeUpdate
 
 router = APIRouter(
     prefix="/empleados",
+    dependencies=[Depends(bump_on_write("employees"))],
     tags=["empleados"],
 )
 
 
-@router.get("/", response_model=list[EmployeeResponse])
+@router.get("/", response_model=list[EmployeeResponse], dependencies=[Depends(conditional_get("employees"))])
 def read_employees(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     employees = db.query(Employee).offset(skip).limit(limit).all()
     return employees
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, status
+
+from backend.data.database import engine, async_engine, pool_stats, async_pool_stats, slow_query_log
+from backend.data.config import settings
+from backend.services.dashboard_cache import dashboard_cache
+from backend.services.passwords import password_hasher
+from backend.services.tokens import require_admin
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+
+@router.get("/db", response_model=dict)
+def db_health():
+    """Estado de los pools de conexiones (sync y async) con datos de los eventos del pool."""
+    return {
+        "config": {
+            "poolSize": settings.DB_POOL_SIZE,
+            "maxOverflow": settings.DB_MAX_OVERFLOW,
+            "poolTimeout": settings.DB_POOL_TIMEOUT,
+            "poolRecycle": settings.DB_POOL_RECYCLE,
+            "prePing": settings.DB_POOL_PRE_PING,
+        },
+        "sync": pool_stats.snapshot(engine.pool),
+        "async": async_pool_stats.snapshot(async_engine.pool),
+    }
+
+
+@router.get("/cache", response_model=dict)
+def cache_health():
+    """Hits, misses y pedidos coalescidos de los caches en memoria."""
+    return {
+        "dashboard": dashboard_cache.stats(),
+    }
+
+
+@router.get("/passwords", response_model=dict)
+def passwords_health():
+    """Pool de procesos de bcrypt: ocupación, rechazos, duración del hash y espera en cola."""
+    return password_hasher.stats()
+
+
+@router.get("/slow-queries", response_model=dict, dependencies=[Depends(require_admin)])
+def slow_queries():
+    """
+    Últimas consultas más lentas que SLOW_QUERY_MS: forma de la sentencia,
+    parámetros redactados, duración, ruta que la ejecutó y plan (EXPLAIN).
+    """
+    return {
+        **slow_query_log.stats(),
+        "queries": slow_query_log.entries(),
+    }
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
+def clear_slow_queries():
+    """Vacía el registro, por ejemplo antes de medir un cambio."""
+    slow_query_log.clear()
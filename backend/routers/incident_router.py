@@ -1,6 +1,6 @@
 # routers/incidents.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, joinedload
 from typing import Optional
 from datetime import date
 from decimal import Decimal
@@ -9,6 +9,8 @@ from backend.data.database import get_db
 from backend.models.incident import Incident
 from backend.models.lease import Lease
 from backend.models.employee import Employee
+from backend.services.fast_json import fast_json
+from backend.services.pagination import apply_page, finish_page
 from backend.schemas.incident_schemas import (
     IncidentCreate, IncidentResponse, IncidentUpdate
 )
@@ -19,19 +21,45 @@ router = APIRouter(
 )
 
 
+# Empleado y estado del alquiler en el mismo SELECT (sin un lazy load por fila)
+INCIDENT_RELATIONS = (
+    joinedload(Incident.employee).load_only(Employee.name),
+    joinedload(Incident.lease).load_only(Lease.state),
+)
+
+
+def incident_to_dict(incident: Incident) -> dict:
+    """Incidente con la forma de IncidentResponse, listo para fast_json."""
+    return {
+        "id": incident.id,
+        "rentalId": incident.rentalId,
+        "employeeId": incident.employeeId,
+        "clientName": incident.clientName,
+        "vehicleName": incident.vehicleName,
+        "type": incident.type,
+        "description": incident.description,
+        "cost": incident.cost,
+        "date": incident.date,
+        "employeeName": incident.employee.name if incident.employee else None,
+        "leaseState": incident.lease.state if incident.lease else None
+    }
+
+
 @router.get("/", response_model=list[IncidentResponse])
 def read_incidents(
+        response: Response,
         skip: int = 0,
         limit: int = 100,
         rentalId: Optional[int] = Query(None, description="Filter by lease ID"),
         employeeId: Optional[int] = Query(None, description="Filter by employee ID"),
         type: Optional[str] = Query(None, description="Filter by incident type"),
         date: Optional[date] = Query(None, description="Filter by date"),
+        cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor"),
         db: Session = Depends(get_db)
 ):
-    """Lista con filtros por: alquiler, empleado, tipo, fecha."""
-    query = db.query(Incident)
-    
+    """Lista con filtros por: alquiler, empleado, tipo, fecha. Admite paginación por cursor."""
+    query = db.query(Incident).options(*INCIDENT_RELATIONS)
+
     # Apply filters
     if rentalId:
         query = query.filter(Incident.rentalId == rentalId)
@@ -42,47 +70,21 @@ def read_incidents(
     if date:
         query = query.filter(Incident.date == date)
     
-    incidents = query.offset(skip).limit(limit).all()
+    incidents = apply_page(query, Incident.id, cursor, skip, limit).all()
+    incidents = finish_page(incidents, limit, response)
     
-    # Convert to response models
-    return [
-        IncidentResponse(
-            id=incident.id,
-            rentalId=incident.rentalId,
-            employeeId=incident.employeeId,
-            clientName=incident.clientName,
-            vehicleName=incident.vehicleName,
-            type=incident.type,
-            description=incident.description,
-            cost=incident.cost,
-            date=incident.date,
-            employeeName=incident.employee.name if incident.employee else None,
-            leaseState=incident.lease.state if incident.lease else None
-        )
-        for incident in incidents
-    ]
+    return fast_json([incident_to_dict(incident) for incident in incidents], list[IncidentResponse],
+                     response=response)
 
 
 @router.get("/{id_incidente}", response_model=IncidentResponse)
 def read_incident(id_incidente: int, db: Session = Depends(get_db)):
     """Detalle del incidente."""
-    incident = db.query(Incident).filter(Incident.id == id_incidente).first()
+    incident = db.query(Incident).options(*INCIDENT_RELATIONS).filter(Incident.id == id_incidente).first()
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
 
-    return {
-        "id": incident.id,
-        "rentalId": incident.rentalId,
-        "employeeId": incident.employeeId,
-        "clientName": incident.clientName,
-        "vehicleName": incident.vehicleName,
-        "type": incident.type,
-        "description": incident.description,
-        "cost": incident.cost,
-        "date": incident.date,
-        "employeeName": incident.employee.name if incident.employee else None,
-        "leaseState": incident.lease.state if incident.lease else None
-    }
+    return fast_json(incident_to_dict(incident), IncidentResponse)
 
 
 @router.post("/", response_model=IncidentResponse, status_code=status.HTTP_201_CREATED)
@@ -122,19 +124,7 @@ def create_incident(incident: IncidentCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(db_incident)
 
-    return {
-        "id": db_incident.id,
-        "rentalId": db_incident.rentalId,
-        "employeeId": db_incident.employeeId,
-        "clientName": db_incident.clientName,
-        "vehicleName": db_incident.vehicleName,
-        "type": db_incident.type,
-        "description": db_incident.description,
-        "cost": db_incident.cost,
-        "date": db_incident.date,
-        "employeeName": db_incident.employee.name if db_incident.employee else None,
-        "leaseState": db_incident.lease.state if db_incident.lease else None
-    }
+    return fast_json(incident_to_dict(db_incident), IncidentResponse, status.HTTP_201_CREATED)
 
 
 @router.put("/{id_incidente}", response_model=IncidentResponse)
@@ -161,19 +151,7 @@ def update_incident(id_incidente: int, incident: IncidentUpdate, db: Session = D
     db.commit()
     db.refresh(db_incident)
 
-    return {
-        "id": db_incident.id,
-        "rentalId": db_incident.rentalId,
-        "employeeId": db_incident.employeeId,
-        "clientName": db_incident.clientName,
-        "vehicleName": db_incident.vehicleName,
-        "type": db_incident.type,
-        "description": db_incident.description,
-        "cost": db_incident.cost,
-        "date": db_incident.date,
-        "employeeName": db_incident.employee.name if db_incident.employee else None,
-        "leaseState": db_incident.lease.state if db_incident.lease else None
-    }
+    return fast_json(incident_to_dict(db_incident), IncidentResponse)
 
 @router.delete("/{id_incidente}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_incident(id_incidente: int, db: Session = Depends(get_db)):
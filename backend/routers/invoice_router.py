@@ -1,118 +1,274 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, insert, func, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import date
 from decimal import Decimal
 
-from backend.data.database import get_db
+from backend.data.database import get_db, get_async_db
+from backend.data.transactions import begin_locked_write, run_with_retry
 from backend.models.invoice import Invoice
 from backend.models.lease import Lease
+from backend.models.client import Client
 from backend.models.incident import Incident
+from backend.models.vehicle import Vehicle
+from backend.services.kpi_store import kpi_store
+from backend.services.dashboard_cache import invalidate_dashboard_on_write
+from backend.services.metrics import invoices_paid, invoices_paid_amount
+from backend.services.pagination import apply_page, finish_page
+from backend.services.search import search_index
 from backend.schemas.invoice_schemas import (
     InvoiceCreate, InvoiceResponse, InvoiceUpdate,
-    InvoicePay, InvoiceCancel
+    InvoicePay, InvoiceCancel,
+    InvoiceBatchCreate, InvoiceBatchResponse
 )
 
 router = APIRouter(
     prefix="/facturas",
+    dependencies=[Depends(invalidate_dashboard_on_write)],
     tags=["facturas"],
 )
 
-# --- Helper Function ---
-def format_invoice_response(invoice: Invoice, db: Session) -> dict:
+# --- Helper Functions ---
+def invoice_details_queries(rental_ids):
     """
-    Construye la respuesta completa de la factura, incluyendo detalles
-    del alquiler y la lista de incidentes asociados.
+    Las dos consultas que necesita format_invoices para una página completa:
+    datos del alquiler + vehículo, e incidentes, para todos los rentalIds.
     """
-    # 1. Obtener el alquiler asociado (Lease)
-    lease = invoice.lease
-    
-    # 2. Obtener incidentes asociados a este alquiler
-    # Se asume que Incident tiene un campo rentalId o relationship con Lease
-    incidents = db.query(Incident).filter(Incident.rentalId == invoice.rentalId).all()
-    
-    # 3. Calcular totales y formatear lista de incidentes
-    incidents_total = sum((i.cost for i in incidents if i.cost), Decimal(0))
-    
-    incidents_list = [
-        {
+    leases = select(
+        Lease.id,
+        Lease.amount,
+        Lease.date_time_start,
+        Lease.date_time_end,
+        Vehicle.brand,
+        Vehicle.model,
+        Vehicle.patente
+    ).outerjoin(
+        Vehicle, Vehicle.id == Lease.vehicleId
+    ).where(Lease.id.in_(rental_ids))
+
+    incidents = select(
+        Incident.rentalId,
+        Incident.type,
+        Incident.description,
+        Incident.cost
+    ).where(Incident.rentalId.in_(rental_ids)).order_by(Incident.rentalId, Incident.id)
+
+    return leases, incidents
+
+
+def build_invoice_responses(invoices, lease_rows, incident_rows) -> list[dict]:
+    """
+    Construye la respuesta completa de cada factura, incluyendo detalles
+    del alquiler y la lista de incidentes asociados, a partir de las filas
+    de invoice_details_queries.
+    """
+    leases = {row.id: row for row in lease_rows}
+
+    # Agrupar incidentes por alquiler y sumar costos en una sola pasada
+    incidents_by_rental: dict[int, list[dict]] = {}
+    totals_by_rental: dict[int, Decimal] = {}
+    for i in incident_rows:
+        cost = i.cost if i.cost else Decimal(0)
+        incidents_by_rental.setdefault(i.rentalId, []).append({
             "type": i.type,
             "description": i.description,
-            "cost": i.cost if i.cost else Decimal(0)
-        } for i in incidents
-    ]
-
-    # 4. Obtener info del vehículo y fechas de forma segura
-    vehicle_info = None
-    lease_dates = None
-    lease_amount = Decimal(0)
-
-    if lease:
-        # El monto base del alquiler
-        lease_amount = lease.amount if lease.amount else Decimal(0)
-        
-        if lease.vehicle:
-            vehicle_info = f"{lease.vehicle.brand} {lease.vehicle.model} - {lease.vehicle.patente}"
-        
-        if lease.date_time_start and lease.date_time_end:
-            # Formato simple YYYY-MM-DD
-            s_date = lease.date_time_start.strftime('%Y-%m-%d')
-            e_date = lease.date_time_end.strftime('%Y-%m-%d')
-            lease_dates = f"{s_date} to {e_date}"
-
-    return {
-        "id": invoice.id,
-        "rentalId": invoice.rentalId,
-        "clientName": invoice.clientName,
-        "issuedDate": invoice.issuedDate,
-        "total": invoice.total,
-        "paymentMethod": invoice.paymentMethod,
-        "status": invoice.status,
-        "vehicleInfo": vehicle_info,
-        "leaseDates": lease_dates,
-        # Nuevos campos calculados
-        "leaseAmount": lease_amount,
-        "incidentsTotal": incidents_total,
-        "incidents": incidents_list
+            "cost": cost
+        })
+        totals_by_rental[i.rentalId] = totals_by_rental.get(i.rentalId, Decimal(0)) + cost
+
+    result = []
+    for invoice in invoices:
+        lease = leases.get(invoice.rentalId)
+
+        # Info del vehículo y fechas de forma segura
+        vehicle_info = None
+        lease_dates = None
+        lease_amount = Decimal(0)
+
+        if lease:
+            # El monto base del alquiler
+            lease_amount = lease.amount if lease.amount else Decimal(0)
+
+            if lease.brand is not None:
+                vehicle_info = f"{lease.brand} {lease.model} - {lease.patente}"
+
+            if lease.date_time_start and lease.date_time_end:
+                # Formato simple YYYY-MM-DD
+                s_date = lease.date_time_start.strftime('%Y-%m-%d')
+                e_date = lease.date_time_end.strftime('%Y-%m-%d')
+                lease_dates = f"{s_date} to {e_date}"
+
+        result.append({
+            "id": invoice.id,
+            "rentalId": invoice.rentalId,
+            "clientName": invoice.clientName,
+            "issuedDate": invoice.issuedDate,
+            "total": invoice.total,
+            "paymentMethod": invoice.paymentMethod,
+            "status": invoice.status,
+            "vehicleInfo": vehicle_info,
+            "leaseDates": lease_dates,
+            # Nuevos campos calculados
+            "leaseAmount": lease_amount,
+            "incidentsTotal": totals_by_rental.get(invoice.rentalId, Decimal(0)),
+            "incidents": incidents_by_rental.get(invoice.rentalId, [])
+        })
+    return result
+
+
+def format_invoices(invoices, db: Session) -> list[dict]:
+    """Formatea una lista de facturas con una cantidad fija de consultas."""
+    if not invoices:
+        return []
+    leases_query, incidents_query = invoice_details_queries({inv.rentalId for inv in invoices})
+    return build_invoice_responses(
+        invoices,
+        db.execute(leases_query).all(),
+        db.execute(incidents_query).all()
+    )
+
+
+async def format_invoices_async(invoices, db: AsyncSession) -> list[dict]:
+    if not invoices:
+        return []
+    leases_query, incidents_query = invoice_details_queries({inv.rentalId for inv in invoices})
+    return build_invoice_responses(
+        invoices,
+        (await db.execute(leases_query)).all(),
+        (await db.execute(incidents_query)).all()
+    )
+
+
+def format_invoice_response(invoice: Invoice, db: Session) -> dict:
+    return format_invoices([invoice], db)[0]
+
+
+# Ids por consulta al sumar incidentes del lote (acota el tamaño del IN)
+INCIDENT_IDS_PER_QUERY = 1000
+
+# Veces que se recalcula un lote cuyo INSERT chocó con ux_invoices_rental
+BATCH_CONFLICT_ATTEMPTS = 3
+
+
+def invoice_pending_leases(db: Session, payment_method: str) -> dict:
+    """
+    Parte transaccional de la facturación en lote:
+    1. Alquileres finalizados sin factura (anti-join), bloqueados para que
+       dos lotes simultáneos no facturen el mismo alquiler.
+    2. Suma de incidentes de esos alquileres (una consulta agrupada).
+    3. Un único executemany con todas las facturas.
+
+    El FOR UPDATE bloquea sólo Leases: en MySQL el anti-join sobre Invoices
+    es una lectura del snapshot y otro lote puede haber facturado en el
+    medio. Ese caso lo frena ux_invoices_rental (IntegrityError, ver
+    create_invoices_batch). En SQLite los lotes se serializan de entrada.
+    """
+    begin_locked_write(db)
+    pending = db.execute(
+        select(Lease.id, Lease.amount, Client.name)
+        .outerjoin(Client, Client.id == Lease.clientId)
+        .where(
+            # Comparación directa (usa ix_leases_state_id); la collation de
+            # MySQL ya no distingue mayúsculas
+            Lease.state == "finalizado",
+            ~exists().where(Invoice.rentalId == Lease.id),
+        )
+        .order_by(Lease.id)
+        .with_for_update(of=Lease)
+    ).all()
+
+    today = date.today()
+    summary = {
+        "created": 0,
+        "issuedDate": today,
+        "leaseAmount": Decimal(0),
+        "incidentsTotal": Decimal(0),
+        "total": Decimal(0),
+        "rentalIds": [],
     }
+    if not pending:
+        db.rollback()
+        return summary
+
+    # Incidentes de exactamente los alquileres bloqueados arriba (repetir el
+    # anti-join sería una lectura sin lock que puede ver otras filas)
+    locked_ids = [lease_id for lease_id, _, _ in pending]
+    incidents_totals = {}
+    for i in range(0, len(locked_ids), INCIDENT_IDS_PER_QUERY):
+        incidents_totals.update(db.execute(
+            select(Incident.rentalId, func.sum(Incident.cost))
+            .where(Incident.rentalId.in_(locked_ids[i:i + INCIDENT_IDS_PER_QUERY]))
+            .group_by(Incident.rentalId)
+        ).all())
+
+    rows = []
+    for lease_id, amount, client_name in pending:
+        lease_amount = amount if amount else Decimal(0)
+        incidents_total = incidents_totals.get(lease_id) or Decimal(0)
+        rows.append({
+            "rentalId": lease_id,
+            "clientName": client_name if client_name else "Unknown",
+            "issuedDate": today,
+            "total": lease_amount + incidents_total,
+            "paymentMethod": payment_method,
+            "status": "pendiente",
+        })
+        summary["leaseAmount"] += lease_amount
+        summary["incidentsTotal"] += incidents_total
+        summary["rentalIds"].append(lease_id)
+
+    db.execute(insert(Invoice), rows)
+    db.commit()
+    # Sin RETURNING no se conocen los ids nuevos: se rearma el índice al próximo uso
+    search_index.invalidate("invoices")
+
+    summary["created"] = len(rows)
+    summary["total"] = summary["leaseAmount"] + summary["incidentsTotal"]
+    return summary
 
 
 # --- Endpoints ---
 
 @router.get("/", response_model=list[InvoiceResponse])
-def read_invoices(
+async def read_invoices(
+        response: Response,
         skip: int = 0,
         limit: int = 100,
         status: Optional[str] = Query(None),
         paymentMethod: Optional[str] = Query(None),
         clientName: Optional[str] = Query(None),
-        db: Session = Depends(get_db)
+        cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor"),
+        db: AsyncSession = Depends(get_async_db)
 ):
-    """Lista general o filtrada (estado, método de pago, cliente)."""
-    query = db.query(Invoice)
+    """Lista general o filtrada (estado, método de pago, cliente). Admite paginación por cursor."""
+    query = select(Invoice)
 
     # Apply filters
     if status:
-        query = query.filter(Invoice.status == status)
+        query = query.where(Invoice.status == status)
     if paymentMethod:
-        query = query.filter(Invoice.paymentMethod == paymentMethod)
+        query = query.where(Invoice.paymentMethod == paymentMethod)
     if clientName:
-        query = query.filter(Invoice.clientName.ilike(f"%{clientName}%"))
+        query = query.where(Invoice.clientName.ilike(f"%{clientName}%"))
 
-    invoices = query.offset(skip).limit(limit).all()
+    invoices = (await db.scalars(apply_page(query, Invoice.id, cursor, skip, limit))).all()
+    invoices = finish_page(invoices, limit, response)
 
-    # Usamos el helper para formatear cada factura
-    return [format_invoice_response(inv, db) for inv in invoices]
+    # Alquileres, vehículos e incidentes de toda la página en dos consultas
+    return await format_invoices_async(invoices, db)
 
 
 @router.get("/{id_factura}", response_model=InvoiceResponse)
-def read_invoice(id_factura: int, db: Session = Depends(get_db)):
+async def read_invoice(id_factura: int, db: AsyncSession = Depends(get_async_db)):
     """Detalle de la factura incluyendo incidentes y desglose."""
-    invoice = db.query(Invoice).filter(Invoice.id == id_factura).first()
+    invoice = await db.get(Invoice, id_factura)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
 
-    return format_invoice_response(invoice, db)
+    return (await format_invoices_async([invoice], db))[0]
 
 
 @router.post("/", response_model=InvoiceResponse, status_code=status.HTTP_201_CREATED)
@@ -165,12 +321,37 @@ def create_invoice(invoice: InvoiceCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_invoice)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Otro pedido facturó el alquiler entre el chequeo y el INSERT (ux_invoices_rental)
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Lease already has an invoice")
     db.refresh(db_invoice)
+    search_index.sync("invoices", db_invoice)
 
     return format_invoice_response(db_invoice, db)
 
 
+@router.post("/lote", response_model=InvoiceBatchResponse, status_code=status.HTTP_201_CREATED)
+def create_invoices_batch(batch: InvoiceBatchCreate, db: Session = Depends(get_db)):
+    """
+    Facturación de fin de mes: genera en una sola transacción las facturas
+    de todos los alquileres finalizados que todavía no tienen una.
+    """
+    def invoice_batch():
+        for _ in range(BATCH_CONFLICT_ATTEMPTS):
+            try:
+                return invoice_pending_leases(db, batch.paymentMethod)
+            except IntegrityError:
+                # Un lote simultáneo facturó alguno de estos alquileres: la
+                # transacción nueva ya ve sus facturas y las saltea
+                db.rollback()
+        raise HTTPException(status_code=409, detail="Another invoice batch is running, please retry")
+
+    return run_with_retry(db, invoice_batch)
+
+
 @router.patch("/{id_factura}/pagar", response_model=InvoiceResponse)
 def pay_invoice(id_factura: int, db: Session = Depends(get_db)):
     """Cambia estado a 'Pagada'."""
@@ -193,6 +374,9 @@ def pay_invoice(id_factura: int, db: Session = Depends(get_db)):
     db_invoice.status = "pagada"
     db.commit()
     db.refresh(db_invoice)
+    kpi_store.add(totalRevenue=float(db_invoice.total or 0))
+    invoices_paid.inc()
+    invoices_paid_amount.inc(float(db_invoice.total or 0))
 
     return format_invoice_response(db_invoice, db)
 
@@ -1,114 +1,403 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import date, datetime
+from typing import Iterator, Optional
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 
-from backend.data.database import get_db
+from backend.data.database import SessionLocal, get_db, get_async_db
+from backend.data.transactions import begin_locked_write, run_with_retry
 from backend.models.lease import Lease
 from backend.models.vehicle import Vehicle
 from backend.models.client import Client
 from backend.models.employee import Employee
+from backend.services.availability import availability_index, ACTIVE_LEASE_STATES
+from backend.services.kpi_store import kpi_store
+from backend.services.metrics import leases_created
+from backend.services.dashboard_cache import invalidate_dashboard_on_write
+from backend.services.fast_json import fast_json
+from backend.services.pagination import apply_page, finish_page
+from backend.services.table_versions import bump_on_write
 from backend.schemas.lease_schemas import (
     LeaseCreate, LeaseResponse, LeaseUpdate,
-    LeaseConfirm, LeaseCancel, LeaseFinalize
+    LeaseConfirm, LeaseCancel, LeaseFinalize,
+    LeaseBatchCreate, LeaseBatchResponse
 )
 
 router = APIRouter(
     prefix="/alquileres",
+    # Reservar, cancelar o finalizar cambia el estado del vehículo
+    dependencies=[Depends(invalidate_dashboard_on_write), Depends(bump_on_write("vehicles"))],
     tags=["alquileres"],
 )
 
 
+# --- Helper Functions ---
+def lease_projection():
+    """
+    Consulta base para armar LeaseResponse: trae el alquiler junto con el
+    cliente, el vehículo y el empleado en un único SELECT (sin lazy loads).
+    """
+    return (
+        select(
+            Lease.id,
+            Lease.clientId,
+            Client.name.label("clientName"),
+            Lease.vehicleId,
+            Vehicle.brand.label("vehicleBrand"),
+            Vehicle.model.label("vehicleModel"),
+            Vehicle.patente.label("vehiclePatente"),
+            Lease.employeeId,
+            Employee.name.label("employeeName"),
+            Lease.date_time_start,
+            Lease.date_time_end,
+            Lease.amount,
+            Lease.state,
+            Lease.date_create,
+            Lease.date_confirm,
+            Lease.date_cancel,
+            Lease.start_kilometers,
+            Lease.end_kilometers,
+        )
+        .select_from(Lease)
+        .outerjoin(Client, Client.id == Lease.clientId)
+        .outerjoin(Vehicle, Vehicle.id == Lease.vehicleId)
+        .outerjoin(Employee, Employee.id == Lease.employeeId)
+    )
+
+
+def filter_leases(
+        query,
+        clientId: Optional[int] = None,
+        vehicleId: Optional[int] = None,
+        state: Optional[str] = None,
+        date_create: Optional[date] = None
+):
+    """Filtros comunes del listado y la exportación."""
+    if clientId:
+        query = query.where(Lease.clientId == clientId)
+    if vehicleId:
+        query = query.where(Lease.vehicleId == vehicleId)
+    if state:
+        query = query.where(Lease.state == state)
+    if date_create:
+        query = query.where(Lease.date_create == date_create)
+    return query
+
+
+def get_lease_response(db: Session, id_alquiler: int) -> dict:
+    """Devuelve el alquiler ya proyectado como LeaseResponse (una sola consulta)."""
+    row = db.execute(
+        lease_projection().where(Lease.id == id_alquiler)
+    ).mappings().first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Lease not found")
+    return dict(row)
+
+
+def has_overlapping_lease(
+        db: Session,
+        vehicle_id: int,
+        start: datetime,
+        end: datetime,
+        exclude_lease_id: Optional[int] = None,
+        lock: bool = False
+) -> bool:
+    """
+    Chequeo contra la base (fuente de verdad) de solapamiento con alquileres
+    activos. Con `lock` es una lectura con bloqueo (FOR UPDATE): lee lo
+    último commiteado y no el snapshot de la transacción, que en REPEATABLE
+    READ puede ser anterior a esperar el lock del vehículo.
+    """
+    query = select(Lease.id).where(
+        Lease.vehicleId == vehicle_id,
+        Lease.state.in_(ACTIVE_LEASE_STATES),
+        Lease.date_time_start < end,
+        Lease.date_time_end > start,
+    )
+    if exclude_lease_id is not None:
+        query = query.where(Lease.id != exclude_lease_id)
+    if lock:
+        query = query.with_for_update()
+    return db.scalar(query.limit(1)) is not None
+
+
+def book_vehicle(db: Session, lease: LeaseCreate, days: int) -> int:
+    """
+    Inserta el alquiler con la fila del vehículo bloqueada (SELECT ... FOR
+    UPDATE): dos pedidos simultáneos por el mismo auto se serializan y el
+    segundo ya ve el alquiler del primero. Vehículos distintos no compiten
+    entre sí. Devuelve el id del alquiler creado.
+
+    Tiene que ser lo primero de la transacción (ver create_lease).
+    """
+    begin_locked_write(db)
+    vehicle = db.query(Vehicle).filter(Vehicle.id == lease.vehicleId).with_for_update().first()
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+    if vehicle.estado in ["mantenimiento", "baja"]:
+        raise HTTPException(status_code=400, detail="Vehicle is not available")
+    if has_overlapping_lease(db, vehicle.id, lease.date_time_start, lease.date_time_end, lock=True):
+        raise HTTPException(status_code=400, detail="Vehicle is already booked for the requested dates")
+
+    db_lease = Lease(
+        clientId=lease.clientId,
+        vehicleId=lease.vehicleId,
+        employeeId=lease.employeeId,
+        date_time_start=lease.date_time_start,
+        date_time_end=lease.date_time_end,
+        amount=Decimal(days) * vehicle.pricePerDay,
+        #state=lease.state,
+        date_create=date.today(),
+        start_kilometers=lease.start_kilometers
+    )
+
+    # Solo se marca ocupado si el alquiler ya empezó (las reservas futuras no)
+    old_estado = vehicle.estado
+    if lease.date_time_start <= datetime.now():
+        vehicle.estado = "no disponible"
+    new_estado = vehicle.estado
+    db.add(db_lease)
+    db.flush()
+    lease_id = db_lease.id
+    db.commit()
+
+    kpi_store.add(totalRentals=1)
+    kpi_store.vehicle_state_changed(old_estado, new_estado)
+    leases_created.inc()
+    return lease_id
+
+
+def book_vehicles_batch(db: Session, items: list[LeaseCreate]) -> tuple[list[dict], list[tuple]]:
+    """
+    Parte transaccional de la carga en lote: bloquea los vehículos del lote
+    (en orden de id, para no generar deadlocks entre lotes), trae con una
+    sola consulta sus alquileres activos que se cruzan con el lote e inserta
+    los aceptados con un único executemany. Devuelve el resultado por ítem y
+    las claves (vehicleId, inicio) de los alquileres creados.
+    """
+    begin_locked_write(db)
+    vehicles = {
+        v.id: v
+        for v in db.query(Vehicle)
+        .filter(Vehicle.id.in_({i.vehicleId for i in items}))
+        .order_by(Vehicle.id)
+        .with_for_update()
+    }
+    client_ids = set(db.scalars(select(Client.id).where(Client.id.in_({i.clientId for i in items}))))
+    employee_ids = set(db.scalars(select(Employee.id).where(Employee.id.in_({i.employeeId for i in items}))))
+
+    # Alquileres activos de esos vehículos dentro del rango total del lote
+    booked = {}  # vehicleId -> [(start, end)], incluye los aceptados en este lote
+    if vehicles:
+        for vehicle_id, start, end in db.execute(
+                select(Lease.vehicleId, Lease.date_time_start, Lease.date_time_end).where(
+                    Lease.vehicleId.in_(vehicles.keys()),
+                    Lease.state.in_(ACTIVE_LEASE_STATES),
+                    Lease.date_time_start < max(i.date_time_end for i in items),
+                    Lease.date_time_end > min(i.date_time_start for i in items),
+                )
+        ):
+            booked.setdefault(vehicle_id, []).append((start, end))
+
+    now = datetime.now()
+    today = date.today()
+    results = []
+    rows = []
+    estado_changes = []  # (estado anterior, nuevo) de los vehículos que pasan a ocupados
+    for index, item in enumerate(items):
+        vehicle = vehicles.get(item.vehicleId)
+        reason = None
+        if not vehicle:
+            reason = "Vehicle not found"
+        elif vehicle.estado in ["mantenimiento", "baja"]:
+            reason = "Vehicle is not available"
+        elif item.clientId not in client_ids:
+            reason = "Client not found"
+        elif item.employeeId not in employee_ids:
+            reason = "Employee not found"
+        elif (item.date_time_end - item.date_time_start).days <= 0:
+            reason = "End date must be after start date"
+        elif any(
+                start < item.date_time_end and end > item.date_time_start
+                for start, end in booked.get(vehicle.id, [])
+        ):
+            reason = "Vehicle is already booked for the requested dates"
+
+        if reason:
+            results.append({"index": index, "status": "rechazado", "lease": None, "reason": reason})
+            continue
+
+        booked.setdefault(vehicle.id, []).append((item.date_time_start, item.date_time_end))
+        days = (item.date_time_end - item.date_time_start).days
+        rows.append({
+            "clientId": item.clientId,
+            "vehicleId": item.vehicleId,
+            "employeeId": item.employeeId,
+            "date_time_start": item.date_time_start,
+            "date_time_end": item.date_time_end,
+            "amount": Decimal(days) * vehicle.pricePerDay,
+            "date_create": today,
+            "start_kilometers": item.start_kilometers,
+        })
+        results.append({
+            "index": index, "status": "creado", "lease": None, "reason": None,
+            "key": (item.vehicleId, item.date_time_start)
+        })
+        if item.date_time_start <= now and vehicle.estado != "no disponible":
+            estado_changes.append((vehicle.estado, "no disponible"))
+            vehicle.estado = "no disponible"
+
+    if rows:
+        # Un único executemany dentro de la misma transacción
+        db.execute(insert(Lease), rows)
+    db.commit()
+
+    kpi_store.add(totalRentals=len(rows))
+    leases_created.inc(len(rows))
+    for old_estado, new_estado in estado_changes:
+        kpi_store.vehicle_state_changed(old_estado, new_estado)
+    return results, [(row["vehicleId"], row["date_time_start"]) for row in rows]
+
+
+def vehicle_free_now(db: Session, vehicle_id: int, exclude_lease_id: int) -> bool:
+    """
+    True si ningún otro alquiler activo ocupa el vehículo en este momento.
+    Lo decide la base y no el índice en memoria, que puede no tener las
+    reservas de otros workers; se llama con la fila del vehículo bloqueada,
+    igual que book_vehicle, así no se cruza con una reserva simultánea.
+    """
+    now = datetime.now()
+    return not has_overlapping_lease(
+        db, vehicle_id, now, now + timedelta(seconds=1), exclude_lease_id=exclude_lease_id, lock=True
+    )
+
+
 @router.get("/", response_model=list[LeaseResponse])
-def read_leases(
+async def read_leases(
+        response: Response,
         skip: int = 0,
         limit: int = 100,
         clientId: Optional[int] = Query(None),
         vehicleId: Optional[int] = Query(None),
         state: Optional[str] = Query(None),
         date: Optional[date] = Query(None),
-        db: Session = Depends(get_db)
+        cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor"),
+        db: AsyncSession = Depends(get_async_db)
 ):
-    """Lista con filtros por: cliente, vehículo, estado, fecha, etc."""
-    query = db.query(Lease)
+    """Lista con filtros por: cliente, vehículo, estado, fecha, etc. Admite paginación por cursor."""
+    query = filter_leases(lease_projection(), clientId, vehicleId, state, date)
 
-    # Apply filters
-    if clientId:
-        query = query.filter(Lease.clientId == clientId)
-    if vehicleId:
-        query = query.filter(Lease.vehicleId == vehicleId)
-    if state:
-        query = query.filter(Lease.state == state)
-    if date:
-        query = query.filter(Lease.date_create == date)
-
-    leases = query.offset(skip).limit(limit).all()
-
-    return [
-        {
-            "id": lease.id,
-            "clientId": lease.clientId,
-            "clientName": lease.client.name if lease.client else None,
-            "vehicleId": lease.vehicleId,
-            "vehicleBrand": lease.vehicle.brand if lease.vehicle else None,
-            "vehicleModel": lease.vehicle.model if lease.vehicle else None,
-            "vehiclePatente": lease.vehicle.patente if lease.vehicle else None,
-            "employeeId": lease.employeeId,
-            "employeeName": lease.employee.name if lease.employee else None,
-            "date_time_start": lease.date_time_start,
-            "date_time_end": lease.date_time_end,
-            "amount": lease.amount,
-            "state": lease.state,
-            "date_create": lease.date_create,
-            "date_confirm": lease.date_confirm,
-            "date_cancel": lease.date_cancel,
-            "start_kilometers": lease.start_kilometers,
-            "end_kilometers": lease.end_kilometers,
-        }
-        for lease in leases
-    ]
+    leases = (await db.execute(apply_page(query, Lease.id, cursor, skip, limit))).mappings().all()
+    leases = finish_page(leases, limit, response, lambda lease: lease["id"])
+
+    return fast_json([dict(lease) for lease in leases], list[LeaseResponse], response=response)
+
+
+EXPORT_BATCH_SIZE = 2000
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def stream_leases(query, format: str) -> Iterator[str]:
+    """
+    Recorre el resultado con un cursor del lado del servidor (stream_results)
+    de a EXPORT_BATCH_SIZE filas y emite un bloque de texto por lote, así la
+    memoria no depende de la cantidad total de filas.
+
+    Abre su propia sesión: la de la dependencia get_db ya está cerrada cuando
+    StreamingResponse empieza a consumir el generador.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            query,
+            execution_options={"stream_results": True, "yield_per": EXPORT_BATCH_SIZE}
+        )
+        columns = list(result.keys())
+        buffer = io.StringIO()
+
+        if format == "csv":
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            for rows in result.partitions():
+                writer.writerows([_export_value(v) for v in row] for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        else:
+            encoder = json.JSONEncoder(ensure_ascii=False, default=_export_value)
+            for rows in result.partitions():
+                for row in rows:
+                    buffer.write(encoder.encode(dict(zip(columns, map(_export_value, row)))))
+                    buffer.write("\n")
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_leases(
+        format: str = Query("csv", pattern="^(csv|ndjson)$"),
+        clientId: Optional[int] = Query(None),
+        vehicleId: Optional[int] = Query(None),
+        state: Optional[str] = Query(None),
+        date: Optional[date] = Query(None),
+        desde: Optional[datetime] = Query(None, description="Inicio del alquiler desde (inclusive)"),
+        hasta: Optional[datetime] = Query(None, description="Inicio del alquiler hasta (exclusivo)"),
+):
+    """
+    Exporta el historial completo de alquileres en CSV o NDJSON, con los
+    mismos filtros que el listado más un rango sobre la fecha de inicio.
+    """
+    if desde and hasta and hasta <= desde:
+        raise HTTPException(status_code=400, detail="'hasta' must be after 'desde'")
+
+    query = filter_leases(lease_projection(), clientId, vehicleId, state, date)
+    if desde:
+        query = query.where(Lease.date_time_start >= desde)
+    if hasta:
+        query = query.where(Lease.date_time_start < hasta)
+    query = query.order_by(Lease.id)
+
+    return StreamingResponse(
+        stream_leases(query, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="alquileres.{format}"'}
+    )
 
 
 @router.get("/{id_alquiler}", response_model=LeaseResponse)
-def read_lease(id_alquiler: int, db: Session = Depends(get_db)):
+async def read_lease(id_alquiler: int, db: AsyncSession = Depends(get_async_db)):
     """Detalle del alquiler."""
-    lease = db.query(Lease).filter(Lease.id == id_alquiler).first()
-    if not lease:
+    row = (await db.execute(
+        lease_projection().where(Lease.id == id_alquiler)
+    )).mappings().first()
+    if not row:
         raise HTTPException(status_code=404, detail="Lease not found")
-
-    return {
-        "id": lease.id,
-        "clientId": lease.clientId,
-        "clientName": lease.client.name if lease.client else None,
-        "vehicleId": lease.vehicleId,
-        "vehicleBrand": lease.vehicle.brand if lease.vehicle else None,
-        "vehicleModel": lease.vehicle.model if lease.vehicle else None,
-        "vehiclePatente": lease.vehicle.patente if lease.vehicle else None,
-        "employeeId": lease.employeeId,
-        "employeeName": lease.employee.name if lease.employee else None,
-        "date_time_start": lease.date_time_start,
-        "date_time_end": lease.date_time_end,
-        "amount": lease.amount,
-        "state": lease.state,
-        "date_create": lease.date_create,
-        "date_confirm": lease.date_confirm,
-        "date_cancel": lease.date_cancel,
-        "start_kilometers": lease.start_kilometers,
-        "end_kilometers": lease.end_kilometers,
-    }
+    return fast_json(dict(row), LeaseResponse)
 
 
 @router.post("/", response_model=LeaseResponse, status_code=status.HTTP_201_CREATED)
 def create_lease(lease: LeaseCreate, db: Session = Depends(get_db)):
-    """Crea un nuevo alquiler. Valida disponibilidad del vehículo."""
-
-    # Validate vehicle exists and is available
-    vehicle = db.query(Vehicle).filter(Vehicle.id == lease.vehicleId).first()
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    if vehicle.estado != "disponible":
-        raise HTTPException(status_code=400, detail="Vehicle is not available")
+    """Crea un nuevo alquiler. Valida disponibilidad del vehículo en el rango pedido."""
 
     # Validate client exists
     client = db.query(Client).filter(Client.id == lease.clientId and Client.status == "activo").first()    
@@ -124,52 +413,75 @@ def create_lease(lease: LeaseCreate, db: Session = Depends(get_db)):
     days = (lease.date_time_end - lease.date_time_start).days
     if days <= 0:
         raise HTTPException(status_code=400, detail="End date must be after start date")
-    amount = Decimal(days) * vehicle.pricePerDay
-
-    # Create lease
-    db_lease = Lease(
-        clientId=lease.clientId,
-        vehicleId=lease.vehicleId,
-        employeeId=lease.employeeId,
-        date_time_start=lease.date_time_start,
-        date_time_end=lease.date_time_end,
-        amount=amount,
-        #state=lease.state,
-        date_create=date.today(),
-        start_kilometers=lease.start_kilometers
-    )
-
-    vehicle.estado = "no disponible"
-    db.add(db_lease)
-    db.commit()
-    db.refresh(db_lease)
-    db.refresh(vehicle)
-
-    return {
-        "id": db_lease.id,
-        "clientId": db_lease.clientId,
-        "clientName": db_lease.client.name,
-        "vehicleId": db_lease.vehicleId,
-        "vehicleBrand": db_lease.vehicle.brand,
-        "vehicleModel": db_lease.vehicle.model,
-        "vehiclePatente": db_lease.vehicle.patente,
-        "employeeId": db_lease.employeeId,
-        "employeeName": db_lease.employee.name,
-        "date_time_start": db_lease.date_time_start,
-        "date_time_end": db_lease.date_time_end,
-        "amount": db_lease.amount,
-        "state": db_lease.state,
-        "date_create": db_lease.date_create,
-        "date_confirm": db_lease.date_confirm,
-        "date_cancel": db_lease.date_cancel,
-        "start_kilometers": db_lease.start_kilometers,
-        "end_kilometers": db_lease.end_kilometers,
-    }
-
 
-@router.put("/{id_alquiler}", response_model=LeaseResponse)
-def update_lease(id_alquiler: int, lease: LeaseUpdate, db: Session = Depends(get_db)):
-    """Modifica datos si el estado lo permite."""
+    # Filtro rápido con el índice en memoria, sin tomar locks. El índice
+    # puede estar atrasado (p. ej. un alquiler cancelado desde otro worker):
+    # un conflicto se confirma contra la base antes de rechazar
+    availability_index.ensure_loaded(db)
+    if (
+            not availability_index.is_available(lease.vehicleId, lease.date_time_start, lease.date_time_end)
+            and has_overlapping_lease(db, lease.vehicleId, lease.date_time_start, lease.date_time_end)
+    ):
+        raise HTTPException(status_code=400, detail="Vehicle is already booked for the requested dates")
+
+    # Se cierra la transacción de las lecturas previas: en REPEATABLE READ
+    # fijarían el snapshot antes de esperar el lock del vehículo
+    db.rollback()
+
+    # Reserva con la fila del vehículo bloqueada; reintenta ante deadlocks
+    lease_id = run_with_retry(db, lambda: book_vehicle(db, lease, days))
+
+    response = get_lease_response(db, lease_id)
+    availability_index.sync(response)
+    return fast_json(response, LeaseResponse, status.HTTP_201_CREATED)
+
+
+@router.post("/batch", response_model=LeaseBatchResponse)
+def create_leases_batch(batch: LeaseBatchCreate, db: Session = Depends(get_db)):
+    """
+    Crea varios alquileres en una sola transacción (reservas corporativas).
+    Valida vehículos, clientes y empleados con una consulta por tabla y
+    devuelve el resultado de cada ítem: creado o rechazado con el motivo.
+    """
+    results, keys = run_with_retry(db, lambda: book_vehicles_batch(db, batch.leases))
+
+    created = {}
+    if keys:
+        # MySQL no tiene INSERT ... RETURNING: se recuperan los alquileres
+        # recién creados por (vehículo, inicio), que es único entre los activos
+        created = {
+            (lease["vehicleId"], lease["date_time_start"]): dict(lease)
+            for lease in db.execute(
+                lease_projection().where(
+                    tuple_(Lease.vehicleId, Lease.date_time_start).in_(keys),
+                    Lease.state.in_(ACTIVE_LEASE_STATES),
+                )
+            ).mappings()
+        }
+        for lease in created.values():
+            availability_index.sync(lease)
+
+    for result in results:
+        key = result.pop("key", None)
+        if key is not None:
+            result["lease"] = created.get(key)
+
+    created_count = len(keys)
+    return fast_json({
+        "created": created_count,
+        "rejected": len(results) - created_count,
+        "results": results,
+    }, LeaseBatchResponse)
+
+
+def apply_lease_update(db: Session, id_alquiler: int, update_data: dict):
+    """
+    Aplica la edición y hace commit. Si cambian las fechas, bloquea la fila
+    del vehículo y vuelve a chequear solapamientos contra la base, igual que
+    book_vehicle: una edición no puede generar un solapamiento que la
+    creación rechazaría.
+    """
+    begin_locked_write(db)
     db_lease = db.query(Lease).filter(Lease.id == id_alquiler).first()
     if not db_lease:
         raise HTTPException(status_code=404, detail="Lease not found")
@@ -182,10 +494,19 @@ def update_lease(id_alquiler: int, lease: LeaseUpdate, db: Session = Depends(get
         )
 
     # Update fields
-    update_data = lease.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_lease, field, value)
 
+    if "date_time_start" in update_data or "date_time_end" in update_data:
+        if db_lease.date_time_end <= db_lease.date_time_start:
+            raise HTTPException(status_code=400, detail="End date must be after start date")
+        db.query(Vehicle.id).filter(Vehicle.id == db_lease.vehicleId).with_for_update().first()
+        if db_lease.state in ACTIVE_LEASE_STATES and has_overlapping_lease(
+                db, db_lease.vehicleId, db_lease.date_time_start, db_lease.date_time_end,
+                exclude_lease_id=db_lease.id, lock=True
+        ):
+            raise HTTPException(status_code=400, detail="Vehicle is already booked for the requested dates")
+
     # Recalculate amount if dates changed
     #todo: evaluar el atributo de amount
 
@@ -196,28 +517,18 @@ def update_lease(id_alquiler: int, lease: LeaseUpdate, db: Session = Depends(get
     #     db_lease.amount = Decimal(days) * db_lease.vehicle.pricePerDay
 
     db.commit()
-    db.refresh(db_lease)
-
-    return {
-        "id": db_lease.id,
-        "clientId": db_lease.clientId,
-        "clientName": db_lease.client.name,
-        "vehicleId": db_lease.vehicleId,
-        "vehicleBrand": db_lease.vehicle.brand,
-        "vehicleModel": db_lease.vehicle.model,
-        "vehiclePatente": db_lease.vehicle.patente,
-        "employeeId": db_lease.employeeId,
-        "employeeName": db_lease.employee.name,
-        "date_time_start": db_lease.date_time_start,
-        "date_time_end": db_lease.date_time_end,
-        "amount": db_lease.amount,
-        "state": db_lease.state,
-        "date_create": db_lease.date_create,
-        "date_confirm": db_lease.date_confirm,
-        "date_cancel": db_lease.date_cancel,
-        "start_kilometers": db_lease.start_kilometers,
-        "end_kilometers": db_lease.end_kilometers,
-    }
+
+
+@router.put("/{id_alquiler}", response_model=LeaseResponse)
+def update_lease(id_alquiler: int, lease: LeaseUpdate, db: Session = Depends(get_db)):
+    """Modifica datos si el estado lo permite."""
+    update_data = lease.model_dump(exclude_unset=True)
+    # Con reintento: tras un rollback se vuelve a leer el alquiler y aplicar los cambios
+    run_with_retry(db, lambda: apply_lease_update(db, id_alquiler, update_data))
+
+    response = get_lease_response(db, id_alquiler)
+    availability_index.sync(response)
+    return fast_json(response, LeaseResponse)
 
 
 @router.patch("/{id_alquiler}/confirmar", response_model=LeaseResponse)
@@ -238,37 +549,23 @@ def confirm_lease(id_alquiler: int, db: Session = Depends(get_db)):
 
     # Mark vehicle as not available
     vehicle = db.query(Vehicle).filter(Vehicle.id == db_lease.vehicleId).first()
+    old_estado = vehicle.estado if vehicle else None
     if vehicle:
         vehicle.estado = "alquilado"
 
     db.commit()
-    db.refresh(db_lease)
-
-    return {
-        "id": db_lease.id,
-        "clientId": db_lease.clientId,
-        "clientName": db_lease.client.name,
-        "vehicleId": db_lease.vehicleId,
-        "vehicleBrand": db_lease.vehicle.brand,
-        "vehicleModel": db_lease.vehicle.model,
-        "vehiclePatente": db_lease.vehicle.patente,
-        "employeeId": db_lease.employeeId,
-        "employeeName": db_lease.employee.name,
-        "date_time_start": db_lease.date_time_start,
-        "date_time_end": db_lease.date_time_end,
-        "amount": db_lease.amount,
-        "state": db_lease.state,
-        "date_create": db_lease.date_create,
-        "date_confirm": db_lease.date_confirm,
-        "date_cancel": db_lease.date_cancel,
-        "start_kilometers": db_lease.start_kilometers,
-        "end_kilometers": db_lease.end_kilometers,
-    }
+    if vehicle:
+        kpi_store.vehicle_state_changed(old_estado, "alquilado")
+
+    response = get_lease_response(db, id_alquiler)
+    availability_index.sync(response)
+    return fast_json(response, LeaseResponse)
 
 
 @router.patch("/{id_alquiler}/cancelar", response_model=LeaseResponse)
 def cancel_lease(id_alquiler: int, db: Session = Depends(get_db)):
     """Cambia a 'cancelado' y setea fecha_cancelacion."""
+    begin_locked_write(db)
     db_lease = db.query(Lease).filter(Lease.id == id_alquiler).first()
     if not db_lease:
         raise HTTPException(status_code=404, detail="Lease not found")
@@ -282,39 +579,25 @@ def cancel_lease(id_alquiler: int, db: Session = Depends(get_db)):
     db_lease.state = "cancelado"
     db_lease.date_cancel = date.today()
 
-    # Make vehicle available again
-    vehicle = db.query(Vehicle).filter(Vehicle.id == db_lease.vehicleId).first()
-    if vehicle:
+    # Make vehicle available again (unless another lease is using it right now)
+    vehicle = db.query(Vehicle).filter(Vehicle.id == db_lease.vehicleId).with_for_update().first()
+    old_estado = vehicle.estado if vehicle else None
+    if vehicle and vehicle_free_now(db, vehicle.id, id_alquiler):
         vehicle.estado = "disponible"
+    new_estado = vehicle.estado if vehicle else None
 
     db.commit()
-    db.refresh(db_lease)
-
-    return {
-        "id": db_lease.id,
-        "clientId": db_lease.clientId,
-        "clientName": db_lease.client.name,
-        "vehicleId": db_lease.vehicleId,
-        "vehicleBrand": db_lease.vehicle.brand,
-        "vehicleModel": db_lease.vehicle.model,
-        "vehiclePatente": db_lease.vehicle.patente,
-        "employeeId": db_lease.employeeId,
-        "employeeName": db_lease.employee.name,
-        "date_time_start": db_lease.date_time_start,
-        "date_time_end": db_lease.date_time_end,
-        "amount": db_lease.amount,
-        "state": db_lease.state,
-        "date_create": db_lease.date_create,
-        "date_confirm": db_lease.date_confirm,
-        "date_cancel": db_lease.date_cancel,
-        "start_kilometers": db_lease.start_kilometers,
-        "end_kilometers": db_lease.end_kilometers,
-    }
+    kpi_store.vehicle_state_changed(old_estado, new_estado)
+
+    response = get_lease_response(db, id_alquiler)
+    availability_index.sync(response)
+    return fast_json(response, LeaseResponse)
 
 
 @router.patch("/{id_alquiler}/finalizar", response_model=LeaseResponse)
 def finalize_lease(id_alquiler: int, data: LeaseFinalize, db: Session = Depends(get_db)):
     """Actualiza kilometraje_fin, calcula monto total y cambia a 'finalizado'."""
+    begin_locked_write(db)
     db_lease = db.query(Lease).filter(Lease.id == id_alquiler).first()
     if not db_lease:
         raise HTTPException(status_code=404, detail="Lease not found")
@@ -339,34 +622,20 @@ def finalize_lease(id_alquiler: int, data: LeaseFinalize, db: Session = Depends(
     # This is where you'd add business logic for extra charges
 
     # Make vehicle available again and update its kilometers
-    vehicle = db.query(Vehicle).filter(Vehicle.id == db_lease.vehicleId).first()
+    vehicle = db.query(Vehicle).filter(Vehicle.id == db_lease.vehicleId).with_for_update().first()
+    old_estado = vehicle.estado if vehicle else None
     if vehicle:
-        vehicle.estado = "disponible"
+        if vehicle_free_now(db, vehicle.id, id_alquiler):
+            vehicle.estado = "disponible"
         vehicle.kilometraje_actual = data.end_kilometers
+    new_estado = vehicle.estado if vehicle else None
 
     db.commit()
-    db.refresh(db_lease)
-
-    return {
-        "id": db_lease.id,
-        "clientId": db_lease.clientId,
-        "clientName": db_lease.client.name,
-        "vehicleId": db_lease.vehicleId,
-        "vehicleBrand": db_lease.vehicle.brand,
-        "vehicleModel": db_lease.vehicle.model,
-        "vehiclePatente": db_lease.vehicle.patente,
-        "employeeId": db_lease.employeeId,
-        "employeeName": db_lease.employee.name,
-        "date_time_start": db_lease.date_time_start,
-        "date_time_end": db_lease.date_time_end,
-        "amount": db_lease.amount,
-        "state": db_lease.state,
-        "date_create": db_lease.date_create,
-        "date_confirm": db_lease.date_confirm,
-        "date_cancel": db_lease.date_cancel,
-        "start_kilometers": db_lease.start_kilometers,
-        "end_kilometers": db_lease.end_kilometers,
-    }
+    kpi_store.vehicle_state_changed(old_estado, new_estado)
+
+    response = get_lease_response(db, id_alquiler)
+    availability_index.sync(response)
+    return fast_json(response, LeaseResponse)
 
 @router.delete("/{id_alquiler}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_lease(id_alquiler: int, db: Session = Depends(get_db)):
@@ -383,5 +652,7 @@ def delete_lease(id_alquiler: int, db: Session = Depends(get_db)):
 
     db.delete(db_lease)
     db.commit()
+    availability_index.remove(id_alquiler)
+    kpi_store.add(totalRentals=-1)
 
     return
\ No newline at end of file
@@ -8,10 +8,14 @@ from backend.data.database import get_db
 from backend.models.maintenance import Maintenance
 from backend.models.vehicle import Vehicle
 from backend.models.employee import Employee
+from backend.services.kpi_store import kpi_store
+from backend.services.table_versions import bump_on_write
 from backend.schemas.maintenance_schemas import MaintenanceCreate, MaintenanceResponse, MaintenanceUpdate
 
 router = APIRouter(
     prefix="/mantenimiento",
+    # Iniciar o terminar un mantenimiento cambia el estado del vehículo
+    dependencies=[Depends(bump_on_write("vehicles"))],
     tags=["mantenimiento"],
 )
 
@@ -73,10 +77,12 @@ def create_maintenance(maintenance: MaintenanceCreate, db: Session = Depends(get
     db.add(db_maintenance)
 
     # Cambiar estado del vehículo a "mantenimiento"
+    old_estado = vehicle.estado
     vehicle.estado = "mantenimiento"
 
     db.commit()
     db.refresh(db_maintenance)
+    kpi_store.vehicle_state_changed(old_estado, "mantenimiento")
     return db_maintenance
 
 
@@ -95,12 +101,15 @@ def finish_maintenance(id_mantenimiento: int, db: Session = Depends(get_db)):
 
     # Cambiar estado del vehículo a "disponible"
     vehicle = db.query(Vehicle).filter(Vehicle.id == maintenance.vehicleId).first()
+    old_estado = vehicle.estado if vehicle else None
     if vehicle:
         vehicle.estado = "disponible"
     maintenance.status = "finalizado"
 
     db.commit()
     db.refresh(maintenance)
+    if vehicle:
+        kpi_store.vehicle_state_changed(old_estado, "disponible")
     return maintenance
 
 @router.delete("/{id_mantenimiento}", status_code=status.HTTP_204_NO_CONTENT)
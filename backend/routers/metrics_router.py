@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from backend.services.metrics import render_metrics
+
+router = APIRouter(
+    tags=["metrics"],
+)
+
+
+@router.get("/metrics", response_class=Response)
+def metrics():
+    """Métricas en formato de texto de Prometheus (sumadas entre workers si hay varios)."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
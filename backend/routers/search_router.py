@@ -0,0 +1,39 @@
+# routers/search_router.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.data.database import get_async_db
+from backend.services.search import MIN_QUERY_LENGTH, normalize, search_index
+from backend.schemas.search_schemas import SearchResponse
+
+router = APIRouter(
+    prefix="/buscar",
+    tags=["busqueda"],
+)
+
+SEARCH_ENTITIES = ("clients", "vehicles", "invoices")
+
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+        q: str = Query(..., min_length=MIN_QUERY_LENGTH, max_length=100, description="Texto a buscar"),
+        limit: int = Query(10, ge=1, le=50, description="Máximo de resultados por entidad"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Búsqueda unificada por subcadena: clientes (nombre, DNI), vehículos
+    (marca, modelo, patente) y facturas (cliente), ordenada por relevancia.
+    Se resuelve con el índice de trigramas en memoria, sin consultar la base.
+    """
+    # min_length mira el texto crudo: "a\u0301b" tiene 3 caracteres pero
+    # normalizado queda "ab", sin ningún trigrama
+    if len(normalize(q)) < MIN_QUERY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"La búsqueda necesita al menos {MIN_QUERY_LENGTH} caracteres"
+        )
+
+    if any(search_index.needs_reload(entity) for entity in SEARCH_ENTITIES):
+        await db.run_sync(search_index.ensure_loaded, SEARCH_ENTITIES)
+
+    return {entity: search_index.search(entity, q, limit) for entity in SEARCH_ENTITIES}
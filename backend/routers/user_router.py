@@ -1,24 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 
-
-from backend.data.database import get_db
+from backend.data.database import get_async_db, get_db
+from backend.models.employee import Employee
 from backend.models.user import User
 from backend.schemas.user_schemas import UserCreate, UserResponse, UserUpdate, UserUpdatePassword
+from backend.services.fast_json import fast_json
+from backend.services.passwords import password_hasher
+from backend.services.tokens import TokenUser, require_admin, require_user
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 router = APIRouter(
     prefix="/usuarios",
+    dependencies=[Depends(require_user)],
     tags=["usuarios"],
 )
 
 
-@router.get("/", response_model=list[UserResponse])
+def require_self_or_admin(id_usuario: int, current: TokenUser = Depends(require_user)) -> TokenUser:
+    """El usuario solo puede ver o cambiar sus propios datos, salvo que sea admin."""
+    if current.userId != id_usuario and not current.admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current
+
+
+async def read_user_response(db: AsyncSession, id_usuario: int) -> dict:
+    """Datos del usuario con el nombre del empleado en una sola consulta."""
+    user = (await db.execute(
+        select(User.id, User.id_employee, User.username, Employee.name)
+        .outerjoin(Employee, Employee.id == User.id_employee)
+        .where(User.id == id_usuario)
+    )).one()
+    return {
+        "userId": user.id,
+        "employeeId": user.id_employee,
+        "username": user.username,
+        "employeeName": user.name
+    }
+
+
+@router.get("/", response_model=list[UserResponse], dependencies=[Depends(require_admin)])
 def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    # todo: solo admin
     users = db.query(User).offset(skip).limit(limit).all()
-    return [
+    return fast_json([
         {
             "userId": user.id,
             "employeeId": user.id_employee,
@@ -26,25 +51,26 @@ def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
             "employeeName": user.employee.name if user.employee else None
         }
         for user in users
-    ]
+    ], list[UserResponse])
 
-@router.get("/{id_usuario}", response_model=UserResponse)
+@router.get("/{id_usuario}", response_model=UserResponse, dependencies=[Depends(require_self_or_admin)])
 def read_user(id_usuario: int, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.id == id_usuario).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return {
+    return fast_json({
         "userId": user.id,
         "employeeId": user.id_employee,
         "username": user.username,
         "employeeName": user.employee.name if user.employee else None
-    }
+    }, UserResponse)
 
 
-@router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    hashed_password = password_context.hash(user.password)
+@router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(require_admin)])
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # bcrypt corre en el pool de procesos; el event loop queda libre mientras tanto
+    hashed_password = await password_hasher.hash_async(user.password)
     db_user = User(
         id_employee=user.employeeId,
         username=user.username,
@@ -52,31 +78,20 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         #password=user.password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return {
-        "userId": db_user.id,
-        "employeeId": db_user.id_employee,
-        "username": db_user.username,
-        "employeeName": db_user.employee.name if db_user.employee else None
-    }
+    await db.commit()
+    return fast_json(await read_user_response(db, db_user.id), UserResponse, status.HTTP_201_CREATED)
 
-@router.patch("/{id_usuario}/password", response_model=UserResponse)
-def update_user_password(id_usuario: int, user: UserUpdatePassword, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.id == id_usuario).first()
+@router.patch("/{id_usuario}/password", response_model=UserResponse, dependencies=[Depends(require_self_or_admin)])
+async def update_user_password(id_usuario: int, user: UserUpdatePassword,
+                               db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.get(User, id_usuario)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    db_user.password = password_context.hash(user.password)
-    db.commit()
-    db.refresh(db_user)
-    return {
-        "userId": db_user.id,
-        "employeeId": db_user.id_employee,
-        "username": db_user.username,
-        "employeeName": db_user.employee.name if db_user.employee else None
-    }
+    db_user.password = await password_hasher.hash_async(user.password)
+    await db.commit()
+    return fast_json(await read_user_response(db, id_usuario), UserResponse)
 
-@router.patch("/{id_usuario}", response_model=UserResponse)
+@router.patch("/{id_usuario}", response_model=UserResponse, dependencies=[Depends(require_admin)])
 def update_user_employee(id_usuario: int, user: UserUpdate, db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.id == id_usuario).first()
     if not db_user:
@@ -84,14 +99,14 @@ def update_user_employee(id_usuario: int, user: UserUpdate, db: Session = Depend
     db_user.id_employee = user.employeeId
     db.commit()
     db.refresh(db_user)
-    return {
+    return fast_json({
         "userId": db_user.id,
         "employeeId": db_user.id_employee,
         "username": db_user.username,
         "employeeName": db_user.employee.name if db_user.employee else None
-    }
+    }, UserResponse)
 
-@router.delete("/{id_usuario}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{id_usuario}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
 def delete_user(id_usuario: int, db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.id == id_usuario).first()
     if not db_user:
@@ -1,20 +1,29 @@
 # routers/vehicles.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from backend.data.database import get_db
+from backend.data.database import get_db, get_async_db
 from backend.models.vehicle import Vehicle
+from backend.services.availability import availability_index
+from backend.services.dashboard_cache import invalidate_dashboard_on_write
+from backend.services.kpi_store import kpi_store
+from backend.services.search import search_index
+from backend.services.table_versions import bump_on_write, conditional_get
+from backend.schemas.lease_schemas import LocalDatetime
 from backend.schemas.vehicle_schemas import VehicleCreate, VehicleResponse, VehicleUpdate, VehicleStatusUpdate
 
 router = APIRouter(
     prefix="/vehiculos",
+    dependencies=[Depends(invalidate_dashboard_on_write), Depends(bump_on_write("vehicles"))],
     tags=["vehiculos"],
 )
 
 
-@router.get("/", response_model=list[VehicleResponse])
-def read_vehicles(
+@router.get("/", response_model=list[VehicleResponse], dependencies=[Depends(conditional_get("vehicles"))])
+async def read_vehicles(
         skip: int = 0,
         limit: int = 100,
         estado: Optional[str] = None,
@@ -22,28 +31,48 @@ def read_vehicles(
         model: Optional[str] = None,
         year: Optional[int] = None,
         fuel: Optional[str] = None,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Vehicle)
+    query = select(Vehicle)
 
     if estado:
-        query = query.filter(Vehicle.estado == estado)
+        query = query.where(Vehicle.estado == estado)
     if brand:
-        query = query.filter(Vehicle.brand.ilike(f"%{brand}%"))
+        query = query.where(Vehicle.brand.ilike(f"%{brand}%"))
     if model:
-        query = query.filter(Vehicle.model.ilike(f"%{model}%"))
+        query = query.where(Vehicle.model.ilike(f"%{model}%"))
     if year:
-        query = query.filter(Vehicle.year == year)
+        query = query.where(Vehicle.year == year)
     if fuel:
-        query = query.filter(Vehicle.fuel == fuel)
+        query = query.where(Vehicle.fuel == fuel)
 
-    vehicles = query.offset(skip).limit(limit).all()
+    vehicles = (await db.scalars(query.offset(skip).limit(limit))).all()
     return vehicles
 
 
+@router.get("/disponibles", response_model=list[VehicleResponse])
+async def read_available_vehicles(
+        desde: LocalDatetime = Query(..., description="Inicio del rango"),
+        hasta: LocalDatetime = Query(..., description="Fin del rango"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Vehículos sin alquileres activos entre `desde` y `hasta`."""
+    if hasta <= desde:
+        raise HTTPException(status_code=400, detail="'hasta' must be after 'desde'")
+
+    if availability_index.needs_reload():
+        await db.run_sync(availability_index.ensure_loaded)
+    busy = availability_index.busy_vehicles(desde, hasta)
+
+    query = select(Vehicle).where(Vehicle.estado.notin_(["mantenimiento", "baja"]))
+    if busy:
+        query = query.where(Vehicle.id.notin_(busy))
+    return (await db.scalars(query)).all()
+
+
 @router.get("/{id_vehiculo}", response_model=VehicleResponse)
-def read_vehicle(id_vehiculo: int, db: Session = Depends(get_db)):
-    vehicle = db.query(Vehicle).filter(Vehicle.id == id_vehiculo).first()
+async def read_vehicle(id_vehiculo: int, db: AsyncSession = Depends(get_async_db)):
+    vehicle = await db.get(Vehicle, id_vehiculo)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return vehicle
@@ -63,6 +92,8 @@ def create_vehicle(vehicle: VehicleCreate, db: Session = Depends(get_db)):
     db.add(db_vehicle)
     db.commit()
     db.refresh(db_vehicle)
+    kpi_store.vehicle_state_changed(None, db_vehicle.estado)
+    search_index.sync("vehicles", db_vehicle)
     return db_vehicle
 
 
@@ -78,6 +109,7 @@ def update_vehicle(id_vehiculo: int, vehicle: VehicleUpdate, db: Session = Depen
 
     db.commit()
     db.refresh(db_vehicle)
+    search_index.sync("vehicles", db_vehicle)
     return db_vehicle
 
 
@@ -95,9 +127,11 @@ def update_vehicle_status(id_vehiculo: int, status_update: VehicleStatusUpdate,
             detail=f"Estado must be one of: {', '.join(valid_states)}"
         )
 
+    old_estado = db_vehicle.estado
     db_vehicle.estado = status_update.estado
     db.commit()
     db.refresh(db_vehicle)
+    kpi_store.vehicle_state_changed(old_estado, db_vehicle.estado)
     return db_vehicle
 
 
@@ -115,6 +149,9 @@ def delete_vehicle(id_vehiculo: int, db: Session = Depends(get_db)):
         )
 
     #db_vehicle.estado = "baja"
+    old_estado = db_vehicle.estado
     db.delete(db_vehicle)
     db.commit()
+    kpi_store.vehicle_state_changed(old_estado, None)
+    search_index.remove("vehicles", id_vehiculo)
     return
\ No newline at end of file
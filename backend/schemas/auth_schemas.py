@@ -14,6 +14,27 @@ class LoginResponse(BaseModel):
     employeeId: Optional[int] = None
     username: str
     employeeName: Optional[str] = None
+    cargo: Optional[str] = None
+    isAdmin: bool = False
+
+    # Tokens
+    token: str
+    refreshToken: str
+    tokenType: str = "bearer"
+    expiresIn: int  # Segundos de validez del token de acceso
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class RefreshRequest(BaseModel):
+    """Schema for refresh and logout requests"""
+    refreshToken: str
+
+
+class TokenResponse(BaseModel):
+    """Schema for a refreshed token pair"""
+    token: str
+    refreshToken: str
+    tokenType: str = "bearer"
+    expiresIn: int
\ No newline at end of file
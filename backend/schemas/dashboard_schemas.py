@@ -0,0 +1,43 @@
+# schemas/dashboard_schemas.py
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date
+
+
+class VehicleUtilization(BaseModel):
+    vehicleId: int
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    patente: Optional[str] = None
+    occupiedDays: int
+    idleDays: int
+    utilization: float  # Porcentaje de días ocupados
+    revenue: float  # Ingresos prorrateados al rango
+    revenuePerAvailableDay: float
+
+
+class ModelUtilization(BaseModel):
+    brand: str
+    model: str
+    vehicles: int
+    occupiedDays: int
+    idleDays: int
+    utilization: float
+    revenue: float
+    revenuePerAvailableDay: float
+
+
+class DailyOccupancy(BaseModel):
+    date: date
+    utilization: float  # Porcentaje de la flota ocupada ese día
+
+
+class UtilizationResponse(BaseModel):
+    desde: date
+    hasta: date
+    days: int
+    vehicles: int
+    utilization: float  # Porcentaje de toda la flota en el rango
+    byVehicle: List[VehicleUtilization]
+    byModel: List[ModelUtilization]
+    dailyOccupancy: List[DailyOccupancy]
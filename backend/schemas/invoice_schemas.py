@@ -19,6 +19,19 @@ class InvoiceCreate(BaseModel):
     paymentMethod: str = Field(..., min_length=1, max_length=255)
 
 
+class InvoiceBatchCreate(BaseModel):
+    paymentMethod: str = Field(..., min_length=1, max_length=255)
+
+
+class InvoiceBatchResponse(BaseModel):
+    created: int
+    issuedDate: date
+    leaseAmount: Decimal  # Suma de los montos base
+    incidentsTotal: Decimal  # Suma de los incidentes
+    total: Decimal  # Suma de los totales facturados
+    rentalIds: List[int]
+
+
 class InvoiceResponse(BaseModel):
     id: int
     rentalId: int
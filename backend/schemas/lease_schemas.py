@@ -1,16 +1,30 @@
 # schemas/lease_schemas.py
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import AfterValidator, BaseModel, Field
+from typing import Annotated, Optional, List
 from datetime import datetime, date
 from decimal import Decimal
 
 
+def _local_naive(value: datetime) -> datetime:
+    """
+    La base guarda fechas sin zona, en hora local del servidor (se comparan
+    con datetime.now()): una fecha con zona ("...Z", "-03:00") se pasa a esa
+    hora local y pierde la zona.
+    """
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+LocalDatetime = Annotated[datetime, AfterValidator(_local_naive)]
+
+
 class LeaseCreate(BaseModel):
     clientId: int
     vehicleId: int
     employeeId: int
-    date_time_start: datetime
-    date_time_end: datetime
+    date_time_start: LocalDatetime
+    date_time_end: LocalDatetime
     start_kilometers: Optional[int] = None
     
 
@@ -39,9 +53,26 @@ class LeaseResponse(BaseModel):
         from_attributes = True
 
 
+class LeaseBatchCreate(BaseModel):
+    leases: List[LeaseCreate] = Field(..., min_length=1, max_length=500)
+
+
+class LeaseBatchItemResult(BaseModel):
+    index: int  # Posición del ítem en el pedido
+    status: str  # "creado" o "rechazado"
+    lease: Optional[LeaseResponse] = None
+    reason: Optional[str] = None
+
+
+class LeaseBatchResponse(BaseModel):
+    created: int
+    rejected: int
+    results: List[LeaseBatchItemResult]
+
+
 class LeaseUpdate(BaseModel):
-    date_time_start: Optional[datetime] = None
-    date_time_end: Optional[datetime] = None
+    date_time_start: Optional[LocalDatetime] = None
+    date_time_end: Optional[LocalDatetime] = None
     start_kilometers: Optional[int] = None
     end_kilometers: Optional[int] = None
     state: Optional[str] = None
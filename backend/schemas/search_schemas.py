@@ -0,0 +1,27 @@
+# schemas/search_schemas.py
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class ClientMatch(BaseModel):
+    id: int
+    name: Optional[str] = None
+    dni: Optional[str] = None
+
+
+class VehicleMatch(BaseModel):
+    id: int
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    patente: Optional[str] = None
+
+
+class InvoiceMatch(BaseModel):
+    id: int
+    clientName: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    clients: List[ClientMatch]
+    vehicles: List[VehicleMatch]
+    invoices: List[InvoiceMatch]
@@ -0,0 +1,276 @@
+# services/availability.py
+"""
+Índice en memoria de disponibilidad de vehículos por rango de fechas.
+
+Se arma a partir de los alquileres activos (una consulta) y después lo
+mantienen al día los endpoints de alquileres al crear, confirmar, cancelar,
+finalizar o borrar. Cada AVAILABILITY_RELOAD_SECONDS se vuelve a armar desde
+la base, lo que corrige lo que no pasó por este proceso (escrituras de otro
+worker o directo en la base), igual que kpi_store con los KPIs.
+
+Es solo un filtro rápido: las escrituras confirman contra la tabla Leases
+(book_vehicle, apply_lease_update) y /vehiculos/disponibles puede mostrar
+datos con hasta AVAILABILITY_RELOAD_SECONDS de atraso respecto de otros
+workers. Los intervalos son semiabiertos [inicio, fin), por lo que un
+alquiler puede empezar justo cuando termina el anterior.
+"""
+import threading
+import time as clock
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+from typing import Mapping, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.data.config import settings
+from backend.models.lease import Lease
+
+# Estados de alquiler que ocupan el vehículo
+ACTIVE_LEASE_STATES = ("creado", "confirmado")
+
+
+class VehicleIntervals:
+    """
+    Alquileres activos de un vehículo ordenados por fecha de inicio.
+
+    `max_end[i]` es el mayor fin entre los intervalos 0..i, así saber si hay
+    solapamiento es una búsqueda binaria más una comparación.
+    """
+
+    __slots__ = ("starts", "ends", "lease_ids", "max_end")
+
+    def __init__(self):
+        self.starts: list[datetime] = []
+        self.ends: list[datetime] = []
+        self.lease_ids: list[int] = []
+        self.max_end: list[datetime] = []
+
+    def add(self, lease_id: int, start: datetime, end: datetime):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.lease_ids.insert(i, lease_id)
+        self._rebuild_max_end(i)
+
+    def remove(self, lease_id: int) -> Optional[tuple[datetime, datetime]]:
+        """Saca el alquiler y devuelve su intervalo (None si no estaba)."""
+        try:
+            i = self.lease_ids.index(lease_id)
+        except ValueError:
+            return None
+        interval = (self.starts[i], self.ends[i])
+        del self.starts[i], self.ends[i], self.lease_ids[i]
+        self._rebuild_max_end(i)
+        return interval
+
+    def conflicts(self, start: datetime, end: datetime) -> list[int]:
+        """Ids de los alquileres que se solapan con [start, end)."""
+        result = []
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_end[i] > start:
+            if self.ends[i] > start:
+                result.append(self.lease_ids[i])
+            i -= 1
+        return result
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        k = bisect_left(self.starts, end)
+        return k > 0 and self.max_end[k - 1] > start
+
+    def __len__(self):
+        return len(self.lease_ids)
+
+    def _rebuild_max_end(self, i: int):
+        del self.max_end[i:]
+        current = self.max_end[i - 1] if i else None
+        for end in self.ends[i:]:
+            if current is None or end > current:
+                current = end
+            self.max_end.append(current)
+
+
+class AvailabilityIndex:
+    """
+    Ocupación de toda la flota. Cada proceso (worker) mantiene su propio
+    índice; la fuente de verdad sigue siendo la tabla Leases.
+
+    Además de los intervalos por vehículo se guarda, por día, qué vehículos
+    tienen ese día ocupado completo y cuáles solo una parte. Así "qué autos
+    están ocupados de X a Y" se resuelve uniendo los días del rango, y solo
+    se verifica intervalo por intervalo a los vehículos ocupados parcialmente
+    en un día que el rango también cubre parcialmente.
+    """
+
+    def __init__(self, reload_seconds: float):
+        self.reload_seconds = reload_seconds
+        self._vehicles: dict[int, VehicleIntervals] = {}
+        self._lease_vehicle: dict[int, int] = {}
+        # ordinal del día -> {vehicleId: cantidad de alquileres activos ese día}
+        self._days: dict[int, dict[int, int]] = {}
+        self._partial_days: dict[int, dict[int, int]] = {}
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._loaded_at = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def needs_reload(self) -> bool:
+        return not self._loaded or clock.monotonic() - self._loaded_at >= self.reload_seconds
+
+    def ensure_loaded(self, db: Session):
+        """Carga el índice si no está cargado o si ya venció."""
+        if not self.needs_reload():
+            return
+        # Ya cargado: si otro hilo lo está rearmando, se sigue con el actual
+        if not self._load_lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            if self.needs_reload():
+                self.load(db)
+        finally:
+            self._load_lock.release()
+
+    def load(self, db: Session):
+        """(Re)construye el índice con los alquileres activos."""
+        rows = db.execute(
+            select(Lease.id, Lease.vehicleId, Lease.date_time_start, Lease.date_time_end)
+            .where(Lease.state.in_(ACTIVE_LEASE_STATES))
+            .order_by(Lease.vehicleId, Lease.date_time_start)
+        ).all()
+
+        vehicles: dict[int, VehicleIntervals] = {}
+        lease_vehicle: dict[int, int] = {}
+        days: dict[int, dict[int, int]] = {}
+        partial_days: dict[int, dict[int, int]] = {}
+        for lease_id, vehicle_id, start, end in rows:
+            intervals = vehicles.get(vehicle_id)
+            if intervals is None:
+                intervals = vehicles[vehicle_id] = VehicleIntervals()
+            # Las filas vienen ordenadas por inicio: se agregan al final
+            intervals.starts.append(start)
+            intervals.ends.append(end)
+            intervals.lease_ids.append(lease_id)
+            lease_vehicle[lease_id] = vehicle_id
+            _count_days(days, partial_days, vehicle_id, start, end, 1)
+        for intervals in vehicles.values():
+            intervals._rebuild_max_end(0)
+
+        with self._lock:
+            self._vehicles = vehicles
+            self._lease_vehicle = lease_vehicle
+            self._days = days
+            self._partial_days = partial_days
+            self._loaded = True
+            self._loaded_at = clock.monotonic()
+
+    def add(self, lease_id: int, vehicle_id: int, start: datetime, end: datetime):
+        with self._lock:
+            self._remove(lease_id)
+            intervals = self._vehicles.get(vehicle_id)
+            if intervals is None:
+                intervals = self._vehicles[vehicle_id] = VehicleIntervals()
+            intervals.add(lease_id, start, end)
+            self._lease_vehicle[lease_id] = vehicle_id
+            _count_days(self._days, self._partial_days, vehicle_id, start, end, 1)
+
+    def remove(self, lease_id: int):
+        with self._lock:
+            self._remove(lease_id)
+
+    def sync(self, lease: Mapping):
+        """
+        Refleja en el índice el estado actual de un alquiler (por ejemplo, el
+        dict que devuelve get_lease_response). Si el índice todavía no se
+        cargó no hace nada: la carga inicial ya va a leer el dato de la base.
+        """
+        if not self._loaded:
+            return
+        if lease["state"] in ACTIVE_LEASE_STATES:
+            self.add(lease["id"], lease["vehicleId"], lease["date_time_start"], lease["date_time_end"])
+        else:
+            self.remove(lease["id"])
+
+    def is_available(
+            self,
+            vehicle_id: int,
+            start: datetime,
+            end: datetime,
+            exclude_lease_id: Optional[int] = None
+    ) -> bool:
+        with self._lock:
+            intervals = self._vehicles.get(vehicle_id)
+            if not intervals:
+                return True
+            if exclude_lease_id is None:
+                return not intervals.overlaps(start, end)
+            return all(lease_id == exclude_lease_id for lease_id in intervals.conflicts(start, end))
+
+    def busy_vehicles(self, start: datetime, end: datetime) -> set[int]:
+        """Ids de los vehículos con algún alquiler activo en [start, end)."""
+        first, last = _day_span(start, end)
+        start_is_partial = start.time() != time.min
+        end_is_partial = end.time() != time.min
+
+        busy: set[int] = set()
+        edges: set[int] = set()
+        with self._lock:
+            for day in range(first, last + 1):
+                busy.update(self._days.get(day, ()))
+                partial = self._partial_days.get(day)
+                if not partial:
+                    continue
+                if (day == first and start_is_partial) or (day == last and end_is_partial):
+                    edges.update(partial)
+                else:
+                    busy.update(partial)
+            for vehicle_id in edges - busy:
+                if self._vehicles[vehicle_id].overlaps(start, end):
+                    busy.add(vehicle_id)
+        return busy
+
+    def _remove(self, lease_id: int):
+        vehicle_id = self._lease_vehicle.pop(lease_id, None)
+        if vehicle_id is None:
+            return
+        intervals = self._vehicles[vehicle_id]
+        removed = intervals.remove(lease_id)
+        if removed:
+            _count_days(self._days, self._partial_days, vehicle_id, removed[0], removed[1], -1)
+        if not intervals:
+            del self._vehicles[vehicle_id]
+
+
+def _day_span(start: datetime, end: datetime) -> tuple[int, int]:
+    """Primer y último día (ordinal) que toca el intervalo [start, end)."""
+    return start.toordinal(), (end - timedelta(microseconds=1)).toordinal()
+
+
+def _count_days(
+        days: dict[int, dict[int, int]],
+        partial_days: dict[int, dict[int, int]],
+        vehicle_id: int,
+        start: datetime,
+        end: datetime,
+        delta: int
+):
+    """Suma (o resta) el alquiler en cada día que ocupa, completo o parcialmente."""
+    first, last = _day_span(start, end)
+    for day in range(first, last + 1):
+        day_start = datetime.fromordinal(day)
+        covers_whole_day = start <= day_start and end >= day_start + timedelta(days=1)
+        buckets = days if covers_whole_day else partial_days
+        vehicles = buckets.setdefault(day, {})
+        count = vehicles.get(vehicle_id, 0) + delta
+        if count > 0:
+            vehicles[vehicle_id] = count
+        else:
+            vehicles.pop(vehicle_id, None)
+            if not vehicles:
+                del buckets[day]
+
+
+availability_index = AvailabilityIndex(settings.AVAILABILITY_RELOAD_SECONDS)
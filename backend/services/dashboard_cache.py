@@ -0,0 +1,106 @@
+# services/dashboard_cache.py
+"""
+Cache de la respuesta del dashboard.
+
+- TTL configurable (DASHBOARD_CACHE_TTL).
+- Single-flight: si el cache está vacío y llegan muchos pedidos juntos,
+  se calcula una sola vez y todos esperan ese mismo resultado. El cálculo
+  corre en una tarea propia (con su propia sesión de base, ver
+  dashboard_router): si se cancela el pedido que lo disparó, la tarea
+  sigue y el resto de los pedidos recibe el resultado, no la cancelación.
+- Se invalida cuando hay escrituras en facturas, alquileres o vehículos.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request
+
+from backend.data.config import settings
+from backend.services.metrics import record_cache
+
+
+class SingleFlightCache:
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self._value: Any = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._inflight: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get(self, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        `compute` no puede depender del pedido que la llama (por ejemplo, de
+        su sesión de base): corre en una tarea que puede sobrevivirlo.
+        """
+        if self._value is not None and time.monotonic() < self._expires_at:
+            self.hits += 1
+            record_cache(self.name, "hit")
+            return self._value
+
+        if self._inflight is not None:
+            self.coalesced += 1
+            record_cache(self.name, "coalesced")
+        else:
+            self.misses += 1
+            record_cache(self.name, "miss")
+            self._inflight = asyncio.ensure_future(self._compute(compute, self._generation))
+            # Si todos los que esperaban se cancelaron, nadie lee el error
+            self._inflight.add_done_callback(_consume_exception)
+        # shield: cancelar este pedido no cancela el cálculo compartido
+        return await asyncio.shield(self._inflight)
+
+    async def _compute(self, compute: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        try:
+            value = await compute()
+        finally:
+            self._inflight = None
+
+        with self._lock:
+            # Si hubo una escritura mientras se calculaba, no se guarda
+            if generation == self._generation:
+                self._value = value
+                self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._value = None
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "hitRatio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _consume_exception(task: asyncio.Future):
+    if not task.cancelled():
+        task.exception()
+
+
+dashboard_cache = SingleFlightCache("dashboard", settings.DASHBOARD_CACHE_TTL)
+
+
+async def invalidate_dashboard_on_write(request: Request):
+    """
+    Dependencia de router: después de cualquier escritura exitosa
+    (POST/PUT/PATCH/DELETE sin excepción) invalida el cache del dashboard.
+    """
+    yield
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        dashboard_cache.invalidate()
@@ -0,0 +1,63 @@
+# services/fast_json.py
+"""
+Respuesta JSON rápida para endpoints que ya arman sus datos.
+
+Cuando un endpoint devuelve un dict, FastAPI lo valida contra el
+response_model, lo pasa por jsonable_encoder y recién ahí lo codifica con el
+json de la librería estándar. FastJSONResponse hace la misma validación pero
+toda dentro de pydantic-core: un TypeAdapter del response_model (cacheado
+por tipo) valida el contenido y lo codifica directo a bytes con dump_json.
+El JSON resultante es el mismo (Decimal como string, fechas ISO) y un dato
+que no cumple el modelo, por ejemplo un None en un campo obligatorio, sigue
+siendo un error del servidor (ResponseValidationError) y no sale al cliente.
+"""
+import time
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter, ValidationError
+
+from backend.data.request_stats import record_serialize
+
+# Headers de la respuesta inyectada que no se copian (los pone la nueva)
+_OWN_HEADERS = {"content-length", "content-type"}
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def __init__(self, content: Any, model: Any, status_code: int = 200, headers: Optional[dict] = None):
+        self.adapter = _adapter(model)
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        try:
+            # by_alias como FastAPI al serializar el response_model
+            body = self.adapter.dump_json(self.adapter.validate_python(content), by_alias=True)
+        except ValidationError as exc:
+            raise ResponseValidationError(errors=exc.errors(include_url=False), body=content)
+        record_serialize(time.perf_counter() - start)
+        return body
+
+
+def fast_json(content: Any, model: Any, status_code: int = 200,
+              response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Arma la FastJSONResponse; `model` es el mismo response_model de la ruta.
+    Si se pasa la `response` inyectada por FastAPI se copian los headers que
+    le hayan puesto (por ejemplo X-Next-Cursor): al devolver una Response
+    propia, FastAPI ya no los agrega.
+    """
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k not in _OWN_HEADERS}
+    return FastJSONResponse(content, model, status_code=status_code, headers=headers)
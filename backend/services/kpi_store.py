@@ -0,0 +1,90 @@
+# services/kpi_store.py
+"""
+KPIs del dashboard mantenidos en memoria.
+
+Se siembran con las consultas agregadas de siempre y después los endpoints
+de escritura aplican deltas (factura pagada, alquiler creado, cambios de
+estado de clientes y vehículos). Cada KPI_RECONCILE_SECONDS el dashboard
+los vuelve a calcular contra la base, lo que corrige cualquier desvío (por
+ejemplo, escrituras hechas desde otro worker o directo en la base).
+"""
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.data.config import settings
+from backend.models.client import Client
+from backend.models.invoice import Invoice
+from backend.models.lease import Lease
+from backend.models.vehicle import Vehicle
+
+
+async def load_kpis(db: AsyncSession) -> dict:
+    """Calcula los KPIs desde cero (las cinco consultas agregadas)."""
+    total_revenue = await db.scalar(select(func.sum(Invoice.total)).where(
+        Invoice.status == "pagada"
+    )) or 0
+    total_rentals = await db.scalar(select(func.count(Lease.id))) or 0
+    active_clients = await db.scalar(select(func.count(Client.id.distinct())).where(
+        Client.status == "activo"
+    )) or 0
+    available_vehicles = await db.scalar(select(func.count(Vehicle.id)).where(
+        Vehicle.estado == "disponible"
+    )) or 0
+    total_vehicles = await db.scalar(select(func.count(Vehicle.id)).where(Vehicle.estado != "baja")) or 0
+
+    return {
+        "totalRevenue": float(total_revenue),
+        "totalRentals": total_rentals,
+        "activeClients": active_clients,
+        "availableVehicles": available_vehicles,
+        "totalVehicles": total_vehicles
+    }
+
+
+class KpiStore:
+    def __init__(self, reconcile_seconds: float):
+        self.reconcile_seconds = reconcile_seconds
+        self._values: Optional[dict] = None
+        self._seeded_at = 0.0
+        self._lock = threading.Lock()
+
+    def needs_reconcile(self) -> bool:
+        return self._values is None or time.monotonic() - self._seeded_at >= self.reconcile_seconds
+
+    def seed(self, values: dict):
+        with self._lock:
+            self._values = dict(values)
+            self._seeded_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values) if self._values is not None else {}
+
+    def add(self, **deltas):
+        """Aplica deltas, p. ej. add(totalRentals=1). Sin sembrar no hace nada."""
+        with self._lock:
+            if self._values is None:
+                return
+            for key, delta in deltas.items():
+                self._values[key] += delta
+
+    def vehicle_state_changed(self, old: Optional[str], new: Optional[str]):
+        """`old=None` es un vehículo nuevo y `new=None` uno eliminado."""
+        if old == new:
+            return
+        self.add(
+            availableVehicles=(new == "disponible") - (old == "disponible"),
+            totalVehicles=(new not in (None, "baja")) - (old not in (None, "baja")),
+        )
+
+    def client_status_changed(self, old: Optional[str], new: Optional[str]):
+        if old == new:
+            return
+        self.add(activeClients=(new == "activo") - (old == "activo"))
+
+
+kpi_store = KpiStore(settings.KPI_RECONCILE_SECONDS)
@@ -0,0 +1,152 @@
+# services/metrics.py
+"""
+Métricas en formato Prometheus (GET /metrics).
+
+- Por ruta: cantidad de pedidos y latencia (histograma), etiquetados con la
+  plantilla de la ruta ("/alquileres/{id_alquiler}") y no con el path real,
+  para no abrir una serie por id. Lo que no matchea ninguna ruta va a
+  "unmatched".
+- Pedidos en curso.
+- Pool de conexiones: conexiones en uso y capacidad (pool_size +
+  max_overflow) por engine; la utilización es el cociente.
+- Caches: lookups por resultado (hit, miss, coalesced) del dashboard y de
+  los GET condicionales (ETag).
+- Negocio: alquileres creados, facturas pagadas y monto cobrado.
+
+Varios workers: con PROMETHEUS_MULTIPROC_DIR apuntando a un directorio vacío
+(se vacía antes de cada arranque), prometheus_client guarda los valores en
+archivos mmap por proceso y /metrics suma los de todos los workers, atienda
+quien atienda el scrape. Los gauges usan "livesum": solo cuentan los
+procesos vivos.
+
+Los hijos de cada métrica con etiquetas se cachean para que el costo por
+pedido quede en un par de incrementos.
+"""
+import os
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.data.config import settings
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Segundos; cubre desde un 304 hasta un listado grande contra el MySQL remoto
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED_ROUTE = "unmatched"
+
+http_requests = Counter(
+    "http_requests_total", "Pedidos HTTP atendidos", ["method", "route", "status"]
+)
+http_latency = Histogram(
+    "http_request_duration_seconds", "Duración de los pedidos HTTP", ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+http_in_flight = Gauge(
+    "http_requests_in_flight", "Pedidos HTTP en curso", multiprocess_mode="livesum"
+)
+
+db_pool_in_use = Gauge(
+    "db_pool_connections_in_use", "Conexiones del pool prestadas", ["engine"],
+    multiprocess_mode="livesum",
+)
+db_pool_capacity = Gauge(
+    "db_pool_connections_capacity", "Máximo de conexiones del pool (pool_size + max_overflow)", ["engine"],
+    multiprocess_mode="livesum",
+)
+
+cache_lookups = Counter(
+    "cache_lookups_total", "Consultas a caches en memoria por resultado", ["cache", "result"]
+)
+
+leases_created = Counter("leases_created_total", "Alquileres creados")
+invoices_paid = Counter("invoices_paid_total", "Facturas pagadas")
+invoices_paid_amount = Counter("invoices_paid_amount_total", "Monto total de las facturas pagadas")
+
+
+class _ChildCache(dict):
+    """labels() arma una tupla y toma un lock en cada llamada; esto no."""
+
+    def __init__(self, metric):
+        super().__init__()
+        self.metric = metric
+
+    def __missing__(self, key):
+        child = self[key] = self.metric.labels(*key)
+        return child
+
+
+_request_counters = _ChildCache(http_requests)
+_latency_histograms = _ChildCache(http_latency)
+_cache_counters = _ChildCache(cache_lookups)
+
+
+def record_cache(cache: str, result: str):
+    _cache_counters[cache, result].inc()
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro: cuenta y mide cada pedido HTTP."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            # El router de FastAPI deja la ruta que matcheó en el scope
+            route = scope.get("route")
+            template = route.path if route is not None else UNMATCHED_ROUTE
+            method = scope["method"]
+            _request_counters[method, template, str(status_code)].inc()
+            _latency_histograms[method, template].observe(elapsed)
+
+
+def instrument_pool(engine: Engine, name: str):
+    """Conexiones en uso del pool del engine, por eventos de checkout/checkin."""
+    in_use = db_pool_in_use.labels(name)
+    db_pool_capacity.labels(name).set(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        in_use.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        in_use.dec()
+
+
+def render_metrics() -> bytes:
+    if MULTIPROCESS:
+        # Registro nuevo por scrape: junta los archivos de todos los workers
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead():
+    """Al apagar el worker: sus gauges "livesum" dejan de sumar."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,58 @@
+# services/pagination.py
+"""
+Paginación por cursor (keyset) para los listados grandes.
+
+El cursor es un token opaco con el último id devuelto; la página siguiente
+se pide con `WHERE id > :ultimo_id ORDER BY id LIMIT n`, que cuesta lo mismo
+sea la primera página o la número mil (a diferencia de OFFSET).
+"""
+import base64
+import binascii
+import json
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def apply_page(query, id_column, cursor: Optional[str], skip: int, limit: int):
+    """
+    Ordena por id y aplica el cursor si vino (si no, el skip de siempre).
+    Pide una fila de más para saber si hay otra página.
+    """
+    query = query.order_by(id_column)
+    if cursor:
+        query = query.where(id_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def finish_page(
+        rows: Sequence,
+        limit: int,
+        response: Response,
+        get_id: Callable[[Any], int] = lambda row: row.id
+) -> list:
+    """Recorta la fila extra y, si hay más resultados, deja el cursor en el header."""
+    page = list(rows[:limit])
+    if len(rows) > limit and page:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(get_id(page[-1]))
+    return page
@@ -0,0 +1,180 @@
+# services/passwords.py
+"""
+Hash y verificación de contraseñas (bcrypt) fuera del threadpool de requests.
+
+bcrypt consume ~100-300 ms de CPU por llamada; corriendo en el threadpool
+compartido, una ráfaga de logins frena a todos los demás endpoints. Acá se
+ejecuta en un pool de procesos propio y acotado:
+
+- PASSWORD_WORKERS procesos hacen el trabajo.
+- Como máximo PASSWORD_MAX_PENDING operaciones en curso o en cola; si se
+  supera, se rechaza enseguida con 503 en lugar de encolar sin límite.
+- Si un proceso del pool muere (OOM, kill) el pool queda roto para siempre:
+  se descarta, el próximo pedido arma uno nuevo y los afectados reciben el
+  mismo 503 con Retry-After.
+
+Solo hay versiones async: esperar el resultado con future.result() dejaría
+un hilo del threadpool bloqueado mientras el proceso hace el hash, que es
+justo lo que se quiere evitar. Los endpoints que las usan son async.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from backend.data.config import settings
+
+password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Funciones que corren dentro de los procesos del pool: devuelven el
+# resultado y cuánto tardó el hash en sí
+def _hash(password: str) -> tuple[str, float]:
+    started = time.perf_counter()
+    hashed = password_context.hash(password)
+    return hashed, time.perf_counter() - started
+
+
+def _verify(password: str, hashed: str) -> tuple[bool, float]:
+    started = time.perf_counter()
+    ok = password_context.verify(password, hashed)
+    return ok, time.perf_counter() - started
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._hash_seconds_total = 0.0
+        self._hash_seconds_max = 0.0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash, password))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self._submit(_verify, password, hashed))
+
+    def start(self):
+        """Levanta los procesos al arrancar la app, así el primer login no paga el spawn."""
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(time.perf_counter)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "maxPending": self.max_pending,
+                "pending": self._pending,
+                "completed": completed,
+                "rejected": self._rejected,
+                "hashMsAvg": round(self._hash_seconds_total * 1000 / completed, 2) if completed else 0.0,
+                "hashMsMax": round(self._hash_seconds_max * 1000, 2),
+                "queueWaitMsAvg": round(self._wait_seconds_total * 1000 / completed, 2) if completed else 0.0,
+                "queueWaitMsMax": round(self._wait_seconds_max * 1000, 2),
+            }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: no se hace fork de un proceso con threads (uvicorn, pools de DB)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """Saca de servicio un pool roto; el próximo _get_executor arma otro."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _unavailable() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise self._unavailable()
+        with self._lock:
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        executor = self._get_executor()
+        try:
+            inner = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(None, 0.0)
+            self._discard_executor(executor)
+            raise self._unavailable()
+        except BaseException:
+            self._release(None, 0.0)
+            raise
+
+        outer: Future = Future()
+
+        def done(f: Future):
+            elapsed = time.perf_counter() - submitted
+            if f.cancelled():
+                self._release(None, elapsed)
+                outer.cancel()
+                return
+            exc = f.exception()
+            if exc is not None:
+                self._release(None, elapsed)
+                if isinstance(exc, BrokenProcessPool):
+                    self._discard_executor(executor)
+                    exc = self._unavailable()
+                outer.set_exception(exc)
+                return
+            value, duration = f.result()
+            self._release(duration, elapsed)
+            outer.set_result(value)
+
+        inner.add_done_callback(done)
+        return outer
+
+    def _release(self, duration: Optional[float], elapsed: float):
+        with self._lock:
+            self._pending -= 1
+            if duration is not None:
+                # La espera en cola es todo lo que no fue el hash en sí
+                wait = max(elapsed - duration, 0.0)
+                self._completed += 1
+                self._hash_seconds_total += duration
+                self._hash_seconds_max = max(self._hash_seconds_max, duration)
+                self._wait_seconds_total += wait
+                self._wait_seconds_max = max(self._wait_seconds_max, wait)
+        self._slots.release()
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_WORKERS, settings.PASSWORD_MAX_PENDING)
@@ -0,0 +1,119 @@
+# services/request_timing.py
+"""
+Métricas por pedido: cuántas sentencias SQL corrió, cuántas filas trajo,
+cuánto tiempo pasó en la base y cuánto en serializar la respuesta.
+
+El middleware abre un RequestStats (data/request_stats.py) en un ContextVar
+al entrar el pedido; los eventos del engine y el render de las respuestas
+JSON lo van completando. Como el ContextVar se copia a los hilos del
+threadpool, funciona igual para endpoints sync y async.
+
+El resultado sale en el header Server-Timing (lo muestran las devtools del
+navegador) y en una línea de log JSON por pedido. Si una misma sentencia se
+repite más de N_PLUS_ONE_THRESHOLD veces se loguea un warning: casi siempre
+es una relación lazy recorrida dentro de un for.
+"""
+import json
+import logging
+import time
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.data.config import settings
+from backend.data.request_stats import RequestStats, current_request, record_serialize
+
+logger = logging.getLogger("backend.requests")
+if not logger.handlers and not logging.getLogger().handlers:
+    # Sin configuración de logging (uvicorn solo configura sus loggers)
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(levelname)s:     %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# Largo máximo de la sentencia en el warning de N+1
+SHAPE_LOG_CHARS = 300
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse por defecto de la app; mide el tiempo de render."""
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = super().render(content)
+        record_serialize(time.perf_counter() - start)
+        return body
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    return (
+        f'db;dur={_ms(stats.db_seconds)};desc="{stats.statements} queries", '
+        f"serialize;dur={_ms(stats.serialize_seconds)}, "
+        f"total;dur={_ms(total)}"
+    )
+
+
+class RequestTimingMiddleware:
+    """
+    Middleware ASGI puro (no BaseHTTPMiddleware: ese corre el endpoint en otra
+    tarea y el ContextVar no vuelve con los datos).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.REQUEST_TIMING:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # El body ya está renderizado: db y serialize están completos
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            self.log(scope, stats, status_code, time.perf_counter() - start)
+
+    @staticmethod
+    def log(scope: Scope, stats: RequestStats, status_code: int, total: float):
+        route = scope.get("route")
+        path_template = getattr(route, "path", None)
+        if settings.REQUEST_LOG:
+            logger.info(json.dumps({
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": path_template,
+                "status": status_code,
+                "totalMs": _ms(total),
+                "dbMs": _ms(stats.db_seconds),
+                "serializeMs": _ms(stats.serialize_seconds),
+                "statements": stats.statements,
+                "rows": stats.rows,
+            }))
+        for shape, count in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+            logger.warning(json.dumps({
+                "event": "n_plus_one",
+                "method": scope["method"],
+                "route": path_template or scope["path"],
+                "count": count,
+                "statement": " ".join(shape.split())[:SHAPE_LOG_CHARS],
+            }))
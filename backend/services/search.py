@@ -0,0 +1,219 @@
+# services/search.py
+"""
+Búsqueda por subcadena con un índice invertido de trigramas en memoria.
+
+Por cada entidad (clientes, vehículos, facturas) se guarda el
+texto normalizado de sus columnas de búsqueda (minúsculas y sin acentos,
+como la collation de MySQL) y, por cada trigrama, el conjunto de ids que lo
+contienen. Buscar "abcd" es intersectar los conjuntos de "abc" y "bcd" y
+confirmar la subcadena solo en esos candidatos, sin recorrer la tabla.
+
+Igual que el índice de disponibilidad, cada proceso arma el suyo con una
+consulta por entidad la primera vez que se usa y después lo mantienen al
+día los endpoints de alta, modificación y baja. Cada SEARCH_RELOAD_SECONDS
+se vuelve a armar desde la base, lo que corrige lo que escribieron otros
+workers o directo en la base. Como puede tener ese atraso, solo lo usa
+GET /buscar; los filtros de los listados siguen siendo un ilike en la base.
+"""
+import threading
+import time as clock
+import unicodedata
+from typing import Iterable, Iterator, Mapping, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.data.config import settings
+from backend.models.client import Client
+from backend.models.invoice import Invoice
+from backend.models.vehicle import Vehicle
+
+MIN_QUERY_LENGTH = 3
+
+# Candidatos que se revisan como máximo para ordenar una búsqueda: con
+# consultas muy genéricas (cientos de miles de coincidencias) el orden es
+# aproximado, pero la respuesta sigue tardando lo mismo
+MAX_RANK_CANDIDATES = 2000
+
+# entidad -> (modelo, columnas de búsqueda)
+ENTITIES = {
+    "clients": (Client, ("name", "dni")),
+    "vehicles": (Vehicle, ("brand", "model", "patente")),
+    "invoices": (Invoice, ("clientName",)),
+}
+
+
+def normalize(value: Optional[str]) -> str:
+    """Minúsculas y sin acentos ("Peña" -> "pena")."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value).lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Índice de una entidad: documentos por id y postings por trigrama."""
+
+    def __init__(self, fields: tuple[str, ...]):
+        self.fields = fields
+        self._values: dict[int, tuple] = {}  # valores originales, para mostrar
+        self._texts: dict[int, tuple[str, ...]] = {}  # valores normalizados
+        self._full: dict[int, str] = {}  # valores normalizados unidos por espacios
+        self._postings: dict[str, set[int]] = {}
+
+    def __len__(self):
+        return len(self._texts)
+
+    def put(self, doc_id: int, values: tuple):
+        self.remove(doc_id)
+        texts = tuple(normalize(v) for v in values)
+        full = " ".join(texts)
+        self._values[doc_id] = values
+        self._texts[doc_id] = texts
+        self._full[doc_id] = full
+        for gram in trigrams(full):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = set()
+            postings.add(doc_id)
+
+    def remove(self, doc_id: int):
+        full = self._full.pop(doc_id, None)
+        if full is None:
+            return
+        del self._values[doc_id], self._texts[doc_id]
+        for gram in trigrams(full):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def values(self, doc_id: int) -> dict:
+        return dict(zip(self.fields, self._values[doc_id]))
+
+    def candidates(self, query: str) -> Iterator[int]:
+        """
+        Ids que contienen todos los trigramas de la consulta (superconjunto de
+        las coincidencias). Se generan a medida que se piden, recorriendo el
+        posting más chico, para poder cortar antes sin intersectar todo.
+        Una consulta sin trigramas (menos de 3 caracteres) no tiene candidatos.
+        """
+        postings = []
+        for gram in trigrams(query):
+            ids = self._postings.get(gram)
+            if not ids:
+                return iter(())
+            postings.append(ids)
+        if not postings:
+            return iter(())
+        postings.sort(key=len)
+        smallest, rest = postings[0], postings[1:]
+        return (doc_id for doc_id in smallest if all(doc_id in ids for ids in rest))
+
+    def ranked(self, query: str, limit: int) -> list[int]:
+        """
+        Ids que contienen la consulta, ordenados: primero los que tienen un
+        campo que empieza con ella, después los que tienen una palabra que
+        empieza con ella y al final el resto; a igualdad, el texto más corto.
+
+        Se deja de revisar al juntar `limit` coincidencias del mejor nivel o
+        al pasar MAX_RANK_CANDIDATES candidatos.
+        """
+        query = normalize(query)
+        word_query = f" {query}"
+        scored = []
+        best = 0
+        for checked, doc_id in enumerate(self.candidates(query), 1):
+            full = self._full[doc_id]
+            if query in full:
+                if any(t.startswith(query) for t in self._texts[doc_id]):
+                    tier = 0
+                    best += 1
+                elif word_query in full:
+                    tier = 1
+                else:
+                    tier = 2
+                scored.append((tier, len(full), doc_id))
+            if best >= limit or checked >= MAX_RANK_CANDIDATES:
+                break
+        scored.sort()
+        return [doc_id for _, _, doc_id in scored[:limit]]
+
+
+class SearchIndex:
+    def __init__(self, reload_seconds: float):
+        self.reload_seconds = reload_seconds
+        self._indexes = {name: TrigramIndex(fields) for name, (_, fields) in ENTITIES.items()}
+        # entidad -> momento (monotonic) en que se armó su índice
+        self._loaded_at: dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+
+    def loaded(self, entity: str) -> bool:
+        return entity in self._loaded_at
+
+    def needs_reload(self, entity: str) -> bool:
+        loaded_at = self._loaded_at.get(entity)
+        return loaded_at is None or clock.monotonic() - loaded_at >= self.reload_seconds
+
+    def ensure_loaded(self, db: Session, entities: Iterable[str] = ENTITIES):
+        """Carga las entidades que no están cargadas o cuyo índice ya venció."""
+        for entity in entities:
+            if not self.needs_reload(entity):
+                continue
+            # Ya cargada: si otro hilo la está rearmando, se sigue con la actual
+            if not self._load_lock.acquire(blocking=not self.loaded(entity)):
+                continue
+            try:
+                if self.needs_reload(entity):
+                    self.load(db, entity)
+            finally:
+                self._load_lock.release()
+
+    def load(self, db: Session, entity: str):
+        """(Re)construye el índice de una entidad con una sola consulta."""
+        model, fields = ENTITIES[entity]
+        index = TrigramIndex(fields)
+        for row in db.execute(select(model.id, *(getattr(model, f) for f in fields))):
+            index.put(row[0], tuple(row[1:]))
+        with self._lock:
+            self._indexes[entity] = index
+            self._loaded_at[entity] = clock.monotonic()
+
+    def invalidate(self, entity: str):
+        """Descarta el índice (por ejemplo tras una carga masiva); se rearma al próximo uso."""
+        with self._lock:
+            self._loaded_at.pop(entity, None)
+
+    def sync(self, entity: str, obj):
+        """Refleja un alta o modificación (obj: instancia del modelo o mapping)."""
+        if not self.loaded(entity):
+            return
+        _, fields = ENTITIES[entity]
+        if isinstance(obj, Mapping):
+            values = tuple(obj.get(f) for f in fields)
+            doc_id = obj["id"]
+        else:
+            values = tuple(getattr(obj, f) for f in fields)
+            doc_id = obj.id
+        with self._lock:
+            self._indexes[entity].put(doc_id, values)
+
+    def remove(self, entity: str, doc_id: int):
+        if not self.loaded(entity):
+            return
+        with self._lock:
+            self._indexes[entity].remove(doc_id)
+
+    def search(self, entity: str, query: str, limit: int) -> list[dict]:
+        with self._lock:
+            index = self._indexes[entity]
+            return [{"id": doc_id, **index.values(doc_id)} for doc_id in index.ranked(query, limit)]
+
+
+search_index = SearchIndex(settings.SEARCH_RELOAD_SECONDS)
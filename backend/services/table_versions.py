@@ -0,0 +1,113 @@
+# services/table_versions.py
+"""
+GET condicional (ETag / Last-Modified) para los listados de catálogo.
+
+Cada tabla tiene una versión en la base (tabla TableVersions, una fila por
+tabla) que suben los endpoints de escritura con un UPDATE atómico. El ETag
+de un listado es tabla + versión + hash de los parámetros de la consulta,
+así que se puede comparar con If-None-Match y responder 304 con una lectura
+por clave primaria, sin correr la consulta del listado ni serializar nada.
+
+Al estar en la base, la versión es la misma para todos los workers y
+sobrevive a los reinicios: una escritura que atiende otro worker también
+invalida los ETags que entregó éste.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.data.database import async_engine
+from backend.models.table_version import TableVersion
+from backend.services.metrics import record_cache
+
+
+class TableVersions:
+    async def bump(self, table: str):
+        now = int(time.time())
+        statement = (
+            update(TableVersion)
+            .where(TableVersion.name == table)
+            .values(
+                version=TableVersion.version + 1,
+                # Last-Modified tiene precisión de segundos: siempre avanza al menos
+                # uno, para que If-Modified-Since no confunda dos escrituras seguidas
+                modified=case((TableVersion.modified >= now, TableVersion.modified + 1), else_=now),
+            )
+        )
+        try:
+            async with async_engine.begin() as conn:
+                if (await conn.execute(statement)).rowcount == 0:
+                    # Primera escritura de la tabla
+                    await conn.execute(insert(TableVersion).values(name=table, version=1, modified=now))
+        except IntegrityError:
+            # Otro worker insertó la fila al mismo tiempo: ahora sí existe
+            async with async_engine.begin() as conn:
+                await conn.execute(statement)
+
+    async def get(self, table: str) -> tuple[int, Optional[datetime]]:
+        """Versión y fecha de la última escritura (None si nunca se escribió)."""
+        async with async_engine.connect() as conn:
+            row = (await conn.execute(
+                select(TableVersion.version, TableVersion.modified).where(TableVersion.name == table)
+            )).first()
+        if row is None:
+            return 0, None
+        return row.version, datetime.fromtimestamp(row.modified, timezone.utc)
+
+
+table_versions = TableVersions()
+
+
+def bump_on_write(*tables: str):
+    """Dependencia de router: tras una escritura exitosa sube la versión de las tablas."""
+    async def dependency(request: Request):
+        yield
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            for table in tables:
+                await table_versions.bump(table)
+    return dependency
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Comparación débil (RFC 9110): se ignora el prefijo W/
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def conditional_get(table: str):
+    """
+    Dependencia de ruta para un listado: agrega ETag y Last-Modified a la
+    respuesta y, si el cliente ya tiene esa versión, corta con 304.
+    """
+    async def dependency(request: Request, response: Response):
+        version, modified = await table_versions.get(table)
+        params = hashlib.blake2b(str(sorted(request.query_params.multi_items())).encode(), digest_size=6).hexdigest()
+        etag = f'"{table}-{version}-{params}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if modified is not None:
+            headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            not_modified = False
+            if_modified_since = request.headers.get("if-modified-since")
+            if if_modified_since and modified is not None:
+                try:
+                    not_modified = modified <= parsedate_to_datetime(if_modified_since)
+                except (TypeError, ValueError):
+                    pass
+
+        record_cache("etag", "hit" if not_modified else "miss")
+        if not_modified:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+    return dependency
@@ -0,0 +1,182 @@
+# services/tokens.py
+"""
+Tokens de acceso y de refresco firmados con HMAC-SHA256.
+
+Formato: base64url(payload JSON) + "." + base64url(firma). El payload lleva
+el usuario, su empleado, si es admin, el tipo de token, el vencimiento y un
+jti único. Validar un token es recalcular la firma y mirar el vencimiento y
+la lista de revocados en memoria: no se consulta la base ni se corre bcrypt.
+
+La lista de revocados es por proceso (cada worker tiene la suya) y está
+acotada; por eso el token de acceso dura poco (ACCESS_TOKEN_TTL_SECONDS).
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from backend.data.config import settings
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+# Largo mínimo de AUTH_SECRET_KEY
+MIN_SECRET_CHARS = 16
+
+
+class TokenError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class TokenUser:
+    userId: int
+    employeeId: Optional[int]
+    username: str
+    admin: bool
+    jti: str
+    exp: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class RevokedTokens:
+    """LRU de jti revocados; los que ya vencieron se pueden descartar."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, exp: int):
+        with self._lock:
+            self._items[jti] = exp
+            self._items.move_to_end(jti)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __contains__(self, jti: str) -> bool:
+        with self._lock:
+            exp = self._items.get(jti)
+            if exp is None:
+                return False
+            if exp < time.time():
+                del self._items[jti]
+                return False
+            self._items.move_to_end(jti)
+            return True
+
+
+class TokenService:
+    def __init__(self, secret: Optional[str], access_ttl: int, refresh_ttl: int, revoked_max: int):
+        # Sin clave fija cada worker firmaría con otra y los tokens no valdrían
+        # entre procesos ni después de un reinicio: mejor no arrancar
+        if not secret or len(secret) < MIN_SECRET_CHARS:
+            raise RuntimeError(
+                f"AUTH_SECRET_KEY must be set (at least {MIN_SECRET_CHARS} characters), "
+                "e.g. in .env: python -c \"import secrets; print(secrets.token_urlsafe(32))\""
+            )
+        self._key = secret.encode("utf-8")
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+        self.revoked = RevokedTokens(revoked_max)
+
+    def issue_pair(self, user_id: int, employee_id: Optional[int], username: str, admin: bool) -> dict:
+        claims = {"sub": user_id, "emp": employee_id, "usr": username, "adm": admin}
+        return {
+            "token": self._issue(claims, ACCESS, self.access_ttl),
+            "refreshToken": self._issue(claims, REFRESH, self.refresh_ttl),
+            "tokenType": "bearer",
+            "expiresIn": self.access_ttl,
+        }
+
+    def decode(self, token: str, token_type: str) -> TokenUser:
+        try:
+            payload_b64, signature_b64 = token.split(".")
+            signature = _b64decode(signature_b64)
+        except ValueError:
+            raise TokenError("Malformed token")
+        if not hmac.compare_digest(signature, self._sign(payload_b64)):
+            raise TokenError("Invalid token signature")
+
+        claims = json.loads(_b64decode(payload_b64))
+        if claims.get("typ") != token_type:
+            raise TokenError("Wrong token type")
+        if claims["exp"] < time.time():
+            raise TokenError("Token expired")
+        if claims["jti"] in self.revoked:
+            raise TokenError("Token revoked")
+        return TokenUser(
+            userId=claims["sub"],
+            employeeId=claims["emp"],
+            username=claims["usr"],
+            admin=claims["adm"],
+            jti=claims["jti"],
+            exp=claims["exp"],
+        )
+
+    def revoke(self, user: TokenUser):
+        self.revoked.add(user.jti, user.exp)
+
+    def _issue(self, claims: dict, token_type: str, ttl: int) -> str:
+        now = int(time.time())
+        payload = dict(claims, typ=token_type, iat=now, exp=now + ttl, jti=secrets.token_urlsafe(12))
+        payload_b64 = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        return f"{payload_b64}.{_b64encode(self._sign(payload_b64))}"
+
+    def _sign(self, payload_b64: str) -> bytes:
+        return hmac.new(self._key, payload_b64.encode("ascii"), hashlib.sha256).digest()
+
+
+token_service = TokenService(
+    settings.AUTH_SECRET_KEY,
+    settings.ACCESS_TOKEN_TTL_SECONDS,
+    settings.REFRESH_TOKEN_TTL_SECONDS,
+    settings.REVOKED_TOKENS_MAX,
+)
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def require_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)) -> TokenUser:
+    """Dependencia: exige un token de acceso válido (sin consultar la base)."""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        return token_service.decode(credentials.credentials, ACCESS)
+    except (TokenError, KeyError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(exc) if isinstance(exc, TokenError) else "Malformed token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+def require_admin(user: TokenUser = Depends(require_user)) -> TokenUser:
+    """Dependencia: exige un token de acceso de un usuario administrador."""
+    if not user.admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return user
+
+
+def is_admin_cargo(cargo: Optional[str]) -> bool:
+    return bool(cargo) and cargo.strip().lower() in settings.ADMIN_CARGOS
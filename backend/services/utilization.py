@@ -0,0 +1,163 @@
+# services/utilization.py
+"""
+Utilización de la flota: matriz de ocupación vehículo x día.
+
+Los alquileres del rango se traen en una sola consulta y se rasterizan con
+NumPy sin recorrer los días: cada alquiler suma +1 en su primer día y -1
+después del último en un arreglo de diferencias, y la suma acumulada por
+fila da cuántos alquileres ocupan el vehículo cada día. Un día cuenta como
+ocupado si algún alquiler lo toca, aunque sea una parte.
+
+Los ingresos de un alquiler se prorratean según la fracción de su duración
+que cae dentro del rango.
+"""
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.lease import Lease
+from backend.models.vehicle import Vehicle
+
+# Estados de alquiler que no ocupan el vehículo
+IGNORED_LEASE_STATES = ("cancelado",)
+
+SECONDS_PER_DAY = 86400.0
+
+
+def occupancy_matrix(rows: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                     vehicles: int, days: int) -> np.ndarray:
+    """
+    Matriz booleana (vehicles x days) de días ocupados.
+
+    `rows` es la fila (vehículo) de cada alquiler; `starts` y `ends` son
+    los extremos del intervalo en días (float) contados desde el inicio del
+    rango. Lo que queda fuera de [0, days) se recorta.
+    """
+    first = np.clip(np.floor(starts), 0, days).astype(np.int64)
+    last = np.clip(np.ceil(ends), 0, days).astype(np.int64)  # exclusivo
+    width = days + 1
+    # Un alquiler fuera del rango queda con first == last y se anula solo
+    diff = (
+        np.bincount(rows * width + first, minlength=vehicles * width)
+        - np.bincount(rows * width + last, minlength=vehicles * width)
+    ).reshape(vehicles, width)
+    return np.cumsum(diff[:, :days], axis=1) > 0
+
+
+def prorated_revenue(rows: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                     amounts: np.ndarray, vehicles: int, days: int) -> np.ndarray:
+    """Ingresos por vehículo, proporcionales a la parte del alquiler dentro del rango."""
+    length = ends - starts
+    inside = np.clip(np.minimum(ends, days) - np.maximum(starts, 0), 0, None)
+    share = np.divide(inside, length, out=np.ones_like(length), where=length > 0)
+    return np.bincount(rows, weights=amounts * share, minlength=vehicles)
+
+
+def _percent(part: np.ndarray, total) -> np.ndarray:
+    return np.round(part / total * 100, 2) if total else np.zeros(len(part))
+
+
+async def fleet_utilization(db: AsyncSession, desde: date, hasta: date) -> dict:
+    """Utilización por vehículo y por modelo entre `desde` y `hasta` (ambos inclusive)."""
+    days = (hasta - desde).days + 1
+    range_start = datetime.combine(desde, time.min)
+    range_end = range_start + timedelta(days=days)
+
+    vehicles = (await db.execute(
+        select(Vehicle.id, Vehicle.brand, Vehicle.model, Vehicle.patente).order_by(Vehicle.id)
+    )).all()
+    # Por Core y no por la sesión ORM: son muchas filas de cuatro columnas
+    # y el armado de resultados del ORM no aporta nada acá
+    conn = await db.connection()
+    leases = (await conn.execute(
+        select(Lease.vehicleId, Lease.date_time_start, Lease.date_time_end, Lease.amount).where(
+            Lease.state.notin_(IGNORED_LEASE_STATES),
+            Lease.date_time_start < range_end,
+            Lease.date_time_end > range_start,
+        )
+    )).all()
+
+    vehicle_ids = np.fromiter((v.id for v in vehicles), dtype=np.int64, count=len(vehicles))
+    n = len(vehicles)
+
+    if leases and n:
+        # fromiter con restas de datetime: convertir la lista de datetimes a
+        # datetime64 con np.array es varias veces más lento
+        count = len(leases)
+        lease_vehicle_ids = np.fromiter((lease[0] for lease in leases), dtype=np.int64, count=count)
+        starts = np.fromiter(
+            ((lease[1] - range_start).total_seconds() for lease in leases), dtype=np.float64, count=count
+        ) / SECONDS_PER_DAY
+        ends = np.fromiter(
+            ((lease[2] - range_start).total_seconds() for lease in leases), dtype=np.float64, count=count
+        ) / SECONDS_PER_DAY
+        amounts = np.fromiter((float(lease[3] or 0) for lease in leases), dtype=np.float64, count=count)
+        # Fila de cada alquiler; los de vehículos inexistentes se descartan
+        rows = np.searchsorted(vehicle_ids, lease_vehicle_ids)
+        known = (rows < n) & (vehicle_ids[np.minimum(rows, n - 1)] == lease_vehicle_ids)
+        rows, starts, ends, amounts = rows[known], starts[known], ends[known], amounts[known]
+    else:
+        rows = np.zeros(0, dtype=np.int64)
+        starts = ends = amounts = np.zeros(0)
+
+    occupied = occupancy_matrix(rows, starts, ends, n, days)
+    occupied_days = occupied.sum(axis=1)
+    revenue = prorated_revenue(rows, starts, ends, amounts, n, days)
+
+    utilization = _percent(occupied_days, days)
+    revenue_per_day = np.round(revenue / days, 2)
+    revenue_rounded = np.round(revenue, 2)
+    by_vehicle = [
+        {
+            "vehicleId": vehicle.id,
+            "brand": vehicle.brand,
+            "model": vehicle.model,
+            "patente": vehicle.patente,
+            "occupiedDays": int(occupied_days[i]),
+            "idleDays": int(days - occupied_days[i]),
+            "utilization": float(utilization[i]),
+            "revenue": float(revenue_rounded[i]),
+            "revenuePerAvailableDay": float(revenue_per_day[i]),
+        }
+        for i, vehicle in enumerate(vehicles)
+    ]
+
+    # Agregado por modelo (marca + modelo)
+    model_keys = np.array([f"{v.brand or ''}\x00{v.model or ''}" for v in vehicles], dtype=object)
+    unique_models, model_index = np.unique(model_keys, return_inverse=True)
+    m = len(unique_models)
+    model_vehicles = np.bincount(model_index, minlength=m)
+    model_occupied = np.bincount(model_index, weights=occupied_days, minlength=m)
+    model_revenue = np.bincount(model_index, weights=revenue, minlength=m)
+    available_days = model_vehicles * days
+    by_model = []
+    for j, key in enumerate(unique_models):
+        brand, model = key.split("\x00")
+        by_model.append({
+            "brand": brand,
+            "model": model,
+            "vehicles": int(model_vehicles[j]),
+            "occupiedDays": int(model_occupied[j]),
+            "idleDays": int(available_days[j] - model_occupied[j]),
+            "utilization": round(float(model_occupied[j] / available_days[j] * 100), 2),
+            "revenue": round(float(model_revenue[j]), 2),
+            "revenuePerAvailableDay": round(float(model_revenue[j] / available_days[j]), 2),
+        })
+
+    # Porcentaje de la flota ocupada cada día del rango
+    daily = _percent(occupied.sum(axis=0), n)
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "days": days,
+        "vehicles": n,
+        "utilization": round(float(occupied_days.sum() / (n * days) * 100), 2) if n else 0.0,
+        "byVehicle": by_vehicle,
+        "byModel": by_model,
+        "dailyOccupancy": [
+            {"date": desde + timedelta(days=k), "utilization": float(daily[k])}
+            for k in range(days)
+        ],
+    }
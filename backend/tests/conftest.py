@@ -0,0 +1,48 @@
+# tests/conftest.py
+"""
+La app corre contra una base SQLite temporal cargada con el seed de los
+benchmarks. Las variables se definen antes de importar backend: database.py
+arma los engines al importarse.
+
+    python -m pytest backend/tests
+"""
+import os
+import re
+import tempfile
+from datetime import date
+
+os.environ["DB_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='tests-'), 'tests.db')}"
+os.environ["AUTH_SECRET_KEY"] = "tests-secret-0123456789"
+os.environ["REQUEST_LOG"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.seed import BENCH_PASSWORD, BENCH_USERNAME, seed
+from backend.data.database import Base, engine
+from backend.main import app
+
+SEED_LEASES = 500
+
+_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def statements(response) -> int:
+    """Sentencias SQL que ejecutó el pedido, según el header Server-Timing."""
+    match = _QUERIES.search(response.headers["server-timing"])
+    assert match, response.headers["server-timing"]
+    return int(match.group(1))
+
+
+@pytest.fixture(scope="session")
+def counts() -> dict:
+    Base.metadata.create_all(engine)
+    return seed(engine, leases=SEED_LEASES, seed=0, today=date.today())
+
+
+@pytest.fixture(scope="session")
+def client(counts):
+    with TestClient(app) as client:
+        login = client.post("/auth/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD}).json()
+        client.headers["Authorization"] = f"Bearer {login['token']}"
+        yield client
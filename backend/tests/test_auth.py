@@ -0,0 +1,129 @@
+import time
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.create_admin import create_admin, main
+from backend.data.database import engine
+from backend.models.employee import Employee
+from backend.services import tokens
+
+
+def _login(client, username: str, password: str):
+    return client.post("/auth/login", json={"username": username, "password": password},
+                       headers={"Authorization": ""})
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="module")
+def agent(client) -> dict:
+    """Usuario sin privilegios de admin (empleado con cargo de agente), ya logueado."""
+    with engine.begin() as conn:
+        employee_id = conn.execute(
+            insert(Employee).values(name="Agente Tests", cargo="Agente de Alquileres")
+        ).inserted_primary_key[0]
+    created = client.post("/usuarios/", json={"employeeId": employee_id, "username": "tests-agent",
+                                              "password": "agente"})
+    assert created.status_code == 201
+    login = _login(client, "tests-agent", "agente").json()
+    assert login["isAdmin"] is False
+    return login
+
+
+def _fresh_login(client) -> dict:
+    response = _login(client, "tests-agent", "agente")
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_create_admin_bootstraps_a_user_that_can_manage_users(client):
+    assert main(["--username", "tests-admin", "--password", "primer-admin"]) == 0
+    # El mismo nombre de usuario no se crea dos veces
+    assert main(["--username", "tests-admin", "--password", "otra"]) == 1
+
+    login = _login(client, "tests-admin", "primer-admin")
+    assert login.status_code == 200
+    assert login.json()["isAdmin"] is True
+    assert client.get("/usuarios/", headers=_bearer(login.json()["token"])).status_code == 200
+
+
+def test_create_admin_rejects_employee_without_admin_cargo(counts):
+    with engine.begin() as conn:
+        employee_id = conn.execute(
+            insert(Employee).values(name="Mecánico Tests", cargo="Mecánico")
+        ).inserted_primary_key[0]
+    with Session(engine) as db:
+        with pytest.raises(ValueError, match="not an admin cargo"):
+            create_admin(db, "tests-no-admin", "clave", employee_id=employee_id)
+        with pytest.raises(ValueError, match="not found"):
+            create_admin(db, "tests-no-admin", "clave", employee_id=999999)
+
+
+def test_non_admin_only_reaches_its_own_user(client, agent):
+    headers = _bearer(agent["token"])
+    assert client.get(f"/usuarios/{agent['userId']}", headers=headers).status_code == 200
+    assert client.patch(f"/usuarios/{agent['userId']}/password", json={"password": "agente"},
+                        headers=headers).status_code == 200
+
+    # Otro usuario (el del seed) y todo lo que es de admin: 403
+    assert client.get("/usuarios/1", headers=headers).status_code == 403
+    assert client.patch("/usuarios/1/password", json={"password": "x"}, headers=headers).status_code == 403
+    assert client.get("/usuarios/", headers=headers).status_code == 403
+    assert client.post("/usuarios/", json={"employeeId": 1, "username": "x", "password": "x"},
+                       headers=headers).status_code == 403
+    assert client.delete("/usuarios/1", headers=headers).status_code == 403
+
+    # El admin sí ve a otros usuarios
+    assert client.get(f"/usuarios/{agent['userId']}").status_code == 200
+
+
+def test_expired_access_token_is_rejected(client, agent, monkeypatch):
+    login = _fresh_login(client)
+    url = f"/usuarios/{agent['userId']}"
+
+    class Later:
+        @staticmethod
+        def time() -> float:
+            return time.time() + login["expiresIn"] + 1
+
+    monkeypatch.setattr(tokens, "time", Later)
+    response = client.get(url, headers=_bearer(login["token"]))
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token expired"
+
+    monkeypatch.undo()
+    assert client.get(url, headers=_bearer(login["token"])).status_code == 200
+
+
+def test_refresh_rotates_the_pair(client, agent):
+    login = _fresh_login(client)
+    refreshed = client.post("/auth/refresh", json={"refreshToken": login["refreshToken"]},
+                            headers={"Authorization": ""})
+    assert refreshed.status_code == 200
+    pair = refreshed.json()
+    assert pair["token"] != login["token"] and pair["refreshToken"] != login["refreshToken"]
+    assert client.get(f"/usuarios/{agent['userId']}", headers=_bearer(pair["token"])).status_code == 200
+
+    # El refresh token usado queda revocado; el nuevo sigue valiendo
+    reused = client.post("/auth/refresh", json={"refreshToken": login["refreshToken"]},
+                         headers={"Authorization": ""})
+    assert reused.status_code == 401
+    assert client.post("/auth/refresh", json={"refreshToken": pair["refreshToken"]},
+                       headers={"Authorization": ""}).status_code == 200
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, agent):
+    login = _fresh_login(client)
+    headers = _bearer(login["token"])
+    assert client.post("/auth/logout", json={"refreshToken": login["refreshToken"]},
+                       headers=headers).status_code == 204
+
+    response = client.get(f"/usuarios/{agent['userId']}", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revoked"
+    assert client.post("/auth/refresh", json={"refreshToken": login["refreshToken"]},
+                       headers={"Authorization": ""}).status_code == 401
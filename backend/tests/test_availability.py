@@ -0,0 +1,168 @@
+from datetime import date, datetime
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from backend.data.database import engine
+from backend.models.lease import Lease
+from backend.services import availability
+from backend.services.availability import AvailabilityIndex, VehicleIntervals
+
+
+def dt(day: int, hour: int = 0) -> datetime:
+    return datetime(2030, 1, day, hour)
+
+
+def test_intervals_are_half_open():
+    intervals = VehicleIntervals()
+    intervals.add(1, dt(10, 10), dt(12, 10))
+
+    # Empezar justo cuando termina (o terminar justo cuando empieza) no choca
+    assert not intervals.overlaps(dt(12, 10), dt(14))
+    assert not intervals.overlaps(dt(8), dt(10, 10))
+    assert intervals.overlaps(dt(12, 9), dt(14))
+    assert intervals.overlaps(dt(8), dt(10, 11))
+    assert intervals.conflicts(dt(12, 10), dt(14)) == []
+    assert intervals.conflicts(dt(11), dt(11, 1)) == [1]
+
+
+def test_long_interval_is_found_behind_later_starts():
+    intervals = VehicleIntervals()
+    intervals.add(1, dt(1), dt(20))
+    intervals.add(2, dt(3), dt(4))
+    intervals.add(3, dt(6), dt(7))
+
+    # El alquiler 3 empieza después pero el 1 sigue abierto (max_end)
+    assert intervals.overlaps(dt(10), dt(11))
+    assert intervals.conflicts(dt(10), dt(11)) == [1]
+    assert sorted(intervals.conflicts(dt(3), dt(7))) == [1, 2, 3]
+
+    assert intervals.remove(1) == (dt(1), dt(20))
+    assert not intervals.overlaps(dt(10), dt(11))
+    assert intervals.remove(1) is None
+
+
+def test_exclude_lease_id_ignores_only_that_lease():
+    index = AvailabilityIndex(reload_seconds=60)
+    index.add(1, vehicle_id=7, start=dt(10), end=dt(12))
+
+    assert not index.is_available(7, dt(11), dt(13))
+    # Mover el alquiler 1 dentro de su propio rango
+    assert index.is_available(7, dt(11), dt(13), exclude_lease_id=1)
+    assert not index.is_available(7, dt(11), dt(13), exclude_lease_id=2)
+
+    index.add(2, vehicle_id=7, start=dt(12), end=dt(14))
+    assert not index.is_available(7, dt(11), dt(13), exclude_lease_id=1)
+    assert index.is_available(8, dt(11), dt(13))
+
+
+def test_sync_drops_cancelled_and_finalized_leases():
+    index = AvailabilityIndex(reload_seconds=60)
+    # Sin cargar, sync no hace nada (la carga inicial lee la base)
+    lease = {"id": 1, "vehicleId": 7, "state": "confirmado", "date_time_start": dt(10), "date_time_end": dt(12)}
+    index.sync(lease)
+    assert index.is_available(7, dt(10), dt(12))
+
+    index._loaded = True
+    index.sync(lease)
+    assert index.busy_vehicles(dt(10), dt(12)) == {7}
+    index.sync(dict(lease, state="cancelado"))
+    assert index.busy_vehicles(dt(10), dt(12)) == set()
+
+    index.sync(dict(lease, state="creado"))
+    assert index.busy_vehicles(dt(10), dt(12)) == {7}
+    index.sync(dict(lease, state="finalizado"))
+    assert index.is_available(7, dt(10), dt(12))
+
+
+def test_busy_vehicles_with_partial_days():
+    index = AvailabilityIndex(reload_seconds=60)
+    index.add(1, vehicle_id=1, start=dt(10, 10), end=dt(10, 12))  # parte de un día
+    index.add(2, vehicle_id=2, start=dt(10), end=dt(13))  # días completos
+    index.add(3, vehicle_id=3, start=dt(12, 18), end=dt(15, 6))  # empieza y termina a mitad de día
+
+    assert index.busy_vehicles(dt(10), dt(11)) == {1, 2}
+    assert index.busy_vehicles(dt(10, 12), dt(10, 18)) == {2}
+    assert index.busy_vehicles(dt(10, 6), dt(10, 10)) == {2}
+    assert index.busy_vehicles(dt(10, 11), dt(10, 11).replace(minute=30)) == {1, 2}
+    assert index.busy_vehicles(dt(12), dt(12, 18)) == {2}
+    assert index.busy_vehicles(dt(12, 17), dt(12, 19)) == {2, 3}
+    assert index.busy_vehicles(dt(13), dt(14)) == {3}
+    assert index.busy_vehicles(dt(15, 6), dt(16)) == set()
+    assert index.busy_vehicles(dt(1), dt(31)) == {1, 2, 3}
+
+    # Los contadores por día se descuentan al sacar el alquiler
+    index.remove(3)
+    assert index.busy_vehicles(dt(12, 17), dt(12, 19)) == {2}
+    assert index.busy_vehicles(dt(13), dt(16)) == set()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def test_reload_picks_up_leases_written_by_other_processes(counts, monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(availability, "clock", fake_clock)
+    index = AvailabilityIndex(reload_seconds=60)
+    start, end = datetime(2097, 3, 1, 10), datetime(2097, 3, 3, 10)
+    with Session(engine) as db:
+        index.ensure_loaded(db)
+        assert index.busy_vehicles(start, end) == set()
+
+        with engine.begin() as conn:
+            lease_ids = [
+                conn.execute(insert(Lease).values(
+                    clientId=1, vehicleId=vehicle_id, employeeId=1, state=state, amount=10,
+                    date_time_start=start, date_time_end=end, date_create=date.today(),
+                )).inserted_primary_key[0]
+                for vehicle_id, state in ((1, "confirmado"), (2, "cancelado"))
+            ]
+        try:
+            fake_clock.now += 59
+            index.ensure_loaded(db)
+            assert index.busy_vehicles(start, end) == set()
+
+            # Vencido: se rearma desde la base, sin el alquiler cancelado
+            fake_clock.now += 1
+            assert index.needs_reload()
+            index.ensure_loaded(db)
+            assert index.busy_vehicles(start, end) == {1}
+            assert not index.needs_reload()
+        finally:
+            with engine.begin() as conn:
+                conn.execute(delete(Lease).where(Lease.id.in_(lease_ids)))
+
+
+def test_available_vehicles_endpoint(client):
+    first, second = [v["id"] for v in client.get("/vehiculos/?estado=disponible&limit=2").json()]
+
+    def available(desde: str, hasta: str) -> set[int]:
+        response = client.get("/vehiculos/disponibles", params={"desde": desde, "hasta": hasta})
+        assert response.status_code == 200
+        return {vehicle["id"] for vehicle in response.json()}
+
+    leases = []
+    for vehicle_id in (first, second):
+        response = client.post("/alquileres/", json={
+            "clientId": 1, "vehicleId": vehicle_id, "employeeId": 1,
+            "date_time_start": "2096-04-10T10:00:00", "date_time_end": "2096-04-12T10:00:00",
+        })
+        assert response.status_code == 201
+        leases.append(response.json()["id"])
+    assert client.patch(f"/alquileres/{leases[1]}/cancelar").status_code == 200
+
+    free = available("2096-04-11T00:00:00", "2096-04-11T12:00:00")
+    assert first not in free and second in free
+    # Desde justo el fin del alquiler, o hasta justo su inicio, el vehículo está libre
+    assert first in available("2096-04-12T10:00:00", "2096-04-13T00:00:00")
+    assert first in available("2096-04-09T00:00:00", "2096-04-10T10:00:00")
+
+    response = client.get("/vehiculos/disponibles", params={
+        "desde": "2096-04-12T10:00:00", "hasta": "2096-04-12T10:00:00",
+    })
+    assert response.status_code == 400
@@ -0,0 +1,50 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from backend.data.database import engine
+from backend.models.lease import Lease
+from backend.services.availability import ACTIVE_LEASE_STATES
+
+VEHICLES = 10
+ATTEMPTS_PER_VEHICLE = 20
+START = "2093-03-01T10:00:00"
+END = "2093-03-04T10:00:00"
+
+
+def test_simultaneous_bookings_one_winner_per_vehicle(client):
+    # Cualquier vehículo que no esté en mantenimiento o de baja se puede reservar a futuro
+    vehicle_ids = [
+        v["id"] for v in client.get("/vehiculos/?limit=100").json()
+        if v["estado"] not in ("mantenimiento", "baja")
+    ][:VEHICLES]
+    assert len(vehicle_ids) == VEHICLES
+
+    def book(vehicle_id):
+        response = client.post("/alquileres/", json={
+            "clientId": 1, "vehicleId": vehicle_id, "employeeId": 1,
+            "date_time_start": START, "date_time_end": END,
+        })
+        return vehicle_id, response.status_code
+
+    # Todos los pedidos a la vez, intercalando vehículos
+    requests = [vehicle_id for _ in range(ATTEMPTS_PER_VEHICLE) for vehicle_id in vehicle_ids]
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        results = list(pool.map(book, requests))
+
+    statuses = Counter(status for _, status in results)
+    assert set(statuses) <= {201, 400}, statuses
+    winners = Counter(vehicle_id for vehicle_id, status in results if status == 201)
+    assert winners == {vehicle_id: 1 for vehicle_id in vehicle_ids}
+
+    with engine.connect() as conn:
+        booked = dict(conn.execute(
+            select(Lease.vehicleId, func.count()).where(
+                Lease.vehicleId.in_(vehicle_ids),
+                Lease.state.in_(ACTIVE_LEASE_STATES),
+                Lease.date_time_start < END,
+                Lease.date_time_end > START,
+            ).group_by(Lease.vehicleId)
+        ).all())
+    assert booked == {vehicle_id: 1 for vehicle_id in vehicle_ids}
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert
+
+from backend.data.database import engine
+from backend.models.lease import Lease
+from backend.services.dashboard_cache import dashboard_cache
+from backend.tests.conftest import statements
+
+# KPIs en memoria ya sembrados: ingresos por mes, top de vehículos y últimos alquileres
+DASHBOARD_STATEMENTS = 3
+# Con la reconciliación de KPIs se suman sus cinco consultas agregadas
+RECONCILE_STATEMENTS = 5
+
+
+def test_dashboard_statement_count(client):
+    dashboard_cache.invalidate()
+    first = client.get("/dashboard/")
+    assert first.status_code == 200
+    assert statements(first) in (DASHBOARD_STATEMENTS, DASHBOARD_STATEMENTS + RECONCILE_STATEMENTS)
+
+    dashboard_cache.invalidate()
+    rebuilt = client.get("/dashboard/")
+    assert statements(rebuilt) == DASHBOARD_STATEMENTS
+    assert rebuilt.json() == first.json()
+
+    # Servido desde el cache, sin tocar la base
+    assert statements(client.get("/dashboard/")) == 0
+
+
+def test_popular_vehicles_skip_deleted_vehicles(client):
+    # Alquileres de un vehículo que ya no existe, más que los de cualquier otro
+    missing_vehicle = 999_999
+    start = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Lease), [
+            {"clientId": 1, "vehicleId": missing_vehicle, "employeeId": 1,
+             "date_time_start": start + timedelta(days=i), "date_time_end": start + timedelta(days=i, hours=1),
+             "amount": 1, "state": "finalizado", "date_create": start.date()}
+            for i in range(200)
+        ])
+    try:
+        dashboard_cache.invalidate()
+        popular = client.get("/dashboard/").json()["popularVehicles"]
+        top = [vehicle for vehicle in popular if vehicle["name"] != "Otro"]
+        assert len(top) == 3
+        assert all(vehicle["rentals"] < 200 for vehicle in top)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(Lease).where(Lease.vehicleId == missing_vehicle))
+        dashboard_cache.invalidate()
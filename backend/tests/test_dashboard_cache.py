@@ -0,0 +1,49 @@
+import asyncio
+
+from backend.services.dashboard_cache import SingleFlightCache
+
+
+def test_cancelled_leader_does_not_fail_waiters():
+    async def scenario():
+        cache = SingleFlightCache("test", ttl=60)
+        release = asyncio.Event()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"ok": True}
+
+        leader = asyncio.create_task(cache.get(compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get(compute))
+        await asyncio.sleep(0)
+
+        # El cliente del primer pedido se desconecta a mitad del cálculo
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await waiter == {"ok": True}
+        assert leader.cancelled()
+        # El resultado quedó cacheado y se calculó una sola vez
+        assert await cache.get(compute) == {"ok": True}
+        assert calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_failure_reaches_every_waiter_once():
+    async def scenario():
+        cache = SingleFlightCache("test", ttl=60)
+
+        async def compute():
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(cache.get(compute), cache.get(compute), return_exceptions=True)
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+        assert cache.misses == 1 and cache.coalesced == 1
+
+    asyncio.run(scenario())
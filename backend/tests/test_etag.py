@@ -0,0 +1,36 @@
+from sqlalchemy import update
+
+from backend.data.database import engine
+from backend.models.table_version import TableVersion
+
+
+def test_list_answers_304_until_any_worker_writes(client):
+    first = client.get("/clientes/")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.get("/clientes/", headers={"If-None-Match": etag}).status_code == 304
+
+    # Una escritura atendida por este proceso cambia la versión
+    client_id = first.json()[0]["id"]
+    assert client.put(f"/clientes/{client_id}", json={"name": "Otro Nombre"}).status_code == 200
+    second = client.get("/clientes/", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+
+    # Y también una de otro worker: la versión está en la base, no en memoria
+    etag = second.headers["etag"]
+    with engine.begin() as conn:
+        conn.execute(update(TableVersion).where(TableVersion.name == "clients")
+                     .values(version=TableVersion.version + 1))
+    assert client.get("/clientes/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_modified_since(client):
+    client_id = client.get("/clientes/?limit=1").json()[0]["id"]
+    assert client.put(f"/clientes/{client_id}", json={"phone": "123"}).status_code == 200
+    last_modified = client.get("/clientes/").headers["last-modified"]
+    assert client.get("/clientes/", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    # Dos escrituras en el mismo segundo igual avanzan Last-Modified
+    assert client.put(f"/clientes/{client_id}", json={"phone": "456"}).status_code == 200
+    assert client.get("/clientes/", headers={"If-Modified-Since": last_modified}).status_code == 200
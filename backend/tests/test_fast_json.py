@@ -0,0 +1,27 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.exceptions import ResponseValidationError
+from fastapi.utils import create_model_field
+
+from backend.benchmarks.serialization import fast_path, fastapi_path, sample_leases
+from backend.schemas.lease_schemas import LeaseResponse
+from backend.services.fast_json import fast_json
+
+
+def test_same_json_as_response_model():
+    leases = sample_leases(50)
+    field = create_model_field(name="Response_read_leases", type_=list[LeaseResponse], mode="serialization")
+    loop = asyncio.new_event_loop()
+    try:
+        assert json.loads(fast_path(leases)) == json.loads(fastapi_path(loop, field, leases))
+    finally:
+        loop.close()
+
+
+def test_required_field_cannot_be_null():
+    lease = sample_leases(1)[0]
+    lease["clientName"] = None
+    with pytest.raises(ResponseValidationError):
+        fast_json(lease, LeaseResponse)
@@ -0,0 +1,18 @@
+from backend.tests.conftest import statements
+
+
+def test_incident_page_is_one_statement(client):
+    # Empleado y estado del alquiler van en el mismo SELECT
+    for limit in (10, 100):
+        response = client.get(f"/incidentes/?limit={limit}")
+        assert response.status_code == 200
+        incidents = response.json()
+        assert incidents and all(incident["employeeName"] and incident["leaseState"] for incident in incidents)
+        assert statements(response) == 1
+
+
+def test_incident_detail_is_one_statement(client):
+    incident_id = client.get("/incidentes/?limit=1").json()[0]["id"]
+    response = client.get(f"/incidentes/{incident_id}")
+    assert response.status_code == 200
+    assert statements(response) == 1
@@ -0,0 +1,98 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import exists, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.data.database import engine
+from backend.models.incident import Incident
+from backend.models.invoice import Invoice
+from backend.models.lease import Lease
+
+
+def test_batch_invoices_pending_leases_with_their_incidents(client):
+    with engine.begin() as conn:
+        # El seed ya factura todos los finalizados: se finalizan algunos sin factura
+        unbilled = list(conn.scalars(
+            select(Lease.id)
+            .where(Lease.state != "finalizado", ~exists().where(Invoice.rentalId == Lease.id))
+            .order_by(Lease.id)
+            .limit(5)
+        ))
+        assert unbilled
+        conn.execute(update(Lease).where(Lease.id.in_(unbilled)).values(state="finalizado"))
+        conn.execute(insert(Incident), [
+            {"rentalId": lease_id, "employeeId": 1, "type": "daño", "cost": Decimal("12.50")}
+            for lease_id in unbilled[:3]
+        ])
+        pending = select(Lease.id).where(
+            Lease.state == "finalizado", ~exists().where(Invoice.rentalId == Lease.id)
+        )
+        pending_ids = set(conn.scalars(pending))
+        incidents_total = conn.scalar(select(func.sum(Incident.cost)).where(Incident.rentalId.in_(pending)))
+
+    response = client.post("/facturas/lote", json={"paymentMethod": "efectivo"})
+    assert response.status_code == 201
+    summary = response.json()
+    assert set(summary["rentalIds"]) == pending_ids
+    assert summary["created"] == len(pending_ids)
+    assert Decimal(str(summary["incidentsTotal"])) == incidents_total
+
+    # Ya no queda nada por facturar
+    assert client.post("/facturas/lote", json={"paymentMethod": "efectivo"}).json()["created"] == 0
+
+
+BATCHES = 20
+
+
+def _insert_finalized_leases(conn, count: int) -> set[int]:
+    """Inserta `count` alquileres finalizados (en el pasado) y devuelve todos los pendientes de facturar."""
+    conn.execute(insert(Lease), [
+        {
+            "clientId": 1, "vehicleId": 1, "employeeId": 1,
+            "date_time_start": datetime(2001, 1, 1) + timedelta(days=3 * i),
+            "date_time_end": datetime(2001, 1, 2) + timedelta(days=3 * i),
+            "amount": Decimal("100.00"), "state": "finalizado", "date_create": date(2001, 1, 1),
+        }
+        for i in range(count)
+    ])
+    return set(conn.scalars(
+        select(Lease.id).where(Lease.state == "finalizado", ~exists().where(Invoice.rentalId == Lease.id))
+    ))
+
+
+def test_simultaneous_batches_invoice_each_lease_once(client):
+    with engine.begin() as conn:
+        pending_ids = _insert_finalized_leases(conn, 100)
+
+    def invoice_batch(_):
+        return client.post("/facturas/lote", json={"paymentMethod": "efectivo"})
+
+    with ThreadPoolExecutor(max_workers=BATCHES) as pool:
+        responses = list(pool.map(invoice_batch, range(BATCHES)))
+
+    assert {response.status_code for response in responses} == {201}
+    invoiced = Counter(
+        rental_id for response in responses for rental_id in response.json()["rentalIds"]
+    )
+    assert invoiced == {lease_id: 1 for lease_id in pending_ids}
+
+    with engine.connect() as conn:
+        duplicated = conn.scalars(
+            select(Invoice.rentalId).group_by(Invoice.rentalId).having(func.count() > 1)
+        ).all()
+    assert duplicated == []
+
+
+def test_second_invoice_for_a_lease_is_rejected_by_the_database(counts):
+    with engine.connect() as conn:
+        rental_id = conn.scalar(select(Invoice.rentalId).limit(1))
+        with pytest.raises(IntegrityError):
+            conn.execute(insert(Invoice).values(
+                rentalId=rental_id, clientName="Duplicada", issuedDate=date.today(),
+                total=Decimal("1.00"), paymentMethod="efectivo", status="pendiente",
+            ))
+        conn.rollback()
@@ -0,0 +1,182 @@
+from backend.tests.conftest import statements
+
+
+def test_lease_page_is_one_statement(client):
+    # Cliente, vehículo y empleado salen del mismo SELECT: no crece con el tamaño de página
+    for limit in (10, 100):
+        response = client.get(f"/alquileres/?limit={limit}")
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        assert statements(response) == 1
+
+
+def test_lease_page_with_filters_is_one_statement(client):
+    response = client.get("/alquileres/?state=finalizado&limit=50")
+    assert response.status_code == 200
+    assert all(lease["state"] == "finalizado" for lease in response.json())
+    assert statements(response) == 1
+
+
+def test_lease_detail_is_one_statement(client):
+    lease_id = client.get("/alquileres/?limit=1").json()[0]["id"]
+    response = client.get(f"/alquileres/{lease_id}")
+    assert response.status_code == 200
+    assert response.json()["clientName"]
+    assert statements(response) == 1
+
+
+def _walk_pages(client, params: dict) -> list[list[int]]:
+    """Recorre el listado siguiendo X-Next-Cursor y devuelve los ids de cada página."""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get("/alquileres/", params=dict(params, **({"cursor": cursor} if cursor else {})))
+        assert response.status_code == 200
+        pages.append([lease["id"] for lease in response.json()])
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return pages
+        assert len(pages) < 100
+
+
+def test_lease_cursor_pages_cover_the_list_once(client):
+    from sqlalchemy import select
+
+    from backend.data.database import engine
+    from backend.models.lease import Lease
+
+    with engine.connect() as conn:
+        expected = list(conn.scalars(select(Lease.id).where(Lease.state == "finalizado").order_by(Lease.id)))
+    assert len(expected) > 37
+
+    pages = _walk_pages(client, {"state": "finalizado", "limit": 37})
+    ids = [lease_id for page in pages for lease_id in page]
+    # Sin repetidos ni huecos entre páginas, en orden de id
+    assert ids == expected
+    assert all(len(page) == 37 for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= 37
+
+    # Si la última página queda justo llena tampoco hay cursor siguiente
+    assert _walk_pages(client, {"state": "finalizado", "limit": len(expected)}) == [expected]
+
+
+def test_malformed_cursor_is_rejected(client):
+    import base64
+
+    not_an_int = base64.urlsafe_b64encode(b'{"id":"12"}').decode().rstrip("=")
+    not_an_object = base64.urlsafe_b64encode(b"[12]").decode().rstrip("=")
+    for cursor in ("no-es-un-cursor", "%%%", not_an_int, not_an_object):
+        response = client.get("/alquileres/", params={"cursor": cursor})
+        assert response.status_code == 400, cursor
+        assert response.json()["detail"] == "Invalid cursor"
+
+
+def _free_vehicle(client) -> int:
+    return client.get("/vehiculos/?estado=disponible&limit=1").json()[0]["id"]
+
+
+def _lease(client, vehicle_id: int, start: str, end: str):
+    return client.post("/alquileres/", json={
+        "clientId": 1, "vehicleId": vehicle_id, "employeeId": 1,
+        "date_time_start": start, "date_time_end": end,
+    })
+
+
+def _set_state(lease_id: int, state: str):
+    """Cambia el estado directo en la base, por fuera de los endpoints."""
+    from sqlalchemy import update
+
+    from backend.data.database import engine
+    from backend.models.lease import Lease
+
+    with engine.begin() as conn:
+        conn.execute(update(Lease).where(Lease.id == lease_id).values(state=state))
+
+
+def test_update_cannot_create_overlap(client):
+    vehicle_id = _free_vehicle(client)
+    first = _lease(client, vehicle_id, "2090-01-01T10:00:00", "2090-01-05T10:00:00")
+    second = _lease(client, vehicle_id, "2090-02-01T10:00:00", "2090-02-05T10:00:00")
+    assert first.status_code == second.status_code == 201
+    # Solo se editan alquileres en estado "creado"
+    _set_state(second.json()["id"], "creado")
+
+    response = client.put(f"/alquileres/{second.json()['id']}", json={
+        "date_time_start": "2090-01-03T10:00:00", "date_time_end": "2090-01-08T10:00:00",
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Vehicle is already booked for the requested dates"
+
+    # Mover el alquiler dentro de su propio rango no choca consigo mismo
+    response = client.put(f"/alquileres/{second.json()['id']}", json={"date_time_end": "2090-02-06T10:00:00"})
+    assert response.status_code == 200
+
+
+def test_create_is_not_rejected_by_stale_index(client):
+    vehicle_id = _free_vehicle(client)
+    lease = _lease(client, vehicle_id, "2091-01-01T10:00:00", "2091-01-05T10:00:00")
+    assert lease.status_code == 201
+
+    # Cancelado por fuera de este proceso: el índice en memoria no se entera
+    _set_state(lease.json()["id"], "cancelado")
+
+    assert _lease(client, vehicle_id, "2091-01-02T10:00:00", "2091-01-04T10:00:00").status_code == 201
+
+
+def test_timezone_aware_dates_are_stored_as_local_time(client):
+    from datetime import datetime, timezone
+
+    vehicle_id = _free_vehicle(client)
+    start = datetime(2092, 5, 1, 10, tzinfo=timezone.utc)
+    local_start = start.astimezone().replace(tzinfo=None)
+
+    lease = _lease(client, vehicle_id, "2092-05-01T10:00:00Z", "2092-05-03T10:00:00+00:00")
+    assert lease.status_code == 201
+    assert lease.json()["date_time_start"] == local_start.isoformat()
+
+    # Mismo rango con otra zona: choca con el anterior (comparación sin zona)
+    response = _lease(client, vehicle_id, "2092-05-01T07:00:00-03:00", "2092-05-02T07:00:00-03:00")
+    assert response.status_code == 400
+
+    _set_state(lease.json()["id"], "creado")
+    response = client.put(f"/alquileres/{lease.json()['id']}", json={"date_time_end": "2092-05-04T10:00:00Z"})
+    assert response.status_code == 200
+
+    response = client.get("/vehiculos/disponibles", params={
+        "desde": "2092-05-01T12:00:00Z", "hasta": "2092-05-02T12:00:00Z",
+    })
+    assert response.status_code == 200
+    assert vehicle_id not in [vehicle["id"] for vehicle in response.json()]
+
+
+def test_cancel_keeps_vehicle_busy_with_a_lease_the_index_does_not_know(client):
+    from datetime import date, datetime, timedelta
+
+    from sqlalchemy import delete, insert, select, update
+
+    from backend.data.database import engine
+    from backend.models.lease import Lease
+    from backend.models.vehicle import Vehicle
+
+    vehicle_id = _free_vehicle(client)
+    future = _lease(client, vehicle_id, "2093-06-01T10:00:00", "2093-06-03T10:00:00")
+    assert future.status_code == 201
+    # Índice cargado en este proceso antes de la reserva del otro worker
+    client.get("/vehiculos/disponibles", params={"desde": "2093-01-01T00:00:00", "hasta": "2093-01-02T00:00:00"})
+
+    now = datetime.now()
+    with engine.begin() as conn:
+        current_id = conn.execute(insert(Lease).values(
+            clientId=1, vehicleId=vehicle_id, employeeId=1, state="confirmado", amount=10,
+            date_time_start=now - timedelta(hours=1), date_time_end=now + timedelta(days=1),
+            date_create=date.today(),
+        )).inserted_primary_key[0]
+        conn.execute(update(Vehicle).where(Vehicle.id == vehicle_id).values(estado="no disponible"))
+    try:
+        assert client.patch(f"/alquileres/{future.json()['id']}/cancelar").status_code == 200
+        with engine.connect() as conn:
+            assert conn.scalar(select(Vehicle.estado).where(Vehicle.id == vehicle_id)) == "no disponible"
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(Lease).where(Lease.id == current_id))
+            conn.execute(update(Vehicle).where(Vehicle.id == vehicle_id).values(estado="disponible"))
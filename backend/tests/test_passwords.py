@@ -0,0 +1,50 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from backend.services.passwords import PasswordHasher, password_context
+
+PASSWORD = "secreto-123"
+
+
+def _crash():
+    # Corre en el proceso del pool: lo mata como lo haría el OOM killer
+    os._exit(1)
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    yield hasher
+    hasher.shutdown()
+
+
+def _assert_busy(error):
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+
+
+def test_worker_dying_mid_request_returns_503_and_rebuilds_the_pool(hasher):
+    with pytest.raises(HTTPException) as error:
+        hasher._submit(_crash).result(timeout=30)
+    _assert_busy(error)
+
+    assert asyncio.run(hasher.verify_async(PASSWORD, password_context.hash(PASSWORD)))
+    assert hasher.stats()["pending"] == 0
+
+
+def test_submit_to_a_broken_pool_returns_503_and_rebuilds_the_pool(hasher):
+    # El pool se rompe por fuera de _submit: el próximo pedido lo encuentra roto
+    broken = hasher._get_executor()
+    with pytest.raises(Exception):
+        broken.submit(_crash).result()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(hasher.verify_async(PASSWORD, password_context.hash(PASSWORD)))
+    _assert_busy(error)
+
+    assert hasher._get_executor() is not broken
+    assert asyncio.run(hasher.verify_async(PASSWORD, password_context.hash(PASSWORD)))
+    assert hasher.stats()["pending"] == 0
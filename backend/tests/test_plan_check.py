@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.data.database import Base
+from backend.migrations.ops import create_index
+from backend.migrations.plan_check import CHECKS, run_checks
+from backend.migrations.versions.m0001_performance_indexes import INDEXES
+
+# Como en MySQL: la foreign key ya tiene su índice implícito (con el nombre
+# de la columna), así que la migración no crea el suyo
+FK_INDEXES = {
+    "ix_invoices_rental": ("Invoices", "rentalId"),
+    "ix_maintenance_vehicle": ("Maintenance", "vehicleId"),
+}
+# En el modelo Invoices(rentalId) ya es el UNIQUE de m0003
+MODEL_INDEX_NAMES = {"ix_invoices_rental": "ux_invoices_rental"}
+
+
+@pytest.fixture(scope="module")
+def results() -> dict:
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='plan-check-'), 'plan.db')}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for index, (table, column) in FK_INDEXES.items():
+            conn.execute(text(f"DROP INDEX {MODEL_INDEX_NAMES.get(index, index)}"))
+            conn.execute(text(f'CREATE INDEX "{column}" ON "{table}" ("{column}")'))
+        created = [name for table, name, columns in INDEXES if create_index(conn, table, name, columns)]
+    assert created == []
+    try:
+        return {result["index"]: result for result in run_checks(engine)}
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize("index", [index for index, _, _ in CHECKS])
+def test_query_uses_its_index(results, index):
+    result = results[index]
+    assert result["used"], result
+
+
+@pytest.mark.parametrize("index", sorted(FK_INDEXES))
+def test_index_covered_by_foreign_key_index(results, index):
+    _, column = FK_INDEXES[index]
+    assert results[index]["accepted"] == [column]
+    assert results[index]["plan"] == [column]
+
+
+def test_check_command_runs_standalone(counts):
+    # Sin la app importada: el CLI tiene que cargar solo los modelos que usa
+    result = subprocess.run(
+        [sys.executable, "-m", "backend.migrations", "check"],
+        capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "FAIL" not in result.stdout
@@ -0,0 +1,80 @@
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from backend.data.database import engine
+from backend.models.vehicle import Vehicle
+from backend.services import search
+from backend.services.search import SearchIndex, TrigramIndex
+
+
+def test_query_without_trigrams_has_no_matches():
+    index = TrigramIndex(("name",))
+    index.put(1, ("abc",))
+    # "áb" normaliza a "ab": sin trigramas
+    assert list(index.candidates("ab")) == []
+    assert index.ranked("áb", 10) == []
+    assert index.ranked("abc", 10) == [1]
+
+
+def test_search_rejects_short_normalized_query(client):
+    assert client.get("/buscar/", params={"q": "áb"}).status_code == 422
+    assert client.get("/buscar/", params={"q": "garc"}).status_code == 200
+
+
+def test_list_filter_sees_rows_written_by_other_processes(client):
+    # Primero carga el índice de /buscar; después otra conexión (otro worker)
+    # agrega un vehículo que este proceso no se entera
+    client.get("/buscar/", params={"q": "zzz"})
+    with engine.begin() as conn:
+        vehicle_id = conn.execute(
+            insert(Vehicle).values(
+                brand="Quetzalmotors", model="Xq", patente="TST-017", year=2020, pricePerDay=10,
+                seats=4, transmission="manual", fuel="nafta", kilometraje_actual=0, estado="disponible",
+            )
+        ).inserted_primary_key[0]
+    try:
+        for params in ({"brand": "etzal"}, {"brand": "ZALMO"}, {"model": "xq"}):
+            ids = [vehicle["id"] for vehicle in client.get("/vehiculos/", params=params).json()]
+            assert ids == [vehicle_id], params
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(Vehicle).where(Vehicle.id == vehicle_id))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def test_index_reloads_rows_written_by_other_processes(counts, monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(search, "clock", fake_clock)
+    index = SearchIndex(reload_seconds=60)
+    with Session(engine) as db:
+        index.ensure_loaded(db, ["vehicles"])
+        assert not index.needs_reload("vehicles")
+
+        with engine.begin() as conn:
+            vehicle_id = conn.execute(
+                insert(Vehicle).values(
+                    brand="Xiloquemotors", model="Yq", patente="TST-018", year=2020, pricePerDay=10,
+                    seats=4, transmission="manual", fuel="nafta", kilometraje_actual=0, estado="disponible",
+                )
+            ).inserted_primary_key[0]
+        try:
+            # Antes de vencer sigue con lo que cargó
+            fake_clock.now += 59
+            index.ensure_loaded(db, ["vehicles"])
+            assert index.search("vehicles", "xiloque", 10) == []
+
+            fake_clock.now += 1
+            assert index.needs_reload("vehicles")
+            index.ensure_loaded(db, ["vehicles"])
+            assert [row["id"] for row in index.search("vehicles", "xiloque", 10)] == [vehicle_id]
+            assert not index.needs_reload("vehicles")
+        finally:
+            with engine.begin() as conn:
+                conn.execute(delete(Vehicle).where(Vehicle.id == vehicle_id))
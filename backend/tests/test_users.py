@@ -0,0 +1,19 @@
+def _login(client, username: str, password: str):
+    return client.post("/auth/login", json={"username": username, "password": password},
+                       headers={"Authorization": ""})
+
+
+def test_create_user_and_change_password(client):
+    created = client.post("/usuarios/", json={"employeeId": 1, "username": "tests-user", "password": "primera"})
+    assert created.status_code == 201
+    user = created.json()
+    assert user["username"] == "tests-user" and user["employeeName"]
+    assert _login(client, "tests-user", "primera").status_code == 200
+
+    changed = client.patch(f"/usuarios/{user['userId']}/password", json={"password": "segunda"})
+    assert changed.status_code == 200
+    assert changed.json() == user
+    assert _login(client, "tests-user", "primera").status_code == 401
+    assert _login(client, "tests-user", "segunda").status_code == 200
+
+    assert client.patch("/usuarios/999999/password", json={"password": "x"}).status_code == 404
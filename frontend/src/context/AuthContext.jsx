@@ -1,6 +1,12 @@
-import { createContext, useState, useContext } from "react";
+import { createContext, useState, useContext, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 import axios from "axios";
+import { authService } from "../services/auth.service";
+import {
+  SESSION_KEY,
+  SESSION_UPDATED_EVENT,
+  readSession,
+} from "../services/api.service";
 
 const AuthContext = createContext();
 
@@ -11,7 +17,7 @@ export const useAuth = () => {
 export function AuthProvider({ children }) {
   const [currentUser, setCurrentUser] = useState(() => {
     try {
-      const item = window.localStorage.getItem("car-doba-user");
+      const item = window.localStorage.getItem(SESSION_KEY);
       return item ? JSON.parse(item) : null;
     } catch (error) {
       console.error("Error al leer localStorage", error);
@@ -21,6 +27,23 @@ export function AuthProvider({ children }) {
 
   const navigate = useNavigate();
 
+  // Keep the state in sync with the rotated token pair after a refresh
+  // (this tab or another one), so logout revokes the current refresh token
+  useEffect(() => {
+    const onRefresh = (event) => setCurrentUser(event.detail);
+    const onStorage = (event) => {
+      if (event.key === SESSION_KEY) {
+        setCurrentUser(readSession());
+      }
+    };
+    window.addEventListener(SESSION_UPDATED_EVENT, onRefresh);
+    window.addEventListener("storage", onStorage);
+    return () => {
+      window.removeEventListener(SESSION_UPDATED_EVENT, onRefresh);
+      window.removeEventListener("storage", onStorage);
+    };
+  }, []);
+
   const login = async (username, password) => {
     try {
       console.log("AuthContext: Iniciando login...");
@@ -79,7 +102,7 @@ export function AuthProvider({ children }) {
       }
 
       // Store in localStorage
-      window.localStorage.setItem("car-doba-user", JSON.stringify(userToStore));
+      window.localStorage.setItem(SESSION_KEY, JSON.stringify(userToStore));
 
       // Update state
       setCurrentUser(userToStore);
@@ -102,7 +125,13 @@ export function AuthProvider({ children }) {
   };
 
   const logout = () => {
-    window.localStorage.removeItem("car-doba-user");
+    // The stored session has the latest pair (a refresh may have rotated it)
+    const session = readSession() || currentUser;
+    if (session?.refreshToken) {
+      // Revoke tokens on the server; the session is cleared regardless
+      authService.logout(session.refreshToken, session.token).catch(() => {});
+    }
+    window.localStorage.removeItem(SESSION_KEY);
     setCurrentUser(null);
     navigate("/login");
   };
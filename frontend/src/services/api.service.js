@@ -10,14 +10,27 @@ const apiClient = axios.create({
   timeout: 10000, // 10 seconds
 });
 
+// Session stored by AuthContext (includes token and refreshToken)
+export const SESSION_KEY = "car-doba-user";
+// Fired with the updated session after a refresh rotates the token pair
+export const SESSION_UPDATED_EVENT = "car-doba-session-updated";
+
+export const readSession = () => {
+  try {
+    const item = window.localStorage.getItem(SESSION_KEY);
+    return item ? JSON.parse(item) : null;
+  } catch {
+    return null;
+  }
+};
+
 // Request interceptor (for adding auth tokens, logging, etc.)
 apiClient.interceptors.request.use(
   (config) => {
-    // You can add auth tokens here in the future
-    // const token = localStorage.getItem('auth-token');
-    // if (token) {
-    //   config.headers.Authorization = `Bearer ${token}`;
-    // }
+    const token = readSession()?.token;
+    if (token) {
+      config.headers.Authorization = `Bearer ${token}`;
+    }
 
     console.log(`API Request: ${config.method?.toUpperCase()} ${config.url}`);
     return config;
@@ -28,19 +41,52 @@ apiClient.interceptors.request.use(
   }
 );
 
+// Shared refresh request, so concurrent 401s trigger a single /auth/refresh
+let refreshPromise = null;
+
+const refreshSession = async () => {
+  const session = readSession();
+  if (!session?.refreshToken) {
+    throw new Error("No refresh token");
+  }
+  const response = await axios.post(`${API_BASE_URL}/auth/refresh`, {
+    refreshToken: session.refreshToken,
+  });
+  // The response carries the new access token AND the new refresh token
+  // (the old one is revoked on the server)
+  const updated = { ...session, ...response.data };
+  window.localStorage.setItem(SESSION_KEY, JSON.stringify(updated));
+  window.dispatchEvent(
+    new CustomEvent(SESSION_UPDATED_EVENT, { detail: updated })
+  );
+  return updated.token;
+};
+
 // Response interceptor (for error handling)
 apiClient.interceptors.response.use(
   (response) => {
     return response;
   },
-  (error) => {
+  async (error) => {
     console.error("API Error:", error.response?.data || error.message);
 
     // Handle specific error codes
-    if (error.response?.status === 401) {
-      // Unauthorized - could redirect to login
-      console.warn("Unauthorized access - redirecting to login");
-      // window.location.href = '/login';
+    const original = error.config;
+    if (error.response?.status === 401 && original && !original._retried) {
+      // Access token expired: refresh once and retry the request
+      original._retried = true;
+      try {
+        refreshPromise = refreshPromise || refreshSession();
+        const token = await refreshPromise;
+        original.headers.Authorization = `Bearer ${token}`;
+        return apiClient(original);
+      } catch {
+        console.warn("Unauthorized access - redirecting to login");
+        window.localStorage.removeItem(SESSION_KEY);
+        window.location.href = "/login";
+      } finally {
+        refreshPromise = null;
+      }
     }
 
     return Promise.reject(error);
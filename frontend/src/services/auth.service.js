@@ -6,8 +6,21 @@ export const authService = {
     return await apiService.post("/auth/login", { username, password });
   },
 
+  // Exchange the refresh token for a new token pair
+  refresh: async (refreshToken) => {
+    return await apiService.post("/auth/refresh", { refreshToken });
+  },
+
+  // Revoke the current access token and the refresh token
+  // (the token is passed explicitly: the session may already be cleared)
+  logout: async (refreshToken, token) => {
+    return await apiService.post(
+      "/auth/logout",
+      { refreshToken },
+      { headers: { Authorization: `Bearer ${token}` }, _retried: true }
+    );
+  },
+
   // You can add more auth methods here in the future
-  // logout: async () => { ... },
-  // refreshToken: async () => { ... },
   // resetPassword: async (email) => { ... },
 };